@@ -0,0 +1,180 @@
+"""
+HTTP query API over the latest scan.
+
+    GET /scan               categorized tokens from the latest scan
+    GET /tokens/{address}   every pair of one token, with its category
+    GET /health             liveness
+
+Every reader is answered from one shared snapshot: TokenService coalesces concurrent
+scans and reuses a result for API_RESULT_TTL seconds, and each snapshot is rendered
+(and gzipped) once. Responses carry an ETag and a Cache-Control max-age matching the
+snapshot's remaining lifetime, so If-None-Match revalidation costs nothing.
+
+Run standalone with:  python -m app.api.server
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+from aiohttp import web
+from app.services.snapshot import ScanSnapshot
+from app.services.token_service import TokenService
+import app.config as config
+
+# Smaller bodies aren't worth compressing
+GZIP_MIN_BYTES = 1024
+
+class RenderedBody:
+    """A JSON body with its ETag and (lazily) its gzipped form"""
+
+    def __init__(self, payload: Any):
+        self.body = json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self._gzipped: Optional[bytes] = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class RenderedSnapshot:
+    """Everything served from one snapshot, built once per snapshot"""
+
+    def __init__(self, snapshot: ScanSnapshot):
+        self.snapshot = snapshot
+        self.meta = {
+            'created_at': snapshot.created_at,
+            'partial': snapshot.partial,
+            'batches_done': snapshot.batches_done,
+            'batches_total': snapshot.batches_total,
+            'total_tokens': snapshot.total_tokens,
+        }
+        self.scan = RenderedBody(dict(self.meta, categories=snapshot.categorized_tokens))
+
+        # address (lower case) -> [(category, pair)]
+        self.by_address: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        for category, tokens in snapshot.categorized_tokens.items():
+            for token in tokens:
+                address = token.get('baseToken', {}).get('address', '').lower()
+                if address:
+                    self.by_address.setdefault(address, []).append((category, token))
+        self._token_bodies: Dict[str, RenderedBody] = {}
+
+    def token(self, address: str) -> Optional[RenderedBody]:
+        address = address.lower()
+        if address not in self.by_address:
+            return None
+        body = self._token_bodies.get(address)
+        if body is None:
+            pairs = [dict(pair, category=category) for category, pair in self.by_address[address]]
+            body = self._token_bodies[address] = RenderedBody(dict(self.meta, address=address, pairs=pairs))
+        return body
+
+
+class ScanAPI:
+    def __init__(self, token_service: TokenService, result_ttl: Optional[float] = None, refresher=None):
+        """With a warm refresher, results live as long as its (adaptive) max_snapshot_age"""
+        self.token_service = token_service
+        self.refresher = refresher
+        self._result_ttl = config.API_RESULT_TTL if result_ttl is None else result_ttl
+        self.logger = logging.getLogger('ScanAPI')
+        self._rendered: Optional[RenderedSnapshot] = None
+
+    @property
+    def result_ttl(self) -> float:
+        # Read per request: the refresher's interval adapts to volatility at runtime
+        if self.refresher is not None:
+            return self.refresher.max_snapshot_age
+        return self._result_ttl
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/scan', self.handle_scan)
+        app.router.add_get('/tokens/{address}', self.handle_token)
+        app.router.add_get('/health', self.handle_health)
+        return app
+
+    async def handle_scan(self, request: web.Request) -> web.Response:
+        rendered = await self._current()
+        return self._respond(request, rendered.scan, rendered.snapshot)
+
+    async def handle_token(self, request: web.Request) -> web.Response:
+        rendered = await self._current()
+        body = rendered.token(request.match_info['address'])
+        if body is None:
+            return web.json_response({'error': 'token not in the latest scan'}, status=404,
+                                     headers={'Cache-Control': f"max-age={self._max_age(rendered.snapshot)}"})
+        return self._respond(request, body, rendered.snapshot)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        snapshot = self.token_service.latest_snapshot
+        return web.json_response({'ok': True, 'snapshot_age': round(snapshot.age, 1) if snapshot else None})
+
+    async def _current(self) -> RenderedSnapshot:
+        """Latest snapshot, rendered; concurrent readers share one scan and one render"""
+        try:
+            categorized_tokens = await self.token_service.scan_tokens(max_age=self.result_ttl)
+        except Exception as e:
+            self.logger.error(f"Scan failed: {str(e)}")
+            raise web.HTTPServiceUnavailable(text=json.dumps({'error': 'scan failed'}), content_type='application/json')
+
+        snapshot = self.token_service.latest_snapshot
+        if snapshot is None or snapshot.categorized_tokens is not categorized_tokens:
+            # A scan that stopped before storing a snapshot; wrap the result so it renders the same way
+            snapshot = ScanSnapshot(categorized_tokens)
+        if self._rendered is None or self._rendered.snapshot is not snapshot:
+            self._rendered = RenderedSnapshot(snapshot)
+        return self._rendered
+
+    def _max_age(self, snapshot: ScanSnapshot) -> int:
+        if snapshot.partial:
+            return 0
+        return max(0, int(self.result_ttl - snapshot.age))
+
+    def _respond(self, request: web.Request, rendered: RenderedBody, snapshot: ScanSnapshot) -> web.Response:
+        headers = {
+            'ETag': rendered.etag,
+            'Cache-Control': f"public, max-age={self._max_age(snapshot)}",
+            'Vary': 'Accept-Encoding',
+        }
+        if_none_match = request.headers.get('If-None-Match', '')
+        if if_none_match.strip() == '*' or rendered.etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return web.Response(status=304, headers=headers)
+
+        body = rendered.body
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in request.headers.get('Accept-Encoding', ''):
+            body = rendered.gzipped
+            headers['Content-Encoding'] = 'gzip'
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+
+def main():
+    """Run the API with its own fetcher and service (and a warm snapshot if enabled)"""
+    from app.services.snapshot_refresher import SnapshotRefresher
+    from app.services.token_service import create_token_service
+
+    config.setup_logging()
+    token_service = create_token_service()
+    refresher = SnapshotRefresher(token_service) if config.WARM_SCAN_ENABLED else None
+    api = ScanAPI(token_service, refresher=refresher)
+    app = api.make_app()
+
+    async def on_startup(app):
+        if refresher:
+            refresher.start()
+
+    async def on_cleanup(app):
+        if refresher:
+            refresher.shutdown()
+        await token_service.shutdown()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    web.run_app(app, host=config.API_HOST, port=config.API_PORT)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,64 @@
-from telegram.ext import Application, CommandHandler, ContextTypes
-from telegram import Update
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 import logging
 from typing import Optional, List, Dict, Any
 import asyncio 
+import math
+import time
 from app.services.token_service import TokenService
+from app.services.snapshot import ScanSnapshot
+from app.services.snapshot_index import QueryError, metric_names, parse_number
+from app.services.loop_runner import get_loop_runner
+from app.services.metrics import metrics, start_metrics_server
+from app.bot.telegram_client import MAX_MESSAGE_LENGTH, SentMessage
+from app.data.blocklist import get_blocklist
 import app.config as config
 
+# Callback data prefix for result page navigation: "scan:<snapshot_id>:<category>:<page>"
+RESULTS_CALLBACK_PREFIX = "scan"
+
 class TokenBot:
-    def __init__(self, token: str, chat_id: str, token_service: TokenService):
+    # Category descriptions
+    CATEGORY_DESCRIPTIONS = {
+        'Moonshot': "Tokens with high potential for explosive growth 🚀",
+        'Solid Investment': "Tokens with strong fundamentals and steady growth potential 💪",
+        'Risky': "Tokens that meet basic criteria but require caution ⚠️",
+        'Potential': "Tokens showing promise in specific areas, worth watching 👀"
+    }
+
+    def __init__(self, token: str, chat_id: str, token_service: TokenService, refresher=None, http_client=None,
+                 watchlist=None):
         """Initialize bot with token, chat ID, and service dependency"""
         self.token = token
         self.chat_id = chat_id
         self.application = Application.builder().token(token).build()
         self.token_service = token_service
+        self.refresher = refresher
+        # Optional pooled TelegramHTTPClient shared with the Lambda handler; carries all replies when set
+        self.http_client = http_client
+        self.watchlist = watchlist
+        if watchlist:
+            watchlist.notify = lambda chat_id, text: self.send_message(text, chat_id=chat_id)
+
+        # Background jobs must run on the polling event loop
+        if refresher or watchlist or config.METRICS_PORT:
+            self.application.post_init = self._start_background_services
+            self.application.post_shutdown = self._stop_background_services
+        self._metrics_runner = None
         
         # Add command handlers
         self.application.add_handler(CommandHandler("start", self.start_command))
         self.application.add_handler(CommandHandler("help", self.help_command))
         self.application.add_handler(CommandHandler("scan", self.scan_command))
+        self.application.add_handler(CommandHandler("profile", self.profile_command))
+        self.application.add_handler(CommandHandler("block", self.block_command))
+        self.application.add_handler(CommandHandler("unblock", self.unblock_command))
+        self.application.add_handler(CommandHandler("watch", self.watch_command))
+        self.application.add_handler(CommandHandler("unwatch", self.unwatch_command))
+        self.application.add_handler(CommandHandler("watchlist", self.watchlist_command))
+        self.application.add_handler(CommandHandler("top", self.top_command))
+        self.application.add_handler(CommandHandler("filter", self.filter_command))
+        self.application.add_handler(CallbackQueryHandler(self.results_page_callback, pattern=f"^{RESULTS_CALLBACK_PREFIX}:"))
         
         # Setup logging
         self.logger = logging.getLogger('TokenBot')
@@ -27,28 +68,45 @@ class TokenBot:
         self.logger.info("Starting bot...")
         self.application.run_polling(allowed_updates=Update.ALL_TYPES)
 
-    def scan_command_sync(self, update: Update, context: Optional[ContextTypes.DEFAULT_TYPE] = None):
-        """Synchronous wrapper for scan_command"""
-        async def run_scan():
-            # Explicitly pass the update and context
-            await self.scan_command(update, context)
-        
-        # Create a new event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    async def send_message(self, message: str, chat_id=None):
+        """Send message to a chat (the configured chat ID by default)"""
+        chat_id = chat_id or self.chat_id
+        if self.http_client:
+            # Pooled keep-alive session instead of the bot's own request setup
+            await self.http_client.send_message(chat_id, message)
+        else:
+            await self.application.bot.send_message(chat_id=chat_id, text=message, parse_mode='Markdown')
+
+    async def _start_background_services(self, application: Application):
+        if self.refresher:
+            self.refresher.start()
+        if self.watchlist:
+            self.watchlist.start()
+        if config.METRICS_PORT:
+            self._metrics_runner = await start_metrics_server(config.METRICS_PORT)
+            self.logger.info(f"Serving Prometheus metrics on :{config.METRICS_PORT}/metrics")
+
+    async def _stop_background_services(self, application: Application):
+        if self.refresher:
+            self.refresher.shutdown()
+        if self.watchlist:
+            await self.watchlist.shutdown()
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+
+    def scan_command_sync(self, update: Update, context: Optional[ContextTypes.DEFAULT_TYPE] = None,
+                          deadline: Optional[float] = None):
+        """Synchronous wrapper for scan_command, run on the process-wide event loop"""
+        runner = get_loop_runner()
         
         try:
-            # Run the async method
+            # Reusing the loop keeps sessions and background tasks alive between calls
             self.logger.info("Starting synchronous scan wrapper")
-            loop.run_until_complete(run_scan())
+            runner.run(self.scan_command(update, context, deadline=deadline), timeout=config.SCAN_TIMEOUT)
             self.logger.info("Synchronous scan completed successfully")
         except Exception as e:
             self.logger.error(f"Error in synchronous scan wrapper: {e}")
-            # You might want to send an error message to the user here
             raise
-        finally:
-            # Close the event loop
-            loop.close()
         
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler for /start command"""
@@ -69,46 +127,378 @@ class TokenBot:
         help_message = (
             "🤖 Bot Commands:\n\n"
             "/scan - Start a new token scan\n"
+            "/profile - Profile one scan (admins only)\n"
+            "/top <metric> [n] - Top tokens of the latest scan by a metric\n"
+            "/filter <expr> - e.g. /filter liquidity > 1m and change > 20\n"
+            "/watch <address> - Get alerts when a token moves sharply\n"
+            "/unwatch [address] - Stop watching one token (or all)\n"
+            "/watchlist - Show the tokens you watch\n"
+            "/block <address> [hours], /unblock <address> - Manage the blocklist (admins only)\n"
             "/help - Show this help message\n\n"
             f"Using classifier: {classifier_name}\n"
             "Bot will also send automatic alerts for interesting tokens."
         )
         await update.message.reply_text(help_message)
 
-    async def scan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handler for /scan command"""
-        await update.message.reply_text("🔍 Starting scan...")
+    async def scan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, deadline: Optional[float] = None):
+        """Handler for /scan command; deadline (time.monotonic()) bounds the fetch for Lambda"""
+        status_message = await self._reply(update, "🔍 Starting scan...")
     
         try:
+            progress_callback = None
+            if config.PROGRESSIVE_SCAN:
+                progress_callback = self._make_progress_updater(status_message)
+
             # Get categorized tokens from the service
-            categorized_tokens = await self.token_service.scan_tokens()
+            # With a warm snapshot running, anything up to one missed refresh old is served instantly
+            max_age = self.refresher.max_snapshot_age if self.refresher else None
+            categorized_tokens = await self.token_service.scan_tokens(
+                progress_callback=progress_callback, max_age=max_age, deadline=deadline
+            )
             
             # Check if any tokens were found
             if not categorized_tokens:
-                return await update.message.reply_text("No tokens found.")
+                return await self._reply(update, "No tokens found.")
                 
             # Check if any categories have tokens
             total_tokens = sum(len(tokens) for tokens in categorized_tokens.values())
             if total_tokens == 0:
-                return await update.message.reply_text("No matches found.")
+                return await self._reply(update, "No matches found.")
             
+            # Notes describe the snapshot holding these results, never an older one
+            snapshot = self._snapshot_for(categorized_tokens)
+
+            if config.PAGINATED_RESULTS:
+                # Show the first page; further browsing is served from the cached scan
+                with metrics.span('render', view='page'):
+                    text, reply_markup = self._render_results_page(
+                        categorized_tokens, note=self._snapshot_note(snapshot),
+                        snapshot_id=snapshot.snapshot_id if snapshot else ''
+                    )
+                if not (config.PROGRESSIVE_SCAN and await self._edit_status(status_message, text, reply_markup)):
+                    await self._reply(update, text, reply_markup=reply_markup)
+                return
+
+            if config.PROGRESSIVE_SCAN:
+                await self._edit_status(status_message, f"✅ Scan complete - {total_tokens} matches. Full results below.")
+
+            note = self._snapshot_note(snapshot)
+            if note:
+                await self._reply(update, note)
+
             # Format and send results
             await self._send_categorized_tokens(update, categorized_tokens)
             
         except Exception as e:
             self.logger.error(f"Error during scan: {str(e)}")
-            await update.message.reply_text(f"❌ Error: {str(e)}")
+            await self._reply(update, f"❌ Error: {str(e)}")
+
+    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /profile (admins only): run one fresh scan under the profiler"""
+        if not self._is_admin(update):
+            return await self._reply(update, "⛔ This command is restricted to bot admins.")
+
+        if self.token_service.scan_in_progress:
+            return await self._reply(update, "⏳ A scan is already running. Try /profile again once it finishes.")
+
+        await self._reply(update, "🧪 Profiling a fresh scan...")
+        try:
+            report = await self.token_service.profile_scan() or "No profile was recorded."
+            # The full report is in the log / PROFILE_OUTPUT_DIR; the chat gets the head of it
+            if len(report) > MAX_MESSAGE_LENGTH:
+                report = report[:MAX_MESSAGE_LENGTH - 20] + "\n... (truncated)"
+            await self._reply(update, report)
+        except Exception as e:
+            self.logger.error(f"Error during profiled scan: {str(e)}")
+            await self._reply(update, f"❌ Error: {str(e)}")
+
+    async def block_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /block <address> [hours] (admins only)"""
+        if not self._is_admin(update):
+            return await self._reply(update, "⛔ This command is restricted to bot admins.")
+        args = context.args if context else []
+        if not args:
+            return await self._reply(update, "Usage: /block <address> [hours]")
+        try:
+            hours = float(args[1]) if len(args) > 1 else None
+        except ValueError:
+            return await self._reply(update, "Hours must be a number.")
+        if hours is not None and not (hours > 0 and math.isfinite(hours)):
+            return await self._reply(update, "Hours must be a positive number; leave it out to block indefinitely.")
+
+        get_blocklist().block(args[0], ttl=hours * 3600 if hours else None)
+        expiry = f" for {hours:g}h" if hours else ""
+        self.logger.info(f"User {update.effective_user.id} blocked {args[0]}{expiry}")
+        await self._reply(update, f"🚫 Blocked {args[0]}{expiry}. It will be skipped by future scans.")
+
+    async def unblock_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /unblock <address> (admins only)"""
+        if not self._is_admin(update):
+            return await self._reply(update, "⛔ This command is restricted to bot admins.")
+        args = context.args if context else []
+        if not args:
+            return await self._reply(update, "Usage: /unblock <address>")
+
+        get_blocklist().unblock(args[0])
+        self.logger.info(f"User {update.effective_user.id} unblocked {args[0]}")
+        await self._reply(update, f"✅ Unblocked {args[0]}.")
+
+    async def watch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /watch <address>"""
+        if not self.watchlist:
+            return await self._reply(update, "Watchlist is not enabled.")
+        args = context.args if context else []
+        if not args:
+            return await self._reply(update, "Usage: /watch <address>")
+        if get_blocklist().is_blocked(args[0]):
+            return await self._reply(update, f"🚫 {args[0]} is blocklisted and can't be watched.")
+
+        if self.watchlist.watch(update.effective_chat.id, args[0]):
+            await self._reply(update, f"👁 Watching {args[0]}. You'll get a message when it moves sharply.")
+        else:
+            await self._reply(update, f"Already watching {args[0]}, or you reached the limit of {config.WATCH_MAX_PER_CHAT} tokens.")
+
+    async def unwatch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /unwatch [address]; without an address, stops watching everything"""
+        if not self.watchlist:
+            return await self._reply(update, "Watchlist is not enabled.")
+        args = context.args if context else []
+        removed = self.watchlist.unwatch(update.effective_chat.id, args[0] if args else None)
+        await self._reply(update, f"Stopped watching {removed} token(s).")
+
+    async def watchlist_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /watchlist"""
+        if not self.watchlist:
+            return await self._reply(update, "Watchlist is not enabled.")
+        addresses = self.watchlist.watched_by(update.effective_chat.id)
+        if not addresses:
+            return await self._reply(update, "You aren't watching any tokens. Use /watch <address>.")
+        await self._reply(update, "👁 Watching:\n" + "\n".join(addresses))
+
+    async def top_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /top <metric> [n]: answered from the latest snapshot's indexes"""
+        args = context.args if context else []
+        if not args:
+            return await self._reply(update, f"Usage: /top <metric> [n]\nMetrics: {', '.join(metric_names())}")
+        snapshot = self.token_service.get_snapshot()
+        if snapshot is None:
+            return await self._reply(update, "No scan results yet. Run /scan first.")
+
+        metric = args[0].lower()
+        try:
+            n = min(int(parse_number(args[1])) if len(args) > 1 else 10, config.QUERY_MAX_RESULTS)
+            with metrics.span('query', kind='top'):
+                results = snapshot.index.top(metric, n)
+        except QueryError as e:
+            return await self._reply(update, f"❌ {str(e)}\nMetrics: {', '.join(metric_names())}")
+        await self._reply(update, self._format_query_results(f"Top {len(results)} by {metric}", results, snapshot))
+
+    async def filter_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for /filter <expr>, e.g. liquidity > 1m and change >= 20"""
+        expression = " ".join(context.args) if context and context.args else ""
+        if not expression:
+            return await self._reply(update, "Usage: /filter liquidity > 1m and change >= 20\n"
+                                             f"Metrics: {', '.join(metric_names())}")
+        snapshot = self.token_service.get_snapshot()
+        if snapshot is None:
+            return await self._reply(update, "No scan results yet. Run /scan first.")
+
+        try:
+            with metrics.span('query', kind='filter'):
+                results = snapshot.index.filter(expression)
+        except QueryError as e:
+            return await self._reply(update, f"❌ {str(e)}")
+        title = f"{len(results)} match(es) for {expression}"
+        await self._reply(update, self._format_query_results(title, results[:config.QUERY_MAX_RESULTS], snapshot))
+
+    def _format_query_results(self, title: str, results: List[tuple], snapshot: ScanSnapshot) -> str:
+        lines = [f"📊 {title}"]
+        for i, (value, token) in enumerate(results, 1):
+            symbol = token.get('baseToken', {}).get('symbol', '?')
+            lines.append(f"{i}. {symbol}: {value:,.6g}")
+        if not results:
+            lines.append("Nothing matched.")
+        note = self._snapshot_note(snapshot)
+        if note:
+            lines.append(note)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _is_admin(update: Update) -> bool:
+        user = update.effective_user
+        return user is not None and user.id in config.ADMIN_USER_IDS
+
+    def _make_progress_updater(self, status_message):
+        """Build a progress callback that edits the status message in place, throttled"""
+        state = {'last_edit': 0.0, 'last_text': None}
+
+        async def update_progress(batches_done: int, batches_total: int, partial_tokens):
+            # Telegram rate limits edits, so only the latest state is shown once per interval
+            now = time.monotonic()
+            if batches_done < batches_total and now - state['last_edit'] < config.PROGRESS_EDIT_INTERVAL:
+                return
+
+            text = self._format_progress(batches_done, batches_total, partial_tokens)
+            if text == state['last_text']:
+                return
+
+            state['last_edit'] = now
+            state['last_text'] = text
+            await self._edit_status(status_message, text)
+
+        return update_progress
+
+    def _format_progress(self, batches_done: int, batches_total: int, partial_tokens) -> str:
+        """Format the in-progress status message with counts and current top tokens"""
+        top_tokens = self._top_tokens(partial_tokens, config.PROGRESS_TOP_TOKENS)
+        match_count = sum(len(tokens) for tokens in partial_tokens.values()) \
+            if isinstance(partial_tokens, dict) else len(partial_tokens)
+
+        lines = [
+            f"🔍 Scanning... {batches_done}/{batches_total} batches",
+            f"Matches so far: {match_count}"
+        ]
+        if top_tokens:
+            lines.append("")
+            lines.append("🏆 Current top:")
+            for i, (category, token) in enumerate(top_tokens, 1):
+                symbol = token.get('baseToken', {}).get('symbol', 'Unknown')
+                suffix = f" ({category})" if category else ""
+                lines.append(f"{i}. {symbol} - {float(token.get('score', 0)):.1f}/10{suffix}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _top_tokens(categorized_tokens, limit: int) -> List[tuple]:
+        """Return the highest scoring (category, token) pairs across all categories"""
+        if isinstance(categorized_tokens, dict):
+            candidates = [(category, token) for category, tokens in categorized_tokens.items() for token in tokens]
+        else:
+            candidates = [(None, token) for token in categorized_tokens or []]
+        candidates.sort(key=lambda item: item[1].get('score', 0), reverse=True)
+        return candidates[:limit]
+
+    async def _edit_status(self, status_message, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> bool:
+        """Edit the status message, ignoring failures so the scan itself is never interrupted"""
+        try:
+            with metrics.span('telegram_send', method='edit'):
+                await status_message.edit_text(text, reply_markup=reply_markup)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not update status message: {str(e)}")
+            return False
+
+    async def results_page_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler for result page/category buttons, served from the cached scan"""
+        query = update.callback_query
+        try:
+            _, snapshot_id, category, page = query.data.split(':', 3)
+            page = int(page)
+        except ValueError:
+            return await query.answer()
+
+        # Pages are only served from the scan the message was built from, never a newer one
+        snapshot = self.token_service.get_snapshot_by_id(snapshot_id, max_age=config.RESULTS_CACHE_TTL)
+        if snapshot is None:
+            return await query.answer("⌛ These results have expired. Run /scan again.", show_alert=True)
+
+        await query.answer()
+        with metrics.span('render', view='page'):
+            text, reply_markup = self._render_results_page(snapshot.categorized_tokens, category, page,
+                                                           self._snapshot_note(snapshot), snapshot.snapshot_id)
+        try:
+            with metrics.span('telegram_send', method='edit'):
+                await query.edit_message_text(text, reply_markup=reply_markup)
+        except Exception as e:
+            # Telegram rejects edits that don't change the message (e.g. double taps)
+            self.logger.warning(f"Could not edit results page: {str(e)}")
+
+    def _render_results_page(self, categorized_tokens: Dict[str, List[Dict[str, Any]]], category: Optional[str] = None,
+                             page: int = 0, note: Optional[str] = None, snapshot_id: str = '') -> tuple:
+        """Render one page of a category plus the navigation keyboard; buttons carry snapshot_id"""
+        categories = [c for c, tokens in categorized_tokens.items() if tokens]
+        if not categories:
+            return "No matches found.", InlineKeyboardMarkup([])
+        if category not in categories:
+            category = categories[0]
+
+        tokens = categorized_tokens[category]
+        page_size = max(1, config.RESULTS_PAGE_SIZE)
+        page_count = (len(tokens) + page_size - 1) // page_size
+        page = min(max(page, 0), page_count - 1)
+        start = page * page_size
+
+        total_tokens = sum(len(t) for t in categorized_tokens.values())
+        header = (
+            f"✅ Found {total_tokens} tokens across {len(categories)} categories.\n\n"
+            f"📊 {category} - {self.CATEGORY_DESCRIPTIONS.get(category, '')}\n"
+            f"({len(tokens)} tokens, page {page + 1}/{page_count})"
+        )
+        if note:
+            header += f"\n{note}"
+        body = ''.join(self._format_token(i, token) for i, token in enumerate(tokens[start:start + page_size], start + 1))
+
+        category_buttons = [
+            InlineKeyboardButton(
+                f"{'• ' if c == category else ''}{c} ({len(categorized_tokens[c])})",
+                callback_data=f"{RESULTS_CALLBACK_PREFIX}:{snapshot_id}:{c}:0"
+            )
+            for c in categories
+        ]
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton("◀️ Prev", callback_data=f"{RESULTS_CALLBACK_PREFIX}:{snapshot_id}:{category}:{page - 1}"))
+        if page < page_count - 1:
+            nav_buttons.append(InlineKeyboardButton("Next ▶️", callback_data=f"{RESULTS_CALLBACK_PREFIX}:{snapshot_id}:{category}:{page + 1}"))
+
+        keyboard = [category_buttons[i:i + 2] for i in range(0, len(category_buttons), 2)]
+        if nav_buttons:
+            keyboard.append(nav_buttons)
+        return f"{header}\n\n{body}".rstrip(), InlineKeyboardMarkup(keyboard)
+
+    def _snapshot_for(self, categorized_tokens: Dict[str, List[Dict[str, Any]]]) -> Optional[ScanSnapshot]:
+        """The service's latest snapshot if it holds exactly these results, otherwise None"""
+        snapshot = self.token_service.get_snapshot()
+        if isinstance(snapshot, ScanSnapshot) and snapshot.categorized_tokens is categorized_tokens:
+            return snapshot
+        return None
+
+    def _snapshot_note(self, snapshot: Optional[ScanSnapshot]) -> str:
+        """Age and partial-scan marker for the given scan results"""
+        if not isinstance(snapshot, ScanSnapshot):
+            return ""
+        lines = []
+        if snapshot.age >= 1:
+            lines.append(f"🕒 Results from {self._format_age(snapshot.age)} ago")
+        if snapshot.partial:
+            lines.append(f"⚠️ Partial: {snapshot.batches_done} of {snapshot.batches_total} batches")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_age(seconds: float) -> str:
+        if seconds < 60:
+            return f"{seconds:.0f}s"
+        return f"{seconds / 60:.0f} min"
+
+    def _format_token(self, index: int, token: Dict[str, Any]) -> str:
+        """Format a single token entry"""
+        base_token = token.get('baseToken', {})
+        token_info = (
+            f"{index}. {base_token.get('symbol', 'Unknown')} ({base_token.get('name', 'Unknown')})\n"
+            f"💰 Price: ${float(token.get('priceUsd', 0)):.4f}\n"
+            f"📈 24h Vol: ${float(token.get('volume', {}).get('h24', 0)):,.0f}\n"
+            f"💧 Liq: ${float(token.get('liquidity', {}).get('usd', 0)):,.0f}\n"
+            f"📊 24h: {float(token.get('priceChange', {}).get('h24', 0)):+.1f}%\n"
+        )
+        
+        # Add score if available
+        if 'score' in token:
+            token_info += f"⭐ Score: {token['score']:.1f}/10\n\n"
+        else:
+            token_info += "\n"
+        return token_info
     
     async def _send_categorized_tokens(self, update: Update, categorized_tokens: Dict[str, List[Dict[str, Any]]]):
         """Format and send categorized tokens to the user"""
-        # Category descriptions
-        category_descriptions = {
-            'Moonshot': "Tokens with high potential for explosive growth 🚀",
-            'Solid Investment': "Tokens with strong fundamentals and steady growth potential 💪",
-            'Risky': "Tokens that meet basic criteria but require caution ⚠️",
-            'Potential': "Tokens showing promise in specific areas, worth watching 👀"
-        }
-        
         # Count total tokens and categories with tokens
         total_tokens = sum(len(tokens) for tokens in categorized_tokens.values())
         categories_with_tokens = len([c for c, t in categorized_tokens.items() if t])
@@ -119,42 +509,39 @@ class TokenBot:
                 continue  # Skip empty categories
             
             # Send category header with description
-            description = category_descriptions.get(category, "")
-            await update.message.reply_text(f"📊 *{category}* - {description}\n({len(tokens)} tokens)", parse_mode='Markdown')
+            description = self.CATEGORY_DESCRIPTIONS.get(category, "")
+            await self._reply(update, f"📊 *{category}* - {description}\n({len(tokens)} tokens)", parse_mode='Markdown')
             
             message_batches = []
             current_batch = []
             
-            for i, token in enumerate(tokens, 1):
-                base_token = token.get('baseToken', {})
-                token_info = (
-                    f"{i}. {base_token.get('symbol', 'Unknown')} ({base_token.get('name', 'Unknown')})\n"
-                    f"💰 Price: ${float(token.get('priceUsd', 0)):.4f}\n"
-                    f"📈 24h Vol: ${float(token.get('volume', {}).get('h24', 0)):,.0f}\n"
-                    f"💧 Liq: ${float(token.get('liquidity', {}).get('usd', 0)):,.0f}\n"
-                    f"📊 24h: {float(token.get('priceChange', {}).get('h24', 0)):+.1f}%\n"
-                )
-                
-                # Add score if available
-                if 'score' in token:
-                    token_info += f"⭐ Score: {token['score']:.1f}/10\n\n"
-                else:
-                    token_info += "\n"
-                
-                current_batch.append(token_info)
-                
-                if len(current_batch) == 10:
+            with metrics.span('render', view='flood'):
+                for i, token in enumerate(tokens, 1):
+                    current_batch.append(self._format_token(i, token))
+                    
+                    if len(current_batch) == 10:
+                        batch_message = ''.join(current_batch)
+                        message_batches.append(batch_message)
+                        current_batch = []
+                        
+                if current_batch:
                     batch_message = ''.join(current_batch)
                     message_batches.append(batch_message)
-                    current_batch = []
-                    
-            if current_batch:
-                batch_message = ''.join(current_batch)
-                message_batches.append(batch_message)
                 
             # Send batches for this category
             for batch in message_batches:
-                await update.message.reply_text(batch)
+                await self._reply(update, batch)
                 await asyncio.sleep(0.5)
         
-        await update.message.reply_text(f"✅ Found {total_tokens} tokens across {categories_with_tokens} categories.")
\ No newline at end of file
+        await self._reply(update, f"✅ Found {total_tokens} tokens across {categories_with_tokens} categories.")
+
+    async def _reply(self, update: Update, text: str, **kwargs):
+        """Reply to the update's message, timing the Telegram call"""
+        if self.http_client:
+            # Same pooled session as send_message; the result can still be edited in place
+            chat_id = update.effective_chat.id
+            result = await self.http_client.send_message(chat_id, text, parse_mode=kwargs.get('parse_mode'),
+                                                         reply_markup=kwargs.get('reply_markup'))
+            return SentMessage(self.http_client, chat_id, result)
+        with metrics.span('telegram_send', method='reply'):
+            return await update.message.reply_text(text, **kwargs)
\ No newline at end of file
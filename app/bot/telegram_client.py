@@ -0,0 +1,118 @@
+"""
+Pooled, non-blocking client for the Telegram Bot HTTP API.
+
+One aiohttp session with keep-alive is shared by the Lambda handler's status and
+error messages and the bot's replies, so messages reuse TCP/TLS connections
+and never block the event loop.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import aiohttp
+import app.config as config
+from app.services.metrics import metrics
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+class TelegramHTTPClient:
+    def __init__(self, token: str):
+        self.token = token
+        self.base_url = f"https://api.telegram.org/bot{token}"
+        self.session = None
+        self._queue: List[Tuple[str, str]] = []  # (chat_id, text) waiting for flush()
+        self.logger = logging.getLogger('TelegramHTTPClient')
+
+    async def init_session(self):
+        if not self.session:
+            connector = aiohttp.TCPConnector(
+                limit=config.TELEGRAM_POOL_SIZE,
+                keepalive_timeout=config.TELEGRAM_KEEPALIVE
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=config.TELEGRAM_HTTP_TIMEOUT)
+            )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def send_message(self, chat_id, text: str, parse_mode: Optional[str] = 'Markdown',
+                           reply_markup: Any = None) -> Optional[Dict]:
+        """Send one message; failures are logged, never raised"""
+        payload = {'chat_id': chat_id, 'text': text}
+        return await self._post('sendMessage', payload, parse_mode, reply_markup)
+
+    async def edit_message_text(self, chat_id, message_id: int, text: str, parse_mode: Optional[str] = None,
+                                reply_markup: Any = None) -> Optional[Dict]:
+        """Edit a message sent earlier; failures are logged, never raised"""
+        payload = {'chat_id': chat_id, 'message_id': message_id, 'text': text}
+        return await self._post('editMessageText', payload, parse_mode, reply_markup)
+
+    async def _post(self, method: str, payload: Dict, parse_mode: Optional[str], reply_markup: Any) -> Optional[Dict]:
+        await self.init_session()
+        if parse_mode:
+            payload['parse_mode'] = parse_mode
+        if reply_markup is not None:
+            # Accepts a plain dict or a python-telegram-bot markup object
+            payload['reply_markup'] = reply_markup.to_dict() if hasattr(reply_markup, 'to_dict') else reply_markup
+
+        try:
+            with metrics.span('telegram_send', method='http'):
+                async with self.session.post(f"{self.base_url}/{method}", json=payload) as response:
+                    data = await response.json()
+                if not data.get('ok'):
+                    self.logger.error(f"Telegram rejected {method}: {data.get('description')}")
+                else:
+                    self.logger.info(f"{method} done, status code: {response.status}")
+                return data
+        except Exception as e:
+            self.logger.error(f"Failed to call {method}: {str(e)}")
+            return None
+
+    def has_pending(self) -> bool:
+        """True if queued messages are waiting for flush()"""
+        return bool(self._queue)
+
+    def queue_message(self, chat_id, text: str):
+        """Buffer a status or error message until the next flush()"""
+        self._queue.append((str(chat_id), text))
+
+    async def flush(self) -> int:
+        """Send buffered messages, merging those for the same chat; returns messages sent"""
+        queued, self._queue = self._queue, []
+        merged: Dict[str, List[str]] = {}
+        for chat_id, text in queued:
+            chunks = merged.setdefault(chat_id, [])
+            if chunks and len(chunks[-1]) + len(text) + 2 <= MAX_MESSAGE_LENGTH:
+                chunks[-1] = f"{chunks[-1]}\n\n{text}"
+            else:
+                chunks.append(text[:MAX_MESSAGE_LENGTH])
+
+        sent = 0
+        for chat_id, chunks in merged.items():
+            for text in chunks:
+                await self.send_message(chat_id, text)
+                sent += 1
+        return sent
+
+
+class SentMessage:
+    """Message sent through TelegramHTTPClient that can be edited in place, like a PTB Message"""
+
+    def __init__(self, client: TelegramHTTPClient, chat_id, result: Optional[Dict]):
+        self.client = client
+        self.chat_id = chat_id
+        result = result or {}
+        message = result.get('result') if result.get('ok') else None
+        self.message_id = message.get('message_id') if isinstance(message, dict) else None
+
+    async def edit_text(self, text: str, parse_mode: Optional[str] = None, reply_markup: Any = None):
+        if self.message_id is None:
+            raise RuntimeError("Message was not delivered, so it can't be edited")
+        result = await self.client.edit_message_text(self.chat_id, self.message_id, text,
+                                                     parse_mode=parse_mode, reply_markup=reply_markup)
+        if not (result or {}).get('ok'):
+            raise RuntimeError(f"Telegram rejected the edit: {(result or {}).get('description')}")
+        return result
@@ -1 +1,10 @@
-from .enhanced_meme_token_classifier import EnhancedMemeTokenClassifier
\ No newline at end of file
+import app.config as config
+
+def create_classifier(name: str = None):
+    """Build the classifier called name ("enhanced" or "simple"; default config.DEFAULT_CLASSIFIER)"""
+    name = (name or config.DEFAULT_CLASSIFIER).lower()
+    if name == "simple":
+        from app.classifiers.simple_rule_classifier import SimpleRuleClassifier
+        return SimpleRuleClassifier()
+    from app.classifiers.enhanced_meme_token_classifier import EnhancedMemeTokenClassifier
+    return EnhancedMemeTokenClassifier()
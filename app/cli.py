@@ -0,0 +1,137 @@
+"""
+Headless batch scan.
+
+Runs TokenService.scan_tokens without building the bot (no Telegram imports) and
+streams classified tokens as JSON Lines or CSV while batches arrive. A full-universe
+scan keeps only its top K, which later pages can evict, so it is written once at the
+end and the output never holds tokens missing from the final result:
+
+    python -m app.cli --format jsonl > scan.jsonl
+    python -m app.cli --format csv --fields category,baseToken.symbol,liquidity.usd,score -o scan.csv
+    python -m app.cli --classifier simple --fields '*'
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+from time import monotonic
+import app.config as config
+
+DEFAULT_FIELDS = [
+    'category', 'baseToken.symbol', 'baseToken.address', 'priceUsd', 'liquidity.usd',
+    'volume.h24', 'priceChange.h24', 'score', 'url'
+]
+
+def get_field(token: Dict[str, Any], path: str) -> Any:
+    """Resolve a dotted path like 'liquidity.usd'; None if any part is missing"""
+    value: Any = token
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class TokenStreamWriter:
+    """Writes each classified token once, as soon as it is first seen"""
+
+    def __init__(self, out: TextIO, fmt: str = 'jsonl', fields: Optional[List[str]] = None):
+        self.out = out
+        self.format = fmt
+        self.fields = fields  # None: whole token (JSON Lines only)
+        self.written = 0
+        self._seen: Set[str] = set()
+        self._csv = None
+        if fmt == 'csv':
+            if fields is None:
+                raise ValueError("CSV output needs an explicit field list")
+            self._csv = csv.DictWriter(out, fieldnames=fields, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, categorized_tokens: Dict[str, List[Dict[str, Any]]]):
+        for category, tokens in categorized_tokens.items():
+            for token in tokens:
+                # Without an address the token object itself is the identity
+                key = token.get('pairAddress') or get_field(token, 'baseToken.address') or f"id:{id(token)}"
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                self._write_row(category, token)
+        self.out.flush()
+
+    def _write_row(self, category: str, token: Dict[str, Any]):
+        if self.fields is None:
+            row = dict(token, category=category)
+        else:
+            row = {field: category if field == 'category' else get_field(token, field) for field in self.fields}
+        if self._csv:
+            self._csv.writerow({k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in row.items()})
+        else:
+            self.out.write(json.dumps(row, default=str) + '\n')
+        self.written += 1
+
+
+def create_service(classifier_name: str):
+    """Build fetcher, classifier and service without touching the bot package"""
+    from app.services.token_service import create_token_service
+    return create_token_service(classifier_name)
+
+
+async def run_scan(service, writer: TokenStreamWriter, timeout: Optional[float] = None) -> int:
+    """Scan once, streaming tokens to writer; returns the number written"""
+    async def on_progress(batches_done: int, batches_total: int, partial_tokens):
+        writer.write(partial_tokens)
+
+    deadline = monotonic() + timeout if timeout else None
+    progress_callback = on_progress if service.partial_results_are_final else None
+    try:
+        categorized_tokens = await service.scan_tokens(progress_callback=progress_callback, max_age=0,
+                                                       deadline=deadline)
+        writer.write(categorized_tokens)
+    finally:
+        await service.shutdown()
+    return writer.written
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m app.cli', description="Run a headless token scan")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--fields', default=','.join(DEFAULT_FIELDS),
+                        help="comma-separated dotted paths, or '*' for whole tokens (jsonl only)")
+    parser.add_argument('--classifier', choices=['enhanced', 'simple'], default=config.DEFAULT_CLASSIFIER.lower())
+    parser.add_argument('-o', '--output', help="file to write to (default: stdout)")
+    parser.add_argument('--min-liquidity', type=float, default=config.MIN_LIQUIDITY)
+    parser.add_argument('--min-volume', type=float, default=config.MIN_VOLUME)
+    parser.add_argument('--timeout', type=float, default=None, help="stop fetching after this many seconds")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_args(argv)
+    # Logs go to stderr so stdout stays machine-readable
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format=config.LOG_FORMAT, stream=sys.stderr)
+    logger = logging.getLogger('CLI')
+
+    fields = None if args.fields.strip() == '*' else [f.strip() for f in args.fields.split(',') if f.strip()]
+    config.MIN_LIQUIDITY = args.min_liquidity
+    config.MIN_VOLUME = args.min_volume
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = TokenStreamWriter(out, args.format, fields)
+        written = asyncio.run(run_scan(create_service(args.classifier), writer, args.timeout))
+        logger.info(f"Wrote {written} tokens")
+        return 0
+    except Exception as e:
+        logger.error(f"Scan failed: {str(e)}")
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,6 +21,17 @@ BATCH_SIZE = 30
 MIN_LIQUIDITY = float(os.getenv("MIN_LIQUIDITY", "100000"))  # $100k min liquidity 
 MIN_VOLUME = float(os.getenv("MIN_VOLUME", "10000"))        # $10k min volume
 
+# Tiered refresh scheduling: seconds between refreshes per tier and tier thresholds
+REFRESH_HOT_INTERVAL = float(os.getenv("REFRESH_HOT_INTERVAL", "60"))
+REFRESH_WARM_INTERVAL = float(os.getenv("REFRESH_WARM_INTERVAL", "300"))
+REFRESH_COLD_INTERVAL = float(os.getenv("REFRESH_COLD_INTERVAL", "900"))
+REFRESH_HOT_VOLUME = 500000      # $ 24h volume
+REFRESH_HOT_SCORE = 7            # classifier score out of 10
+REFRESH_HOT_VOLATILITY = 10      # abs 1h price change, %
+REFRESH_COLD_VOLUME = 50000
+REFRESH_COLD_SCORE = 5
+REFRESH_COLD_VOLATILITY = 2
+
 # Telegram Bot settings
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TEST_TOKEN", "")  # Default to test token for local development
 BOT_TOKEN_PROD = os.getenv("TELEGRAM_BOT_TOKEN", "")  # Production token for AWS
@@ -28,6 +39,116 @@ BOT_TOKEN_PROD = os.getenv("TELEGRAM_BOT_TOKEN", "")  # Production token for AWS
 CHAT_ID = os.getenv("TELEGRAM_CHAT_TEST_ID", "")      # Default to test chat ID for local development
 CHAT_ID_PROD = os.getenv("TELEGRAM_CHAT_ID", "")      # Production chat ID for AWS
 
+# Scan results younger than this are reused instead of re-running the pipeline
+SCAN_RESULT_TTL = float(os.getenv("SCAN_RESULT_TTL", "30"))  # seconds
+
+# Warm snapshot refresher for the long-running bot (main.py)
+WARM_SCAN_ENABLED = os.getenv("WARM_SCAN_ENABLED", "true").lower() == "true"
+WARM_SCAN_INTERVAL = float(os.getenv("WARM_SCAN_INTERVAL", "120"))          # seconds at reference volatility
+WARM_SCAN_MIN_INTERVAL = float(os.getenv("WARM_SCAN_MIN_INTERVAL", "30"))
+WARM_SCAN_MAX_INTERVAL = float(os.getenv("WARM_SCAN_MAX_INTERVAL", "600"))
+WARM_SCAN_VOLATILITY_REFERENCE = float(os.getenv("WARM_SCAN_VOLATILITY_REFERENCE", "5"))  # median abs 1h change, %
+
+# Synchronous entry points (Lambda) run coroutines on one long-lived event loop
+SCAN_TIMEOUT = float(os.getenv("SCAN_TIMEOUT", "270"))             # seconds, below the 300s Lambda timeout
+SCAN_DEADLINE_MARGIN = float(os.getenv("SCAN_DEADLINE_MARGIN", "20"))  # seconds kept for classify + send
+LOOP_SHUTDOWN_TIMEOUT = float(os.getenv("LOOP_SHUTDOWN_TIMEOUT", "5"))
+
+# Webhook dispatch: "sync" runs the scan before answering, "async" enqueues it for a worker
+SCAN_DISPATCH_MODE = os.getenv("SCAN_DISPATCH_MODE", "sync").lower()
+SCAN_QUEUE_BACKEND = os.getenv("SCAN_QUEUE_BACKEND", "lambda")     # lambda | local
+SCAN_WORKER_FUNCTION = os.getenv("SCAN_WORKER_FUNCTION", "")       # defaults to this function
+
+# Webhook deduplication of Telegram retries
+DEDUP_BACKEND = os.getenv("DEDUP_BACKEND", "memory")                 # memory | dynamodb
+DEDUP_TABLE = os.getenv("DEDUP_TABLE", "token-scanner-dedup")
+DEDUP_UPDATE_TTL = float(os.getenv("DEDUP_UPDATE_TTL", "3600"))      # seconds an update ID is remembered
+DEDUP_SCAN_TTL = float(os.getenv("DEDUP_SCAN_TTL", "300"))           # max seconds a scan slot stays claimed
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "10000"))
+
+# Progressive scan settings: edit the status message in place as batches finish
+PROGRESSIVE_SCAN = os.getenv("PROGRESSIVE_SCAN", "true").lower() == "true"
+PROGRESS_EDIT_INTERVAL = float(os.getenv("PROGRESS_EDIT_INTERVAL", "1.5"))  # seconds between edits
+PROGRESS_TOP_TOKENS = int(os.getenv("PROGRESS_TOP_TOKENS", "5"))
+
+# Telegram HTTP client (pooled, keep-alive)
+TELEGRAM_HTTP_TIMEOUT = float(os.getenv("TELEGRAM_HTTP_TIMEOUT", "10"))  # seconds per request
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", "10"))
+TELEGRAM_KEEPALIVE = float(os.getenv("TELEGRAM_KEEPALIVE", "60"))        # seconds idle connections are kept
+
+# Latency metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", "TokenScanner")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Prometheus /metrics port for the polling bot; 0 disables
+
+# HTTP query API (python -m app.api.server)
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_RESULT_TTL = float(os.getenv("API_RESULT_TTL", "30"))  # seconds a scan is served before re-scanning
+
+# On-demand scan profiling (cProfile + tracemalloc)
+PROFILE_SCANS = os.getenv("PROFILE_SCANS", "false").lower() == "true"  # profile every scan
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "")               # empty: write report to the log
+PROFILE_TRACEBACK_DEPTH = 1
+
+# Multi-source fetching: "" keeps the classic Jupiter -> DexScreener fetcher,
+# otherwise a comma-separated list of jupiter, dexscreener, static
+DATA_SOURCES = os.getenv("DATA_SOURCES", "")
+SOURCE_TIMEOUT = float(os.getenv("SOURCE_TIMEOUT", "10"))  # seconds before a slow source is skipped
+STATIC_SOURCE_PATH = os.getenv("STATIC_SOURCE_PATH", "static_tokens.json")
+# Field -> source names in order of preference, as JSON, e.g. {"info": ["static", "dexscreener"]};
+# parsed by create_fetcher so a malformed value can't break imports
+SOURCE_PRECEDENCE = os.getenv("SOURCE_PRECEDENCE", "{}")
+
+# Sharded scanning across worker processes (0 or 1: single process)
+SCAN_SHARDS = int(os.getenv("SCAN_SHARDS", "0"))
+SHARD_VNODES = int(os.getenv("SHARD_VNODES", "64"))            # virtual nodes per shard on the hash ring
+SHARD_RATE_LIMIT = int(os.getenv("SHARD_RATE_LIMIT", "0"))     # requests/window per worker; 0 splits RATE_LIMIT_REQUESTS
+
+# Full-universe scanning: "trending" (Jupiter birdeye-trending) or "full" (the whole token list)
+SCAN_UNIVERSE = os.getenv("SCAN_UNIVERSE", "trending").lower()
+UNIVERSE_URL = os.getenv("UNIVERSE_URL", f"{JUPITER_BASE_URL}/tokens_with_markets")
+UNIVERSE_MIN_DAILY_VOLUME = float(os.getenv("UNIVERSE_MIN_DAILY_VOLUME", "10000"))  # metadata pre-filter
+UNIVERSE_SKIP_FREEZABLE = os.getenv("UNIVERSE_SKIP_FREEZABLE", "true").lower() == "true"
+UNIVERSE_TOP_K = int(os.getenv("UNIVERSE_TOP_K", "50"))     # tokens kept per category
+UNIVERSE_SPILL_DIR = os.getenv("UNIVERSE_SPILL_DIR", "")    # empty: system temp directory
+UNIVERSE_MAX_ELEMENT_BYTES = int(os.getenv("UNIVERSE_MAX_ELEMENT_BYTES", "1048576"))  # larger means a malformed list
+
+# Long-TTL token metadata cache (info blocks: socials, websites, image)
+METADATA_CACHE_TTL = float(os.getenv("METADATA_CACHE_TTL", "86400"))
+METADATA_CACHE_PATH = os.getenv("METADATA_CACHE_PATH", "")       # SQLite file; empty keeps it in memory
+METADATA_CACHE_DB_TIMEOUT = float(os.getenv("METADATA_CACHE_DB_TIMEOUT", "5"))  # seconds to wait on a locked file
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "100000"))
+
+# Blocklist of known rugs / scam addresses, applied before fetching
+BLOCKLIST_PATH = os.getenv("BLOCKLIST_PATH", "")                      # one address per line
+BLOCKLIST_OVERRIDES_PATH = os.getenv("BLOCKLIST_OVERRIDES_PATH", "")  # JSON file for /block and /unblock
+BLOCKLIST_CAPACITY = int(os.getenv("BLOCKLIST_CAPACITY", "1000000"))
+BLOCKLIST_ERROR_RATE = float(os.getenv("BLOCKLIST_ERROR_RATE", "0.001"))
+
+# Watchlist (/watch): shared high-frequency polling of specific tokens
+WATCHLIST_ENABLED = os.getenv("WATCHLIST_ENABLED", "true").lower() == "true"
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "20"))      # seconds
+# Watched tokens are refreshed by tier: hot ones every poll, quieter ones less often
+WATCH_WARM_INTERVAL = float(os.getenv("WATCH_WARM_INTERVAL", "60"))
+WATCH_COLD_INTERVAL = float(os.getenv("WATCH_COLD_INTERVAL", "180"))
+WATCH_BUDGET_SHARE = float(os.getenv("WATCH_BUDGET_SHARE", "0.25"))      # share of the DexScreener rate budget per poll
+WATCH_PRICE_CHANGE_PCT = float(os.getenv("WATCH_PRICE_CHANGE_PCT", "10")) # alert on a move this big since the last alert
+WATCH_LIQUIDITY_DROP_PCT = float(os.getenv("WATCH_LIQUIDITY_DROP_PCT", "30"))
+WATCH_MAX_PER_CHAT = int(os.getenv("WATCH_MAX_PER_CHAT", "20"))
+
+# /top and /filter answer from the latest snapshot; cap on listed results
+QUERY_MAX_RESULTS = int(os.getenv("QUERY_MAX_RESULTS", "30"))
+
+# Record/replay of upstream traffic: "" (live), "record" or "replay"
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "").lower()
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "cassettes")
+CASSETTE_TIMING = os.getenv("CASSETTE_TIMING", "original")  # replay with recorded latency, or "fast"
+
+# Telegram user IDs allowed to run admin commands (comma separated)
+ADMIN_USER_IDS = {int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+
 # Determine if we're running in production (AWS Lambda) or local
 IS_PRODUCTION = os.getenv("AWS_LAMBDA_FUNCTION_NAME") is not None
 
@@ -35,6 +156,12 @@ IS_PRODUCTION = os.getenv("AWS_LAMBDA_FUNCTION_NAME") is not None
 ACTIVE_BOT_TOKEN = BOT_TOKEN_PROD if IS_PRODUCTION else BOT_TOKEN
 ACTIVE_CHAT_ID = CHAT_ID_PROD if IS_PRODUCTION else CHAT_ID
 
+# Paginated results: browse the last scan with inline keyboards instead of a message flood.
+# Off by default on Lambda, where the cached scan does not outlive the invocation.
+PAGINATED_RESULTS = os.getenv("PAGINATED_RESULTS", "false" if IS_PRODUCTION else "true").lower() == "true"
+RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "5"))
+RESULTS_CACHE_TTL = float(os.getenv("RESULTS_CACHE_TTL", "900"))  # seconds a cached scan can be browsed
+
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -0,0 +1,151 @@
+"""
+Blocklist of known rugs and scam addresses, consulted before any fetch.
+
+Bulk lists (millions of addresses) live in a Bloom filter: about 1.8 MB per
+million addresses at a 0.1% false-positive rate, never a false negative. Entries
+added at runtime (e.g. via the bot's /block) go into an exact set with an expiry,
+and /unblock records an exact exception, since Bloom filters can't delete.
+"""
+from typing import Dict, Iterable, Optional
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+from time import time
+import app.config as config
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+class Blocklist:
+    def __init__(self, capacity: Optional[int] = None, error_rate: Optional[float] = None,
+                 overrides_path: Optional[str] = None):
+        self.bloom = BloomFilter(capacity or config.BLOCKLIST_CAPACITY, error_rate or config.BLOCKLIST_ERROR_RATE)
+        self.overrides_path = config.BLOCKLIST_OVERRIDES_PATH if overrides_path is None else overrides_path
+        self.logger = logging.getLogger('Blocklist')
+        self._blocked: Dict[str, Optional[float]] = {}  # address -> expires_at (None: never)
+        self._allowed: Dict[str, Optional[float]] = {}  # exceptions to the Bloom filter
+        self._load_overrides()
+
+    @staticmethod
+    def _key(address: str) -> str:
+        return address.strip().lower()
+
+    def load(self, addresses: Iterable[str]) -> int:
+        """Add a bulk list to the Bloom filter; returns how many were added"""
+        added = 0
+        for address in addresses:
+            if address.strip() and not address.startswith('#'):
+                self.bloom.add(self._key(address))
+                added += 1
+        self.logger.info(f"Loaded {added} blocked addresses ({self.bloom.nbytes / 1024:.0f} KiB filter)")
+        return added
+
+    def load_file(self, path: str) -> int:
+        with open(path) as f:
+            return self.load(f)
+
+    def block(self, address: str, ttl: Optional[float] = None):
+        """Block exactly, optionally for ttl seconds"""
+        key = self._key(address)
+        self._allowed.pop(key, None)
+        self._blocked[key] = time() + ttl if ttl else None
+        self._save_overrides()
+
+    def unblock(self, address: str, ttl: Optional[float] = None):
+        """Lift a block; overrides the Bloom filter too"""
+        key = self._key(address)
+        self._blocked.pop(key, None)
+        self._allowed[key] = time() + ttl if ttl else None
+        self._save_overrides()
+
+    def is_blocked(self, address: str) -> bool:
+        key = self._key(address)
+        now = time()
+        if self._live(self._allowed, key, now):
+            return False
+        if self._live(self._blocked, key, now):
+            return True
+        return key in self.bloom
+
+    __contains__ = is_blocked
+
+    @staticmethod
+    def _live(entries: Dict[str, Optional[float]], key: str, now: float) -> bool:
+        if key not in entries:
+            return False
+        expires_at = entries[key]
+        if expires_at is not None and expires_at <= now:
+            del entries[key]
+            return False
+        return True
+
+    def _load_overrides(self):
+        if not self.overrides_path or not os.path.exists(self.overrides_path):
+            return
+        try:
+            with open(self.overrides_path) as f:
+                data = json.load(f)
+            blocked, allowed = data.get('blocked', {}), data.get('allowed', {})
+            if not isinstance(blocked, dict) or not isinstance(allowed, dict):
+                raise ValueError("expected 'blocked' and 'allowed' objects")
+        except (OSError, ValueError, AttributeError) as e:
+            self.logger.warning(f"Ignoring unreadable blocklist overrides {self.overrides_path}: {str(e)}")
+            return
+        self._blocked = blocked
+        self._allowed = allowed
+
+    def _save_overrides(self):
+        if not self.overrides_path:
+            return
+        # Write a temp file and rename it over the old one so a crash never leaves half a file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.overrides_path)),
+                                        prefix='.blocklist-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'blocked': self._blocked, 'allowed': self._allowed}, f)
+            os.replace(tmp_path, self.overrides_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+_blocklist: Optional[Blocklist] = None
+
+def get_blocklist() -> Blocklist:
+    """Process-wide blocklist shared by the fetcher and the bot; loads BLOCKLIST_PATH once"""
+    global _blocklist
+    if _blocklist is None:
+        _blocklist = Blocklist()
+        if config.BLOCKLIST_PATH and os.path.exists(config.BLOCKLIST_PATH):
+            _blocklist.load_file(config.BLOCKLIST_PATH)
+    return _blocklist
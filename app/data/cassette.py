@@ -0,0 +1,186 @@
+"""
+Record/replay of upstream HTTP traffic.
+
+In record mode every GET the fetcher makes goes to the real API and the response
+is stored in a cassette directory:
+
+    <dir>/index.jsonl                 one line per request: key, status, elapsed, body digest
+    <dir>/bodies/<sha256>.json.gz     gzip-compressed response bodies, stored once per content
+
+In replay mode the same requests are answered from the cassette, either with the
+recorded latency ("original") or immediately ("fast"), with no network access.
+Repeated requests for the same URL are answered in recording order.
+"""
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlencode
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from time import monotonic, time
+import aiohttp
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode for a request the cassette never saw"""
+    pass
+
+
+class Cassette:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.bodies_dir = os.path.join(directory, 'bodies')
+        self.index_path = os.path.join(directory, 'index.jsonl')
+        self.logger = logging.getLogger('Cassette')
+        self.entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._replay_position: Dict[str, int] = defaultdict(int)
+        self._load()
+
+    @staticmethod
+    def request_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return f"{method.upper()} {url}"
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry['key']].append(entry)
+        self.logger.info(f"Loaded {sum(len(e) for e in self.entries.values())} recorded requests from {self.directory}")
+
+    def record(self, key: str, status: int, body: bytes, elapsed: float, content_type: Optional[str] = None):
+        """Store body under its digest (once) and append an index entry"""
+        digest = hashlib.sha256(body).hexdigest()
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            with gzip.open(body_path, 'wb') as f:
+                f.write(body)
+
+        entry = {'key': key, 'status': status, 'elapsed': round(elapsed, 4), 'digest': digest,
+                 'content_type': content_type, 'recorded_at': time()}
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        self.entries[key].append(entry)
+
+    def next_entry(self, key: str) -> Dict[str, Any]:
+        """Next recorded response for key; the last one repeats once they run out"""
+        entries = self.entries.get(key)
+        if not entries:
+            raise CassetteMiss(key)
+        position = self._replay_position[key]
+        self._replay_position[key] = position + 1
+        return entries[min(position, len(entries) - 1)]
+
+    def body(self, digest: str) -> bytes:
+        with gzip.open(self._body_path(digest), 'rb') as f:
+            return f.read()
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.bodies_dir, f"{digest}.json.gz")
+
+
+class _CassetteContent:
+    """The subset of aiohttp.StreamReader used to stream large bodies"""
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self._body), n):
+            yield self._body[start:start + n]
+
+
+class CassetteResponse:
+    """The subset of aiohttp.ClientResponse the fetcher and universe scanner use"""
+
+    def __init__(self, status: int, body: bytes, content_type: Optional[str] = None):
+        self.status = status
+        self.content_type = content_type or 'application/json'
+        self._body = body
+        self.content = _CassetteContent(body)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode('utf-8')
+
+    async def json(self, **kwargs) -> Any:
+        return json.loads(self._body)
+
+
+class _CassetteRequest:
+    def __init__(self, session: 'CassetteSession', url: str, params: Optional[Dict], kwargs: Dict):
+        self.session = session
+        self.url = url
+        self.params = params
+        self.kwargs = kwargs
+
+    async def __aenter__(self) -> CassetteResponse:
+        return await self.session._request('GET', self.url, self.params, self.kwargs)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class CassetteSession:
+    """
+    Drop-in for the fetcher's aiohttp.ClientSession (GET only) that records to
+    or replays from a Cassette.
+    """
+
+    def __init__(self, cassette: Cassette, mode: str, timing: str = 'original',
+                 session: Optional[aiohttp.ClientSession] = None):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.cassette = cassette
+        self.mode = mode
+        self.timing = timing
+        self._session = session
+        self.logger = logging.getLogger('Cassette')
+
+    @property
+    def replaying_fast(self) -> bool:
+        """True when responses are served without any simulated latency"""
+        return self.mode == REPLAY and self.timing == 'fast'
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> _CassetteRequest:
+        return _CassetteRequest(self, url, params, kwargs)
+
+    async def _request(self, method: str, url: str, params: Optional[Dict], kwargs: Dict) -> CassetteResponse:
+        key = Cassette.request_key(method, url, params)
+        if self.mode == REPLAY:
+            entry = self.cassette.next_entry(key)
+            if self.timing == 'original' and entry['elapsed'] > 0:
+                await asyncio.sleep(entry['elapsed'])
+            return CassetteResponse(entry['status'], self.cassette.body(entry['digest']), entry.get('content_type'))
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        started = monotonic()
+        async with self._session.request(method, url, params=params, **kwargs) as response:
+            body = await response.read()
+            status, content_type = response.status, response.content_type
+        self.cassette.record(key, status, body, monotonic() - started, content_type)
+        return CassetteResponse(status, body, content_type)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def open_cassette_session(mode: str, directory: str, timing: str = 'original') -> CassetteSession:
+    """Build a recording or replaying session over the cassette in directory"""
+    logging.getLogger('Cassette').info(f"Cassette {mode} mode ({timing} timing) using {directory}")
+    return CassetteSession(Cassette(directory), mode.lower(), timing)
@@ -1,10 +1,14 @@
 import aiohttp
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Callable, Awaitable
 from decimal import Decimal
 import logging
 import asyncio
-from time import time
+from time import time, monotonic
 import app.config as config
+from app.services.metrics import metrics
+from app.data.cassette import open_cassette_session
+from app.data.metadata_cache import MetadataCache
+from app.data.blocklist import get_blocklist
 
 class DexScreenerFetcher:
     def __init__(self):
@@ -16,17 +20,32 @@ class DexScreenerFetcher:
         self.BATCH_SIZE = config.BATCH_SIZE
         self.RATE_LIMIT_REQUESTS = config.RATE_LIMIT_REQUESTS
         self.RATE_LIMIT_WINDOW = config.RATE_LIMIT_WINDOW
+        # False while replaying a cassette at full speed: nothing goes to the network
+        self.throttle = True
+        # Batches completed vs. planned in the last get_validated_tokens call
+        self.last_scan_progress = {'batches_done': 0, 'batches_total': 0}
+        # Slow-changing token metadata, shared across scans
+        self.metadata_cache = MetadataCache()
+        self.blocklist = get_blocklist()
    
     async def init_session(self):
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            if config.CASSETTE_MODE:
+                self.session = open_cassette_session(config.CASSETTE_MODE, config.CASSETTE_DIR, config.CASSETTE_TIMING)
+                self.throttle = not self.session.replaying_fast
+            else:
+                self.session = aiohttp.ClientSession()
+                self.throttle = True
    
     async def close(self):
         if self.session:
             await self.session.close()
             self.session = None
+        self.metadata_cache.flush()
 
     async def _respect_rate_limit(self):
+        if not self.throttle:
+            return
         current_time = time()
         time_since_last = current_time - self.last_request_time
         if time_since_last < (self.RATE_LIMIT_WINDOW / self.RATE_LIMIT_REQUESTS):
@@ -39,23 +58,29 @@ class DexScreenerFetcher:
         try:
             url = f"{self.jupiter_base_url}/tokens"
             params = {'tags': 'birdeye-trending'}
-            async with self.session.get(url, params=params) as response:
-                data = await response.json()
+            with metrics.span('jupiter_trending'):
+                async with self.session.get(url, params=params) as response:
+                    data = await response.json()
                 self.logger.info(f"Found {len(data)} trending tokens on Jupiter")
                 return data
         except Exception as e:
             self.logger.error(f"Error fetching Jupiter trending: {str(e)}")
             return []
 
+    async def get_universe(self) -> List[Dict]:
+        """Tokens to scan; the classic pipeline scans Jupiter trending"""
+        return await self.get_jupiter_trending()
+
     async def get_dex_data_batch(self, addresses: List[str]) -> List[Dict]:
         """Get full DexScreener data for batch of addresses"""
         await self._respect_rate_limit()
         try:
             addresses_str = ','.join(addresses)
             url = f"{self.dex_base_url}/tokens/{addresses_str}"
-            async with self.session.get(url) as response:
-                data = await response.json()
-                return data.get('pairs', [])
+            with metrics.span('dex_batch'):
+                async with self.session.get(url) as response:
+                    data = await response.json()
+            return data.get('pairs', [])
         except Exception as e:
             self.logger.error(f"Error fetching DexScreener batch: {str(e)}")
             return []
@@ -75,8 +100,14 @@ class DexScreenerFetcher:
             if 'pairCreatedAt' not in processed_pair:
                 processed_pair['pairCreatedAt'] = pair.get('createAt', 0)
 
-            # Add default socials structure if not present
-            if 'info' not in processed_pair:
+            # Token metadata comes from the long-lived cache; a pair without 'info'
+            # reuses what an earlier fetch saw, and an unchanged one shares the cached object
+            address = pair.get('baseToken', {}).get('address')
+            if address and 'info' in pair:
+                processed_pair['info'] = self.metadata_cache.put(address, pair['info'])
+            elif address and (cached := self.metadata_cache.get(address)) is not None:
+                processed_pair['info'] = cached
+            else:
                 processed_pair['info'] = {'socials': []}
 
             return processed_pair
@@ -85,16 +116,40 @@ class DexScreenerFetcher:
             return {}
 
     def chunk_addresses(self, tokens: List[Dict]) -> List[List[str]]:
-        """Split Jupiter tokens into address batches"""
-        addresses = [token['address'] for token in tokens]
+        """Split Jupiter tokens into address batches, leaving out blocklisted addresses"""
+        addresses = [token['address'] for token in tokens if not self.blocklist.is_blocked(token['address'])]
+        if len(addresses) < len(tokens):
+            self.logger.info(f"Skipped {len(tokens) - len(addresses)} blocklisted tokens")
         return [addresses[i:i + self.BATCH_SIZE] 
                 for i in range(0, len(addresses), self.BATCH_SIZE)]
 
-    async def get_validated_tokens(self, min_liquidity: float = 10000, min_volume: float = 1000) -> List[Dict]:
-        """Get validated tokens from Jupiter and DexScreener"""
-        await self.init_session()
+    async def get_validated_tokens(self, min_liquidity: float = 10000, min_volume: float = 1000,
+                                   on_batch: Optional[Callable[[int, int, List[Dict]], Awaitable[None]]] = None,
+                                   deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Get validated tokens from Jupiter and DexScreener.
+        If on_batch is given it is awaited after every batch with
+        (batches_done, batches_total, validated_tokens_so_far).
+        If deadline (a time.monotonic() value) is given, batches that can't finish
+        in time are skipped or cancelled and the tokens gathered so far are returned;
+        last_scan_progress tells how many batches made it.
+        """
+        self.last_scan_progress = {'batches_done': 0, 'batches_total': 0}
         # Get trending tokens from Jupiter
-        jupiter_tokens = await self.get_jupiter_trending()
+        try:
+            jupiter_tokens = await self._before_deadline(self.get_universe(), deadline)
+        except asyncio.TimeoutError:
+            self.logger.warning("Deadline reached while fetching Jupiter trending")
+            return []
+
+        return await self.validate_tokens(jupiter_tokens, min_liquidity, min_volume, on_batch, deadline)
+
+    async def validate_tokens(self, jupiter_tokens: List[Dict], min_liquidity: float = 10000, min_volume: float = 1000,
+                              on_batch: Optional[Callable[[int, int, List[Dict]], Awaitable[None]]] = None,
+                              deadline: Optional[float] = None) -> List[Dict]:
+        """Fetch DexScreener data for the given Jupiter tokens and keep the pairs meeting the criteria"""
+        self.last_scan_progress = {'batches_done': 0, 'batches_total': 0}
+        await self.init_session()
         validated_tokens = []
 
         if not jupiter_tokens:
@@ -102,10 +157,25 @@ class DexScreenerFetcher:
 
         # Process in batches
         address_batches = self.chunk_addresses(jupiter_tokens)
+        self.last_scan_progress['batches_total'] = len(address_batches)
+        batch_durations = []
         
-        for batch in address_batches:
+        for batch_index, batch in enumerate(address_batches, 1):
+            # Don't start a batch that the deadline won't let finish
+            if deadline is not None and batch_durations:
+                expected = sum(batch_durations) / len(batch_durations)
+                if deadline - monotonic() < expected:
+                    self.logger.warning(f"Deadline reached, stopping after {batch_index - 1}/{len(address_batches)} batches")
+                    break
+
             self.logger.info(f"Processing batch of {len(batch)} tokens...")
-            dex_pairs = await self.get_dex_data_batch(batch)
+            started = monotonic()
+            try:
+                dex_pairs = await self._before_deadline(self.get_dex_data_batch(batch), deadline)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Deadline reached, cancelled batch {batch_index}/{len(address_batches)}")
+                break
+            batch_durations.append(monotonic() - started)
             
             # Process each pair and maintain DexScreener format
             for pair in dex_pairs:
@@ -125,8 +195,24 @@ class DexScreenerFetcher:
                             }
                         validated_tokens.append(processed_pair)
 
+            self.metadata_cache.flush()
+            self.last_scan_progress['batches_done'] = batch_index
+            if on_batch:
+                await on_batch(batch_index, len(address_batches), validated_tokens)
+
         return validated_tokens
 
+    @staticmethod
+    async def _before_deadline(coro, deadline: Optional[float]):
+        """Await coro, cancelling it with TimeoutError once deadline passes"""
+        if deadline is None:
+            return await coro
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            coro.close()
+            raise asyncio.TimeoutError()
+        return await asyncio.wait_for(coro, remaining)
+
     def _meets_basic_criteria(self, pair: Dict, min_liquidity: float, min_volume: float) -> bool:
         """Check if pair meets basic quality criteria"""
         try:
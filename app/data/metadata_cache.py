@@ -0,0 +1,97 @@
+"""
+Long-lived token metadata, kept apart from minute-by-minute market data.
+
+A token's 'info' block (socials, websites, image) rarely changes, so it is
+cached per base-token address for METADATA_CACHE_TTL seconds and shared by
+reference between scans instead of being held once per scan. Pairs that arrive
+without an 'info' block fall back to the cached one. With METADATA_CACHE_PATH
+set, entries persist across restarts in SQLite; shard workers may share the
+file, so a locked database is waited on and then logged rather than raised.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import logging
+import sqlite3
+from time import time
+import app.config as config
+
+class MetadataCache:
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = config.METADATA_CACHE_PATH if path is None else path
+        self.ttl = config.METADATA_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or config.METADATA_CACHE_MAX_ENTRIES
+        self.logger = logging.getLogger('MetadataCache')
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # address -> (stored_at, metadata)
+        self._pending: List[Tuple[str, float, str]] = []
+        self._db: Optional[sqlite3.Connection] = None
+        if self.path:
+            try:
+                self._db = sqlite3.connect(self.path, timeout=config.METADATA_CACHE_DB_TIMEOUT)
+                self._db.execute("CREATE TABLE IF NOT EXISTS metadata "
+                                 "(address TEXT PRIMARY KEY, stored_at REAL, metadata TEXT)")
+            except sqlite3.Error as e:
+                self.logger.warning(f"Metadata cache {self.path} unavailable, keeping it in memory: {str(e)}")
+                self._db = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, address: str) -> Optional[Dict[str, Any]]:
+        """Cached metadata for address, or None if unknown or older than the TTL"""
+        address = address.lower()
+        entry = self._entries.get(address)
+        if entry is None and self._db is not None:
+            try:
+                row = self._db.execute("SELECT stored_at, metadata FROM metadata WHERE address = ?",
+                                       (address,)).fetchone()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Metadata cache read failed: {str(e)}")
+                row = None
+            if row:
+                entry = self._entries[address] = (row[0], json.loads(row[1]))
+        if entry is None or time() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def put(self, address: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Store metadata and return the cached object; unchanged metadata keeps the existing object"""
+        address = address.lower()
+        now = time()
+        entry = self._entries.get(address)
+        if entry is not None and entry[1] == metadata:
+            metadata = entry[1]
+            # Only refresh the timestamp once in a while rather than rewriting on every scan
+            if now - entry[0] < self.ttl / 2:
+                return metadata
+        self._entries[address] = (now, metadata)
+        if self._db is not None:
+            self._pending.append((address, now, json.dumps(metadata)))
+        if len(self._entries) > self.max_entries:
+            self._evict()
+        return metadata
+
+    def flush(self):
+        """Write pending entries to SQLite; on failure they are kept for the next flush"""
+        if self._db is None or not self._pending:
+            return
+        try:
+            self._db.executemany("INSERT OR REPLACE INTO metadata (address, stored_at, metadata) VALUES (?, ?, ?)",
+                                 self._pending)
+            self._db.commit()
+        except sqlite3.Error as e:
+            self._db.rollback()
+            self.logger.warning(f"Metadata cache flush of {len(self._pending)} entries failed: {str(e)}")
+            return
+        self._pending = []
+
+    def _evict(self):
+        """Drop the oldest tenth of the in-memory entries (they stay in SQLite)"""
+        oldest = sorted(self._entries, key=lambda address: self._entries[address][0])
+        for address in oldest[:max(1, len(oldest) // 10)]:
+            del self._entries[address]
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,127 @@
+"""
+Tiered refresh scheduling on top of DexScreenerFetcher.
+
+Hot tokens (high volume, high score or volatile) are refreshed more often than
+cold ones, and every DexScreener batch is packed with the most overdue addresses
+so the fixed rate budget goes where it buys the most freshness.
+"""
+from typing import Dict, List, Optional, Iterable
+import logging
+import math
+from time import time
+from app.data.fetcher import DexScreenerFetcher
+import app.config as config
+
+class TieredRefreshScheduler:
+    def __init__(self, fetcher: DexScreenerFetcher):
+        self.fetcher = fetcher
+        self.tier_intervals = {
+            'hot': config.REFRESH_HOT_INTERVAL,
+            'warm': config.REFRESH_WARM_INTERVAL,
+            'cold': config.REFRESH_COLD_INTERVAL
+        }
+        # address -> {'tier', 'last_refreshed', 'volume', 'score', 'volatility'}
+        self.entries: Dict[str, Dict] = {}
+        self.logger = logging.getLogger('RefreshScheduler')
+
+    def track(self, addresses: Iterable[str]):
+        """Start tracking addresses; new ones are due immediately"""
+        for address in addresses:
+            self.entries.setdefault(address, {
+                'tier': 'warm', 'last_refreshed': 0.0, 'volume': 0.0, 'score': 0.0, 'volatility': 0.0
+            })
+
+    def untrack(self, address: str):
+        self.entries.pop(address, None)
+
+    def assign_tier(self, volume: float, score: float, volatility: float) -> str:
+        """Pick a refresh tier from 24h volume, classifier score and 1h volatility"""
+        if volume >= config.REFRESH_HOT_VOLUME or score >= config.REFRESH_HOT_SCORE \
+                or volatility >= config.REFRESH_HOT_VOLATILITY:
+            return 'hot'
+        if volume < config.REFRESH_COLD_VOLUME and score < config.REFRESH_COLD_SCORE \
+                and volatility < config.REFRESH_COLD_VOLATILITY:
+            return 'cold'
+        return 'warm'
+
+    def observe(self, tokens: List[Dict], now: Optional[float] = None):
+        """Update tiers from freshly fetched (or classified) pairs"""
+        now = now if now is not None else time()
+
+        # Several pairs can share a base token; the highest volume pair wins
+        best: Dict[str, tuple] = {}
+        for token in tokens:
+            address = token.get('baseToken', {}).get('address')
+            if address not in self.entries:
+                continue
+            volume = self._to_float(token.get('volume', {}).get('h24', 0))
+            if address not in best or volume > best[address][0]:
+                best[address] = (volume, token)
+
+        for address, (volume, token) in best.items():
+            entry = self.entries[address]
+            entry['volume'] = volume
+            entry['volatility'] = abs(self._to_float(token.get('priceChange', {}).get('h1', 0)))
+            if 'score' in token:
+                entry['score'] = self._to_float(token['score'])
+            entry['last_refreshed'] = now
+            entry['tier'] = self.assign_tier(entry['volume'], entry['score'], entry['volatility'])
+
+    @staticmethod
+    def _to_float(value) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def overdue(self, address: str, now: Optional[float] = None) -> float:
+        """How many refresh intervals have passed since the address was last refreshed"""
+        entry = self.entries[address]
+        if not entry['last_refreshed']:
+            return math.inf
+        now = now if now is not None else time()
+        return (now - entry['last_refreshed']) / self.tier_intervals[entry['tier']]
+
+    def budget_batches(self, period: float) -> int:
+        """Number of DexScreener batches the rate limit allows within period seconds"""
+        return int(period * self.fetcher.RATE_LIMIT_REQUESTS / self.fetcher.RATE_LIMIT_WINDOW)
+
+    def next_batches(self, max_batches: int, now: Optional[float] = None) -> List[List[str]]:
+        """Pack up to max_batches batches with the most overdue addresses"""
+        now = now if now is not None else time()
+        due = [(self.overdue(address, now), address) for address in self.entries]
+        due = [item for item in due if item[0] >= 1]
+        due.sort(key=lambda item: item[0], reverse=True)
+
+        batch_size = self.fetcher.BATCH_SIZE
+        addresses = [address for _, address in due[:max_batches * batch_size]]
+        return [addresses[i:i + batch_size] for i in range(0, len(addresses), batch_size)]
+
+    async def refresh_due(self, max_batches: int, now: Optional[float] = None) -> List[Dict]:
+        """Fetch the most overdue addresses and return their processed pairs"""
+        batches = self.next_batches(max_batches, now)
+        if not batches:
+            return []
+
+        await self.fetcher.init_session()
+        refreshed = []
+        for batch in batches:
+            pairs = [self.fetcher.process_dex_pair(pair) for pair in await self.fetcher.get_dex_data_batch(batch)]
+            pairs = [pair for pair in pairs if pair]
+            refresh_time = now if now is not None else time()
+
+            # Addresses without pairs still count as refreshed so they don't hog every batch
+            for address in batch:
+                if address in self.entries:
+                    self.entries[address]['last_refreshed'] = refresh_time
+            self.observe(pairs, refresh_time)
+            refreshed.extend(pairs)
+
+        self.logger.info(f"Refreshed {sum(len(b) for b in batches)} addresses in {len(batches)} batches")
+        return refreshed
+
+    def tier_counts(self) -> Dict[str, int]:
+        counts = {tier: 0 for tier in self.tier_intervals}
+        for entry in self.entries.values():
+            counts[entry['tier']] += 1
+        return counts
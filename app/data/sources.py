@@ -0,0 +1,303 @@
+"""
+Pluggable data sources merged per address.
+
+Universe sources (trending lists, static lists) say which tokens to look at;
+enrichment sources (pair data, metadata) return fields per address. Every
+source of a kind is queried concurrently under its own timeout, so a slow or
+failing feed costs at most its timeout and only drops its own fields. Per-field
+precedence decides which source wins when several supply the same field.
+"""
+from abc import ABC
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import json
+import logging
+from time import monotonic
+from app.data.fetcher import DexScreenerFetcher
+import app.config as config
+
+class DataSource(ABC):
+    """Base class for data sources; override whichever methods the source supports"""
+    name = 'source'
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout if timeout is not None else config.SOURCE_TIMEOUT
+
+    async def list_tokens(self) -> List[Dict[str, Any]]:
+        """Tokens this source contributes to the universe (each with an 'address')"""
+        return []
+
+    async def get_records(self, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fields per address (lower case) for the given addresses"""
+        return {}
+
+    async def close(self):
+        pass
+
+
+class JupiterTrendingSource(DataSource):
+    name = 'jupiter'
+
+    def __init__(self, fetcher: DexScreenerFetcher, timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.fetcher = fetcher
+
+    async def list_tokens(self) -> List[Dict[str, Any]]:
+        return await self.fetcher.get_jupiter_trending()
+
+
+class DexScreenerSource(DataSource):
+    """Pair data; the most liquid pair represents each token"""
+    name = 'dexscreener'
+
+    def __init__(self, fetcher: DexScreenerFetcher, timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.fetcher = fetcher
+
+    async def get_records(self, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        await self.fetcher.init_session()
+        records: Dict[str, Dict[str, Any]] = {}
+        for pair in await self.fetcher.get_dex_data_batch(addresses):
+            address = pair.get('baseToken', {}).get('address', '').lower()
+            if not address:
+                continue
+            current = records.get(address)
+            if current is None or _liquidity(pair) > _liquidity(current):
+                processed = self.fetcher.process_dex_pair(pair)
+                if processed:
+                    records[address] = processed
+        return records
+
+    async def close(self):
+        await self.fetcher.close()
+
+
+class StaticSource(DataSource):
+    """Fixed tokens and records, e.g. a local JSON file or test fixtures"""
+
+    def __init__(self, tokens: Optional[List[Dict[str, Any]]] = None,
+                 records: Optional[Dict[str, Dict[str, Any]]] = None,
+                 name: str = 'static', timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.name = name
+        self.tokens = tokens or []
+        self.records = {address.lower(): record for address, record in (records or {}).items()}
+
+    @classmethod
+    def from_file(cls, path: str, name: str = 'static') -> 'StaticSource':
+        """Load {"tokens": [...], "records": {address: {...}}} from a JSON file"""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get('tokens'), data.get('records'), name=name)
+
+    async def list_tokens(self) -> List[Dict[str, Any]]:
+        return list(self.tokens)
+
+    async def get_records(self, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {a.lower(): self.records[a.lower()] for a in addresses if a.lower() in self.records}
+
+
+def _liquidity(pair: Dict[str, Any]) -> float:
+    try:
+        return float(pair.get('liquidity', {}).get('usd', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def merge_records(records_by_source: Dict[str, Dict[str, Any]], order: Sequence[str],
+                  precedence: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, Any]:
+    """
+    Merge one address's records field by field. For each top-level field the first
+    source in precedence[field] that has a value wins, then the default source order.
+    """
+    precedence = precedence or {}
+    merged: Dict[str, Any] = {}
+    fields = {field for record in records_by_source.values() for field in record}
+    for field in fields:
+        for name in list(precedence.get(field, ())) + list(order):
+            record = records_by_source.get(name)
+            if record is not None and record.get(field) is not None:
+                merged[field] = record[field]
+                break
+    return merged
+
+
+class MultiSourceFetcher(DexScreenerFetcher):
+    """
+    Drop-in for DexScreenerFetcher that builds the universe and the token records
+    from several concurrently queried sources.
+    """
+
+    def __init__(self, universe_sources: List[DataSource], enrichment_sources: List[DataSource],
+                 precedence: Optional[Dict[str, Sequence[str]]] = None):
+        super().__init__()
+        self.universe_sources = universe_sources
+        self.enrichment_sources = enrichment_sources
+        self.precedence = precedence or {}
+        self.logger = logging.getLogger('MultiSource')
+        # Timeouts and errors per source name, for monitoring
+        self.source_failures = Counter()
+
+    async def init_session(self):
+        pass
+
+    async def close(self):
+        closed = set()
+        for source in self.universe_sources + self.enrichment_sources:
+            if id(source) not in closed:
+                closed.add(id(source))
+                await source.close()
+
+    async def _query(self, source: DataSource, method: str, *args) -> Any:
+        """Call one source under its timeout; None if it was slow or failed"""
+        try:
+            return await asyncio.wait_for(getattr(source, method)(*args), source.timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Source {source.name} timed out after {source.timeout}s")
+        except Exception as e:
+            self.logger.warning(f"Source {source.name} failed: {str(e)}")
+        self.source_failures[source.name] += 1
+        return None
+
+    async def get_universe(self) -> List[Dict[str, Any]]:
+        """All universe sources concurrently, de-duplicated by address (first source wins, tags merged)"""
+        results = await asyncio.gather(*(self._query(s, 'list_tokens') for s in self.universe_sources))
+        universe: Dict[str, Dict[str, Any]] = {}
+        for tokens in results:
+            for token in tokens or []:
+                address = token.get('address')
+                if not address:
+                    continue
+                existing = universe.get(address.lower())
+                if existing is None:
+                    universe[address.lower()] = dict(token)
+                else:
+                    existing['tags'] = sorted(set(existing.get('tags', [])) | set(token.get('tags', [])))
+        self.logger.info(f"Universe of {len(universe)} tokens from {len(self.universe_sources)} sources")
+        return list(universe.values())
+
+    async def get_batch_records(self, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """All enrichment sources concurrently for one batch, merged per address"""
+        results = await asyncio.gather(*(self._query(s, 'get_records', addresses) for s in self.enrichment_sources))
+        order = [source.name for source in self.enrichment_sources]
+        merged = {}
+        for address in addresses:
+            by_source = {name: records[address.lower()] for name, records in zip(order, results)
+                         if records and address.lower() in records}
+            if by_source:
+                merged[address.lower()] = merge_records(by_source, order, self.precedence)
+        return merged
+
+    async def get_validated_tokens(self, min_liquidity: float = 10000, min_volume: float = 1000,
+                                   on_batch=None, deadline: Optional[float] = None) -> List[Dict]:
+        """Same contract as DexScreenerFetcher.get_validated_tokens"""
+        self.last_scan_progress = {'batches_done': 0, 'batches_total': 0}
+        try:
+            universe = await self._before_deadline(self.get_universe(), deadline)
+        except asyncio.TimeoutError:
+            self.logger.warning("Deadline reached while building the universe")
+            return []
+        return await self.validate_tokens(universe, min_liquidity, min_volume, on_batch, deadline)
+
+    async def validate_tokens(self, universe: List[Dict], min_liquidity: float = 10000, min_volume: float = 1000,
+                              on_batch=None, deadline: Optional[float] = None) -> List[Dict]:
+        """Same contract as DexScreenerFetcher.validate_tokens: enrich the given tokens from every source"""
+        self.last_scan_progress = {'batches_done': 0, 'batches_total': 0}
+        if not universe:
+            return []
+
+        address_batches = self.chunk_addresses(universe)
+        self.last_scan_progress['batches_total'] = len(address_batches)
+        universe_by_address = {token['address'].lower(): token for token in universe}
+        validated_tokens = []
+        batch_durations = []
+
+        for batch_index, batch in enumerate(address_batches, 1):
+            if deadline is not None and batch_durations:
+                if deadline - monotonic() < sum(batch_durations) / len(batch_durations):
+                    self.logger.warning(f"Deadline reached, stopping after {batch_index - 1}/{len(address_batches)} batches")
+                    break
+
+            started = monotonic()
+            try:
+                records = await self._before_deadline(self.get_batch_records(batch), deadline)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Deadline reached, cancelled batch {batch_index}/{len(address_batches)}")
+                break
+            batch_durations.append(monotonic() - started)
+
+            for address in batch:
+                record = records.get(address.lower())
+                if record and self._meets_basic_criteria(record, min_liquidity, min_volume):
+                    universe_token = universe_by_address[address.lower()]
+                    record['jupiter_data'] = {
+                        'tags': universe_token.get('tags', []),
+                        'daily_volume': universe_token.get('daily_volume', 0)
+                    }
+                    validated_tokens.append(record)
+
+            self.last_scan_progress['batches_done'] = batch_index
+            if on_batch:
+                await on_batch(batch_index, len(address_batches), validated_tokens)
+
+        return validated_tokens
+
+
+def pair_fetcher(fetcher: DexScreenerFetcher) -> DexScreenerFetcher:
+    """
+    The DexScreener fetcher behind fetcher, for direct pair lookups (e.g. the
+    watchlist) that should share its session and rate budget; a multi-source
+    fetcher without a dexscreener source gets a fresh one.
+    """
+    if isinstance(fetcher, MultiSourceFetcher):
+        for source in fetcher.enrichment_sources:
+            if isinstance(source, DexScreenerSource):
+                return source.fetcher
+        return DexScreenerFetcher()
+    return fetcher
+
+
+def parse_precedence(raw: str) -> Dict[str, List[str]]:
+    """Parse config.SOURCE_PRECEDENCE; a malformed value logs a warning and means no precedence"""
+    try:
+        precedence = json.loads(raw or "{}")
+        if not isinstance(precedence, dict) or \
+                not all(isinstance(names, list) for names in precedence.values()):
+            raise ValueError("expected an object of field -> list of source names")
+        return precedence
+    except ValueError as e:
+        logging.getLogger('MultiSource').warning(f"Ignoring invalid SOURCE_PRECEDENCE ({str(e)}), using {{}}")
+        return {}
+
+
+def create_fetcher(data_sources: Optional[str] = None, precedence: Optional[str] = None,
+                   rate_limit: Optional[int] = None) -> DexScreenerFetcher:
+    """
+    The fetcher selected by data_sources (default config.DATA_SOURCES): empty means
+    the classic Jupiter -> DexScreener pipeline, otherwise a comma-separated list of
+    jupiter, dexscreener and static (reads STATIC_SOURCE_PATH). precedence defaults
+    to config.SOURCE_PRECEDENCE; rate_limit overrides the DexScreener request budget.
+    """
+    data_sources = config.DATA_SOURCES if data_sources is None else data_sources
+    names = [name.strip().lower() for name in data_sources.split(',') if name.strip()]
+    dex_fetcher = DexScreenerFetcher()  # one session and rate budget for both DexScreener-backed sources
+    if rate_limit:
+        dex_fetcher.RATE_LIMIT_REQUESTS = rate_limit
+    if not names:
+        return dex_fetcher
+
+    universe_sources, enrichment_sources = [], []
+    for name in names:
+        if name == 'jupiter':
+            universe_sources.append(JupiterTrendingSource(dex_fetcher))
+        elif name == 'dexscreener':
+            enrichment_sources.append(DexScreenerSource(dex_fetcher))
+        elif name == 'static':
+            source = StaticSource.from_file(config.STATIC_SOURCE_PATH)
+            universe_sources.append(source)
+            enrichment_sources.append(source)
+        else:
+            raise ValueError(f"Unknown data source: {name}")
+    precedence = config.SOURCE_PRECEDENCE if precedence is None else precedence
+    return MultiSourceFetcher(universe_sources, enrichment_sources, parse_precedence(precedence))
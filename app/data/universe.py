@@ -0,0 +1,207 @@
+"""
+Full-universe scanning beyond the trending list.
+
+The complete Jupiter token list is streamed and parsed one object at a time,
+cheaply pre-filtered on its metadata, and the survivors are spilled to a JSONL
+file on disk. Enrichment then pages through the spill file in DexScreener-sized
+batches under the fetcher's rate limit, classifying each page and keeping only
+the top K tokens per category. Memory therefore stays flat no matter how large
+the universe is.
+"""
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import asyncio
+import codecs
+import heapq
+import itertools
+import json
+import logging
+import os
+import tempfile
+from time import monotonic
+import aiohttp
+import app.config as config
+from app.data.cassette import open_cassette_session
+from app.data.fetcher import DexScreenerFetcher
+
+class JSONArrayStream:
+    """Incremental parser yielding the elements of a top-level JSON array as chunks arrive"""
+
+    def __init__(self, max_buffer: Optional[int] = None):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._started = False
+        self.finished = False
+        # A decode error can't tell an element cut at a chunk boundary from bad JSON, so cap the wait
+        self.max_buffer = max_buffer or config.UNIVERSE_MAX_ELEMENT_BYTES
+
+    def feed(self, chunk: bytes) -> Iterator[Any]:
+        self._buffer += self._utf8.decode(chunk)
+        pos = 0
+        buffer = self._buffer
+        while not self.finished:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not self._started:
+                if buffer[pos] != '[':
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                self.finished = True
+                pos += 1
+                break
+            try:
+                element, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # element continues in the next chunk
+            pos = end
+            yield element
+        self._buffer = buffer[pos:]
+        if len(self._buffer) > self.max_buffer:
+            raise ValueError(f"Malformed JSON array: no complete element in {len(self._buffer)} characters")
+
+    def close(self):
+        """Call at end of input; raises if the array was cut off or left unparsed data"""
+        self._buffer += self._utf8.decode(b'', final=True)
+        if not self.finished or self._buffer.strip():
+            raise ValueError(f"Truncated or malformed JSON array ({len(self._buffer.strip())} characters unparsed)")
+
+
+class UniverseScanner:
+    def __init__(self, fetcher, classifier, top_k: Optional[int] = None):
+        self.fetcher = fetcher
+        self.classifier = classifier
+        self.top_k = top_k or config.UNIVERSE_TOP_K
+        # The token list is downloaded on a session of our own; a multi-source fetcher has none
+        self.session = None
+        self.logger = logging.getLogger('UniverseScanner')
+        self.stats = {'listed': 0, 'candidates': 0, 'validated': 0}
+
+    def prefilter(self, token: Dict[str, Any]) -> bool:
+        """Metadata-only screen applied before any DexScreener call"""
+        if not token.get('address'):
+            return False
+        try:
+            if float(token.get('daily_volume') or 0) < config.UNIVERSE_MIN_DAILY_VOLUME:
+                return False
+        except (TypeError, ValueError):
+            return False
+        # A live freeze authority lets the issuer freeze holders' tokens (honeypot risk)
+        if config.UNIVERSE_SKIP_FREEZABLE and token.get('freeze_authority'):
+            return False
+        return True
+
+    async def init_session(self):
+        if not self.session:
+            if config.CASSETTE_MODE:
+                self.session = open_cassette_session(config.CASSETTE_MODE, config.CASSETTE_DIR, config.CASSETTE_TIMING)
+            else:
+                self.session = aiohttp.ClientSession()
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def iter_universe_chunks(self) -> AsyncIterator[bytes]:
+        await self.init_session()
+        async with self.session.get(config.UNIVERSE_URL) as response:
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                yield chunk
+
+    async def spill_candidates(self, spill, deadline: Optional[float] = None) -> int:
+        """Stream the token list into the spill file, keeping only pre-filter survivors"""
+        parser = JSONArrayStream()
+        candidates = 0
+        chunks = self.iter_universe_chunks()
+        try:
+            while True:
+                try:
+                    chunk = await DexScreenerFetcher._before_deadline(chunks.__anext__(), deadline)
+                except StopAsyncIteration:
+                    parser.close()
+                    break
+                except asyncio.TimeoutError:
+                    # Scan what was downloaded so far rather than nothing
+                    self.logger.warning(f"Deadline reached while downloading the token list after {self.stats['listed']} tokens")
+                    break
+                for token in parser.feed(chunk):
+                    self.stats['listed'] += 1
+                    if self.prefilter(token):
+                        spill.write(json.dumps({
+                            'address': token['address'],
+                            'tags': token.get('tags', []),
+                            'daily_volume': token.get('daily_volume', 0),
+                        }) + '\n')
+                        candidates += 1
+        finally:
+            await chunks.aclose()
+        spill.flush()
+        self.stats['candidates'] = candidates
+        self.logger.info(f"{candidates} of {self.stats['listed']} listed tokens passed the metadata pre-filter")
+        return candidates
+
+    @staticmethod
+    def _read_pages(spill, page_size: int) -> Iterator[List[Dict[str, Any]]]:
+        spill.seek(0)
+        lines = (json.loads(line) for line in spill if line.strip())
+        while True:
+            page = list(itertools.islice(lines, page_size))
+            if not page:
+                return
+            yield page
+
+    async def scan(self, deadline: Optional[float] = None, on_page=None) -> Dict[str, Any]:
+        """
+        Scan the full universe; returns {'categorized', 'pages_done', 'pages_total'}.
+        on_page is awaited after every page with (pages_done, pages_total, top_so_far).
+        """
+        from app.services.token_service import classify_tokens
+
+        self.stats = {'listed': 0, 'candidates': 0, 'validated': 0}
+        heaps: Dict[str, List] = {}
+        counter = itertools.count()  # tie-breaker so tokens are never compared
+        pages_done = 0
+        page_size = self.fetcher.BATCH_SIZE
+
+        with tempfile.TemporaryFile('w+', dir=config.UNIVERSE_SPILL_DIR or None) as spill:
+            candidates = await self.spill_candidates(spill, deadline)
+            pages_total = -(-candidates // page_size)
+            page_durations = []
+
+            for page in self._read_pages(spill, page_size):
+                if deadline is not None:
+                    expected = sum(page_durations) / len(page_durations) if page_durations else 0.0
+                    if deadline - monotonic() <= expected:
+                        self.logger.warning(f"Deadline reached after {pages_done}/{pages_total} pages")
+                        break
+                started = monotonic()
+                validated = await self.fetcher.validate_tokens(page, config.MIN_LIQUIDITY, config.MIN_VOLUME,
+                                                               deadline=deadline)
+                page_durations.append(monotonic() - started)
+                self.stats['validated'] += len(validated)
+
+                if validated:
+                    for category, tokens in classify_tokens(self.classifier, validated).items():
+                        heap = heaps.setdefault(category, [])
+                        for token in tokens:
+                            entry = (token.get('score', 0), next(counter), token)
+                            if len(heap) < self.top_k:
+                                heapq.heappush(heap, entry)
+                            elif entry[0] > heap[0][0]:
+                                heapq.heapreplace(heap, entry)
+                pages_done += 1
+                if on_page:
+                    await on_page(pages_done, pages_total, self._ranked(heaps))
+
+        return {'categorized': self._ranked(heaps), 'pages_done': pages_done, 'pages_total': pages_total}
+
+    @staticmethod
+    def _ranked(heaps: Dict[str, List]) -> Dict[str, List[Dict[str, Any]]]:
+        return {category: [token for _, _, token in sorted(heap, key=lambda e: (-e[0], e[1]))]
+                for category, heap in heaps.items()}
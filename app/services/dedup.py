@@ -0,0 +1,138 @@
+"""
+Deduplication of Telegram webhook deliveries.
+
+Telegram retries a webhook until it gets a timely 200, so a slow /scan can
+arrive several times. Processed update IDs and in-flight scan keys are kept in
+a bounded, time-expiring store that is shared by warm invocations and can be
+backed by DynamoDB to share it across instances.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import heapq
+import logging
+from time import time
+import app.config as config
+
+class DedupStore(ABC):
+    """Base class for dedup key stores"""
+
+    @abstractmethod
+    def add_if_absent(self, key: str, ttl: float) -> bool:
+        """Atomically record key for ttl seconds; False if it is already present"""
+        pass
+
+    @abstractmethod
+    def discard(self, key: str) -> None:
+        """Forget key before it expires"""
+        pass
+
+
+class InMemoryDedupStore(DedupStore):
+    """Bounded per-process store; the oldest keys are evicted first"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or config.DEDUP_MAX_ENTRIES
+        self._expiry = OrderedDict()  # key -> expires_at, in insertion order
+        self._deadlines: List[Tuple[float, str]] = []  # (expires_at, key) min-heap; may hold stale entries
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def add_if_absent(self, key: str, ttl: float) -> bool:
+        now = time()
+        self._prune(now)
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at > now:
+            return False
+
+        self._expiry.pop(key, None)
+        self._expiry[key] = now + ttl
+        heapq.heappush(self._deadlines, (now + ttl, key))
+        while len(self._expiry) > self.max_entries:
+            self._expiry.popitem(last=False)
+        return True
+
+    def discard(self, key: str) -> None:
+        self._expiry.pop(key, None)
+
+    def _prune(self, now: float):
+        # Update and scan keys have different TTLs, so expiry order isn't insertion order
+        while self._deadlines and self._deadlines[0][0] <= now:
+            expires_at, key = heapq.heappop(self._deadlines)
+            # Skip heap entries for keys since discarded, evicted or re-added
+            if self._expiry.get(key) == expires_at:
+                del self._expiry[key]
+
+
+class DynamoDBDedupStore(DedupStore):
+    """Store shared across instances using conditional writes on a DynamoDB table"""
+
+    def __init__(self, table_name: Optional[str] = None):
+        self.table_name = table_name or config.DEDUP_TABLE
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            # boto3 ships with the Lambda runtime; only import it when used
+            import boto3
+            self._client = boto3.client('dynamodb')
+        return self._client
+
+    def add_if_absent(self, key: str, ttl: float) -> bool:
+        now = int(time())
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={'pk': {'S': key}, 'expires_at': {'N': str(now + int(ttl))}},
+                # Expired items may linger until DynamoDB's TTL sweeper removes them
+                ConditionExpression='attribute_not_exists(pk) OR expires_at < :now',
+                ExpressionAttributeValues={':now': {'N': str(now)}}
+            )
+            return True
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def discard(self, key: str) -> None:
+        self.client.delete_item(TableName=self.table_name, Key={'pk': {'S': key}})
+
+
+class UpdateDeduplicator:
+    def __init__(self, store: DedupStore):
+        self.store = store
+        self.logger = logging.getLogger('UpdateDeduplicator')
+
+    def is_duplicate_update(self, update_id) -> bool:
+        """True if this update ID was already processed"""
+        if update_id is None:
+            return False
+        duplicate = not self.store.add_if_absent(f"update:{update_id}", config.DEDUP_UPDATE_TTL)
+        if duplicate:
+            self.logger.info(f"Dropping duplicate update {update_id}")
+        return duplicate
+
+    def claim_scan(self, chat_id) -> bool:
+        """Claim the in-flight scan slot for a chat; False if a scan is already running"""
+        claimed = self.store.add_if_absent(f"scan:{chat_id}", config.DEDUP_SCAN_TTL)
+        if not claimed:
+            self.logger.info(f"Scan already in flight for chat {chat_id}")
+        return claimed
+
+    def forget_update(self, update_id) -> None:
+        """Let a retry of update_id through again, e.g. after its processing failed"""
+        if update_id is not None:
+            self.store.discard(f"update:{update_id}")
+
+    def release_scan(self, chat_id) -> None:
+        self.store.discard(f"scan:{chat_id}")
+
+
+def create_dedup_store(backend: Optional[str] = None) -> DedupStore:
+    """Build the store configured by DEDUP_BACKEND ('memory' or 'dynamodb')"""
+    backend = (backend or config.DEDUP_BACKEND).lower()
+    if backend == 'memory':
+        return InMemoryDedupStore()
+    if backend == 'dynamodb':
+        return DynamoDBDedupStore()
+    raise ValueError(f"Unknown dedup backend: {backend}")
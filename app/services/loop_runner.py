@@ -0,0 +1,110 @@
+"""
+Long-lived event loop for synchronous entry points such as the Lambda handler.
+
+A new loop per call throws away the aiohttp session, caches and any background
+tasks. LoopRunner keeps one loop per process so everything attached to it
+survives across warm invocations, and closes it cleanly when the runtime
+recycles the container.
+"""
+from typing import Any, Awaitable, Callable, List, Optional
+import asyncio
+import atexit
+import logging
+import signal
+import app.config as config
+
+class LoopRunner:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._shutdown_callbacks: List[Callable[[], Awaitable[Any]]] = []
+        self._close_requested = False
+        self.logger = logging.getLogger('LoopRunner')
+
+    @property
+    def closed(self) -> bool:
+        return self.loop.is_closed()
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine to completion on the shared loop, cancelling it after timeout seconds"""
+        if self.closed:
+            raise RuntimeError("LoopRunner is closed")
+        if timeout is not None:
+            coro = asyncio.wait_for(coro, timeout)
+        asyncio.set_event_loop(self.loop)
+        try:
+            return self.loop.run_until_complete(coro)
+        finally:
+            if self._close_requested:
+                self.close()
+
+    def request_close(self):
+        """Close from inside a running loop: stop it now and close once run() unwinds"""
+        self._close_requested = True
+        self.loop.stop()
+
+    def add_shutdown_callback(self, callback: Callable[[], Awaitable[Any]]):
+        """Register a coroutine function (e.g. a session close) to await on shutdown"""
+        self._shutdown_callbacks.append(callback)
+
+    def close(self):
+        """Run shutdown callbacks, cancel leftover tasks and close the loop"""
+        if self.closed:
+            return
+        try:
+            for callback in self._shutdown_callbacks:
+                try:
+                    self.loop.run_until_complete(asyncio.wait_for(callback(), config.LOOP_SHUTDOWN_TIMEOUT))
+                except Exception as e:
+                    self.logger.warning(f"Shutdown callback failed: {str(e)}")
+
+            pending = [task for task in asyncio.all_tasks(self.loop) if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            self.loop.close()
+            self.logger.info("Event loop closed")
+
+
+_runner: Optional[LoopRunner] = None
+_hooks_installed = False
+
+def get_loop_runner() -> LoopRunner:
+    """Return the process-wide runner, creating it on first use"""
+    global _runner, _hooks_installed
+    if _runner is None or _runner.closed:
+        _runner = LoopRunner()
+    if not _hooks_installed:
+        # Once per process: the hooks close whichever runner is current at exit
+        _hooks_installed = True
+        atexit.register(_close_runner)
+        _install_sigterm_handler()
+    return _runner
+
+def _close_runner():
+    if _runner is not None:
+        _runner.close()
+
+def _install_sigterm_handler():
+    # Lambda sends SIGTERM before recycling a container; close the loop before exiting
+    try:
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            if _runner is not None and not _runner.closed:
+                if _runner.loop.is_running():
+                    # The loop can't be closed from inside run_until_complete
+                    _runner.request_close()
+                else:
+                    _runner.close()
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    except ValueError:
+        # Signal handlers can only be installed from the main thread
+        pass
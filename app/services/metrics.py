@@ -0,0 +1,153 @@
+"""
+Low-overhead latency instrumentation.
+
+Spans record their duration into fixed-bucket histograms keyed by stage name and
+dimensions. The registry can be exported as CloudWatch Embedded Metric Format
+log lines (Lambda) or Prometheus text (long-running bot).
+"""
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import bisect
+import json
+import logging
+import time
+import app.config as config
+
+# Upper bounds in milliseconds; the last bucket is +Inf
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile: the upper bound of the bucket holding it"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = None):
+        self.namespace = namespace or config.METRICS_NAMESPACE
+        self.enabled = config.METRICS_ENABLED
+        # (stage, sorted dimension items) -> Histogram
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self.logger = logging.getLogger('Metrics')
+
+    def observe(self, stage: str, value_ms: float, **dimensions):
+        if not self.enabled:
+            return
+        key = (stage, tuple(sorted((k, str(v)) for k, v in dimensions.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value_ms)
+
+    @contextmanager
+    def span(self, stage: str, **dimensions):
+        """Time a block (sync or inside a coroutine) and record it under stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - started) * 1000, **dimensions)
+
+    def reset(self):
+        self.histograms.clear()
+
+    def to_emf(self) -> List[str]:
+        """One CloudWatch Embedded Metric Format line per stage/dimension set"""
+        lines = []
+        timestamp = int(time.time() * 1000)
+        for (stage, dimensions), histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            dimension_names = [name for name, _ in dimensions]
+            metric_name = f"{stage}_ms"
+            record = {
+                '_aws': {
+                    'Timestamp': timestamp,
+                    'CloudWatchMetrics': [{
+                        'Namespace': self.namespace,
+                        'Dimensions': [dimension_names],
+                        'Metrics': [{'Name': metric_name, 'Unit': 'Milliseconds'}]
+                    }]
+                },
+                # EMF statistic sets keep the line small regardless of call count
+                metric_name: {
+                    'Min': histogram.min, 'Max': histogram.max,
+                    'Sum': histogram.sum, 'Count': histogram.count
+                }
+            }
+            record.update(dict(dimensions))
+            lines.append(json.dumps(record))
+        return lines
+
+    def flush_emf(self):
+        """Print EMF lines to stdout (picked up by CloudWatch Logs) and reset"""
+        for line in self.to_emf():
+            print(line, flush=True)
+        self.reset()
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition of every histogram"""
+        lines = []
+        by_stage: Dict[str, List] = {}
+        for (stage, dimensions), histogram in self.histograms.items():
+            by_stage.setdefault(stage, []).append((dimensions, histogram))
+
+        for stage, series in sorted(by_stage.items()):
+            name = f"{self.namespace.lower().replace('-', '_')}_{stage}_ms"
+            lines.append(f"# TYPE {name} histogram")
+            for dimensions, histogram in series:
+                labels = [f'{k}="{v}"' for k, v in dimensions]
+                cumulative = 0
+                for bound, bucket_count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                    cumulative += bucket_count
+                    bucket_labels = ','.join(labels + [f'le="{bound}"'])
+                    lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative}")
+                label_text = f"{{{','.join(labels)}}}" if labels else ""
+                lines.append(f"{name}_sum{label_text} {histogram.sum:.3f}")
+                lines.append(f"{name}_count{label_text} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the instrumented code paths
+metrics = MetricsRegistry()
+
+
+async def start_metrics_server(port: Optional[int] = None, registry: MetricsRegistry = None):
+    """Serve /metrics in Prometheus text format from the running event loop"""
+    from aiohttp import web
+
+    registry = registry or metrics
+
+    async def handle_metrics(request):
+        return web.Response(text=registry.to_prometheus(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '0.0.0.0', port or config.METRICS_PORT)
+    await site.start()
+    return runner
@@ -0,0 +1,84 @@
+"""
+On-demand profiling of a single scan.
+
+Wraps one pipeline run in cProfile (CPU) and tracemalloc (allocations) and
+produces a top-N report. Nothing here runs unless a scan is explicitly profiled.
+"""
+from typing import Any, Awaitable, Optional, Tuple
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+import app.config as config
+
+class ScanProfiler:
+    def __init__(self, top_n: Optional[int] = None, output_dir: Optional[str] = None):
+        self.top_n = top_n or config.PROFILE_TOP_N
+        self.output_dir = output_dir if output_dir is not None else config.PROFILE_OUTPUT_DIR
+        self.logger = logging.getLogger('ScanProfiler')
+
+    async def profile(self, coro: Awaitable[Any]) -> Tuple[Any, str]:
+        """
+        Await coro under CPU and allocation profiling; returns (result, report).
+        cProfile is per thread, so other tasks running on the loop meanwhile show up too.
+        """
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start(config.PROFILE_TRACEBACK_DEPTH)
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+
+        profiler.enable()
+        try:
+            result = await coro
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+
+        report = self._format_report(profiler, snapshot, elapsed, peak)
+        return result, report
+
+    def _format_report(self, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot,
+                       elapsed: float, peak_bytes: int) -> str:
+        cpu = io.StringIO()
+        stats = pstats.Stats(profiler, stream=cpu)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        allocation_lines = [
+            f"{i:>3}. {stat.size / 1024:10.1f} KiB {stat.count:>8} blocks  {stat.traceback[0]}"
+            for i, stat in enumerate(snapshot.statistics('lineno')[:self.top_n], 1)
+        ]
+
+        return "\n".join([
+            f"Scan profile: {elapsed:.3f}s wall, peak traced memory {peak_bytes / 1024 / 1024:.2f} MiB",
+            "",
+            f"=== Top {self.top_n} functions by cumulative time ===",
+            cpu.getvalue().strip(),
+            "",
+            f"=== Top {self.top_n} allocation sites ===",
+            *allocation_lines,
+        ])
+
+    def write_report(self, report: str) -> Optional[str]:
+        """Write the report to PROFILE_OUTPUT_DIR, or log it when no directory is set"""
+        if not self.output_dir:
+            self.logger.info(report)
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"scan-profile-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+        with open(path, 'w') as f:
+            f.write(report)
+        self.logger.info(f"Scan profile written to {path}")
+        return path
@@ -0,0 +1,74 @@
+"""
+Pluggable queue for deferred scan jobs.
+
+In async dispatch mode the webhook handler only validates the update and
+enqueues a job; a worker invocation picks the job up and runs the scan.
+"""
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Optional
+import json
+import logging
+import os
+import app.config as config
+
+# Event source marking a Lambda invocation as a scan worker
+SCAN_JOB_SOURCE = 'scan-worker'
+
+class ScanJobQueue(ABC):
+    """Base class for scan job queues"""
+
+    @abstractmethod
+    def enqueue(self, job: Dict) -> None:
+        """Hand a scan job to a worker; must return quickly"""
+        pass
+
+
+class InProcessScanQueue(ScanJobQueue):
+    """Local stand-in that holds jobs in memory until drained"""
+
+    def __init__(self):
+        self.jobs = deque()
+
+    def enqueue(self, job: Dict) -> None:
+        self.jobs.append(job)
+
+    def drain(self, worker: Callable[[Dict], None]) -> int:
+        """Run every queued job through worker, returning how many ran"""
+        count = 0
+        while self.jobs:
+            worker(self.jobs.popleft())
+            count += 1
+        return count
+
+
+class LambdaInvokeScanQueue(ScanJobQueue):
+    """Re-invokes this Lambda asynchronously with the job as the worker payload"""
+
+    def __init__(self, function_name: Optional[str] = None):
+        self.function_name = function_name or config.SCAN_WORKER_FUNCTION or os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+        self._client = None
+        self.logger = logging.getLogger('ScanQueue')
+
+    @property
+    def client(self):
+        if self._client is None:
+            # boto3 ships with the Lambda runtime; only import it when dispatching
+            import boto3
+            self._client = boto3.client('lambda')
+        return self._client
+
+    def enqueue(self, job: Dict) -> None:
+        payload = json.dumps({'source': SCAN_JOB_SOURCE, 'job': job})
+        self.client.invoke(FunctionName=self.function_name, InvocationType='Event', Payload=payload.encode('utf-8'))
+        self.logger.info(f"Queued scan job for chat {job.get('chat_id')} on {self.function_name}")
+
+
+def create_scan_queue(backend: Optional[str] = None) -> ScanJobQueue:
+    """Build the queue configured by SCAN_QUEUE_BACKEND ('lambda' or 'local')"""
+    backend = (backend or config.SCAN_QUEUE_BACKEND).lower()
+    if backend == 'local':
+        return InProcessScanQueue()
+    if backend == 'lambda':
+        return LambdaInvokeScanQueue()
+    raise ValueError(f"Unknown scan queue backend: {backend}")
@@ -0,0 +1,186 @@
+"""
+Sharded scanning across worker processes.
+
+The coordinator builds the universe once from the configured fetcher (classic
+or multi-source), partitions addresses over a consistent-hash ring and hands
+each shard to a worker. Every worker has its own event loop, HTTP session and
+rate budget but the same data sources; it fetches, validates and classifies its
+shard and returns the categories, which the coordinator merges.
+
+Shards run through a ShardExecutor. The local one is a process pool on this
+machine; a queue-backed executor (SQS, Lambda, ...) can replace it to spread
+shards over several nodes, since jobs and results are plain JSON-able dicts.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import asyncio
+import bisect
+import hashlib
+import logging
+import multiprocessing
+from time import monotonic
+from app.classifiers.base import TokenClassifier as BaseClassifier
+from app.data.blocklist import get_blocklist
+from app.data.fetcher import DexScreenerFetcher
+from app.services.snapshot import ScanSnapshot
+from app.services.token_service import TokenService, classify_tokens
+from app.services.metrics import metrics
+import app.config as config
+
+class HashRing:
+    """Consistent-hash ring: adding a shard only moves ~1/N of the addresses"""
+
+    def __init__(self, shards: int, vnodes: Optional[int] = None):
+        self.shards = shards
+        self.vnodes = vnodes or config.SHARD_VNODES
+        points = sorted((self._hash(f"shard-{shard}#{v}"), shard)
+                        for shard in range(shards) for v in range(self.vnodes))
+        self._hashes = [h for h, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def shard_for(self, address: str) -> int:
+        index = bisect.bisect(self._hashes, self._hash(address.lower())) % len(self._hashes)
+        return self._owners[index]
+
+    def partition(self, tokens: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        shards: List[List[Dict[str, Any]]] = [[] for _ in range(self.shards)]
+        for token in tokens:
+            shards[self.shard_for(token['address'])].append(token)
+        return shards
+
+
+def run_shard(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker entry point: scan one shard in a fresh event loop"""
+    return asyncio.run(_scan_shard(job))
+
+
+async def _scan_shard(job: Dict[str, Any]) -> Dict[str, Any]:
+    from app.classifiers import create_classifier
+    from app.data.sources import create_fetcher
+    # Same sources and precedence as the coordinator, under this worker's share of the budget
+    fetcher = create_fetcher(job.get('data_sources'), job.get('source_precedence'), rate_limit=job['rate_limit'])
+    deadline = monotonic() + job['time_budget'] if job.get('time_budget') else None
+    try:
+        tokens = await fetcher.validate_tokens(job['tokens'], job['min_liquidity'], job['min_volume'],
+                                               deadline=deadline)
+    finally:
+        await fetcher.close()
+    categorized = classify_tokens(create_classifier(job['classifier']), tokens) if tokens else {}
+    return {'shard': job['shard'], 'categorized': categorized, **fetcher.last_scan_progress}
+
+
+class ShardExecutor(ABC):
+    """Runs shard jobs somewhere and returns their results"""
+
+    @abstractmethod
+    async def run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        pass
+
+    async def close(self):
+        pass
+
+
+class LocalProcessExecutor(ShardExecutor):
+    """Process pool on this machine; processes are spawned once and reused"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if self._pool is None:
+            # spawn, not fork: the parent has a running loop, sessions and scheduler threads
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return await asyncio.get_running_loop().run_in_executor(self._pool, run_shard, job)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class ShardedTokenService(TokenService):
+    """TokenService whose pipeline fans the universe out over shard workers"""
+
+    def __init__(self, fetcher: DexScreenerFetcher, classifier: BaseClassifier, shards: int,
+                 executor: Optional[ShardExecutor] = None, classifier_name: Optional[str] = None):
+        super().__init__(fetcher, classifier)
+        self.ring = HashRing(shards)
+        self.executor = executor or LocalProcessExecutor(shards)
+        # Workers build their own classifier by name
+        self.classifier_name = classifier_name or config.DEFAULT_CLASSIFIER
+        # Each worker gets its share of the host's budget unless a per-worker budget is set
+        self.shard_rate_limit = config.SHARD_RATE_LIMIT or max(1, config.RATE_LIMIT_REQUESTS // shards)
+        self.logger = logging.getLogger('ShardedTokenService')
+
+    async def _scan_pipeline(self, deadline: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        try:
+            universe = await self.fetcher._before_deadline(self.fetcher.get_universe(), deadline)
+        except asyncio.TimeoutError:
+            self.logger.warning("Deadline reached while building the universe")
+            return {}
+        if not universe:
+            self.logger.warning("No tokens found")
+            self.latest_snapshot = ScanSnapshot({})
+            return self.latest_snapshot.categorized_tokens
+
+        # Workers load the blocklist from disk at spawn; runtime /block entries only live here
+        blocklist = get_blocklist()
+        universe = [token for token in universe if not blocklist.is_blocked(token['address'])]
+
+        shards = self.ring.partition(universe)
+        self.logger.info(f"Scanning {len(universe)} tokens in {len(shards)} shards: {[len(s) for s in shards]}")
+        jobs = [
+            {
+                'shard': index,
+                'tokens': tokens,
+                'min_liquidity': config.MIN_LIQUIDITY,
+                'min_volume': config.MIN_VOLUME,
+                'classifier': self.classifier_name,
+                'rate_limit': self.shard_rate_limit,
+                'data_sources': config.DATA_SOURCES,
+                'source_precedence': config.SOURCE_PRECEDENCE,
+                # Remaining seconds rather than a monotonic value, which may not be comparable on another node
+                'time_budget': max(0.0, deadline - monotonic()) if deadline is not None else None,
+            }
+            for index, tokens in enumerate(shards) if tokens
+        ]
+
+        merged: Dict[str, List[Dict[str, Any]]] = {}
+        batches_done = batches_total = 0
+        with metrics.span('sharded_scan', shards=len(jobs)):
+            for shards_done, next_result in enumerate(asyncio.as_completed([self._run_job(job) for job in jobs]), 1):
+                job, result = await next_result
+                if result is None:
+                    # Count the lost shard's batches as missing so the snapshot reads as partial
+                    batches_total += -(-len(job['tokens']) // self.fetcher.BATCH_SIZE)
+                    continue
+                batches_done += result.get('batches_done', 0)
+                batches_total += result.get('batches_total', 0)
+                for category, tokens in result['categorized'].items():
+                    merged.setdefault(category, []).extend(tokens)
+                await self._notify_listeners(shards_done, len(jobs), merged)
+
+        for tokens in merged.values():
+            tokens.sort(key=lambda token: token.get('score', 0), reverse=True)
+
+        total_tokens = sum(len(tokens) for tokens in merged.values())
+        self.logger.info(f"Found {total_tokens} tokens across {len([c for c, t in merged.items() if t])} categories")
+        self.latest_snapshot = ScanSnapshot(merged, batches_done, batches_total)
+        return merged
+
+    async def _run_job(self, job: Dict[str, Any]):
+        try:
+            return job, await self.executor.run(job)
+        except Exception as e:
+            self.logger.error(f"Shard {job['shard']} failed: {str(e)}")
+            return job, None
+
+    async def shutdown(self):
+        await self.executor.close()
+        await super().shutdown()
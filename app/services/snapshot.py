@@ -0,0 +1,48 @@
+"""
+In-memory snapshot of a completed scan, shared by everything that reads results.
+"""
+import time
+from typing import Dict, List, Any, Optional
+from app.services.snapshot_index import SnapshotIndex
+
+
+class ScanSnapshot:
+    def __init__(self, categorized_tokens: Dict[str, List[Dict[str, Any]]],
+                 batches_done: Optional[int] = None, batches_total: Optional[int] = None):
+        """Wrap categorized scan results with the time they were produced"""
+        self.categorized_tokens = categorized_tokens
+        self.batches_done = batches_done
+        self.batches_total = batches_total
+        self.created_at = time.time()
+        # Short id carried in result-page buttons so they keep pointing at this scan
+        self.snapshot_id = format(int(self.created_at * 1000), 'x')
+        self._created_monotonic = time.monotonic()
+        self._index = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the scan finished"""
+        return time.monotonic() - self._created_monotonic
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(len(tokens) for tokens in self.categorized_tokens.values())
+
+    @property
+    def partial(self) -> bool:
+        """True if the scan stopped at its deadline before all batches were fetched"""
+        return self.batches_total is not None and (self.batches_done or 0) < self.batches_total
+
+    @property
+    def index(self) -> SnapshotIndex:
+        """Sorted per-metric indexes for /top and /filter, built on first use"""
+        if self._index is None:
+            self._index = SnapshotIndex(self.categorized_tokens)
+        return self._index
+
+    def is_fresh(self, max_age: Optional[float]) -> bool:
+        """True if the snapshot is younger than max_age seconds (None means no limit)"""
+        return max_age is None or self.age <= max_age
+
+    def non_empty_categories(self) -> List[str]:
+        return [category for category, tokens in self.categorized_tokens.items() if tokens]
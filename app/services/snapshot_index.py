@@ -0,0 +1,162 @@
+"""
+Sorted per-metric indexes over a scan snapshot for ad-hoc queries.
+
+Each numeric field gets one sorted array, built the first time it is queried
+and kept for the life of the snapshot. Top-N reads the tail of the array and
+range filters use bisect, so queries cost O(log n + k) with no upstream calls.
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+import bisect
+import math
+import re
+
+# Query name -> dotted path in a DexScreener pair
+METRICS = {
+    'volume': 'volume.h24',
+    'volume1h': 'volume.h1',
+    'liquidity': 'liquidity.usd',
+    'mcap': 'market_cap',
+    'fdv': 'fdv',
+    'price': 'priceUsd',
+    'change': 'priceChange.h24',
+    'change1h': 'priceChange.h1',
+    'score': 'score',
+}
+
+_SUFFIXES = {'k': 1e3, 'm': 1e6, 'b': 1e9}
+_CONDITION = re.compile(r'^\s*([a-z0-9]+)\s*(>=|<=|>|<|=)\s*(-?\$?[\d.,]+[kmb]?%?)\s*$', re.IGNORECASE)
+
+
+class QueryError(ValueError):
+    """Raised for unknown metrics or unparseable filter expressions"""
+    pass
+
+
+def parse_number(text: str) -> float:
+    """Parse '1.5m', '$250k', '-10%', '1,000,000'"""
+    text = text.strip().lower().replace('$', '').replace(',', '').rstrip('%')
+    multiplier = 1.0
+    if text and text[-1] in _SUFFIXES:
+        multiplier = _SUFFIXES[text[-1]]
+        text = text[:-1]
+    try:
+        number = float(text) * multiplier
+    except ValueError:
+        raise QueryError(f"Not a number: {text}")
+    if not math.isfinite(number):
+        raise QueryError(f"Not a finite number: {text}")
+    return number
+
+
+def parse_filter(expression: str) -> List[Tuple[str, str, float]]:
+    """'liquidity > 1m and change >= 20' -> [('liquidity', '>', 1e6), ('change', '>=', 20.0)]"""
+    conditions = []
+    for part in re.split(r'\s*(?:,|\band\b|&&)\s*', expression.strip(), flags=re.IGNORECASE):
+        if not part:
+            continue
+        match = _CONDITION.match(part)
+        if not match:
+            raise QueryError(f"Can't parse condition: {part}")
+        metric, op, value = match.groups()
+        metric = metric.lower()
+        if metric not in METRICS:
+            raise QueryError(f"Unknown metric: {metric}")
+        conditions.append((metric, op, parse_number(value)))
+    if not conditions:
+        raise QueryError("Empty filter")
+    return conditions
+
+
+class SnapshotIndex:
+    def __init__(self, categorized_tokens: Dict[str, List[Dict[str, Any]]]):
+        # Each token once, remembering the category it was filed under
+        self.tokens: List[Dict[str, Any]] = []
+        self.categories: List[str] = []
+        seen = set()
+        for category, tokens in categorized_tokens.items():
+            for token in tokens:
+                key = token.get('pairAddress') or token.get('baseToken', {}).get('address') or id(token)
+                if key in seen:
+                    continue
+                seen.add(key)
+                self.tokens.append(token)
+                self.categories.append(category)
+        # metric -> (sorted values, token positions in the same order)
+        self._indexes: Dict[str, Tuple[List[float], List[int]]] = {}
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _index(self, metric: str) -> Tuple[List[float], List[int]]:
+        if metric not in METRICS:
+            raise QueryError(f"Unknown metric: {metric}")
+        index = self._indexes.get(metric)
+        if index is None:
+            path = METRICS[metric].split('.')
+            entries = []
+            for position, token in enumerate(self.tokens):
+                value = self._value(token, path)
+                if value is not None:
+                    entries.append((value, position))
+            entries.sort()
+            index = self._indexes[metric] = ([v for v, _ in entries], [p for _, p in entries])
+        return index
+
+    @staticmethod
+    def _value(token: Dict[str, Any], path: List[str]) -> Optional[float]:
+        value: Any = token
+        for part in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        try:
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def top(self, metric: str, n: int, ascending: bool = False) -> List[Tuple[float, Dict[str, Any]]]:
+        """n tokens with the highest (or lowest) metric, as (value, token)"""
+        values, positions = self._index(metric)
+        if ascending:
+            picked = range(min(n, len(values)))
+        else:
+            picked = range(len(values) - 1, max(-1, len(values) - 1 - n), -1)
+        return [(values[i], self.tokens[positions[i]]) for i in picked]
+
+    def range_positions(self, metric: str, op: str, value: float) -> Set[int]:
+        values, positions = self._index(metric)
+        if op == '>':
+            lo, hi = bisect.bisect_right(values, value), len(values)
+        elif op == '>=':
+            lo, hi = bisect.bisect_left(values, value), len(values)
+        elif op == '<':
+            lo, hi = 0, bisect.bisect_left(values, value)
+        elif op == '<=':
+            lo, hi = 0, bisect.bisect_right(values, value)
+        elif op == '=':
+            lo, hi = bisect.bisect_left(values, value), bisect.bisect_right(values, value)
+        else:
+            raise QueryError(f"Unknown operator: {op}")
+        return set(positions[lo:hi])
+
+    def filter(self, expression: str, limit: Optional[int] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """Tokens matching every condition, ordered by the first condition's metric (descending)"""
+        conditions = parse_filter(expression)
+        matches: Optional[Set[int]] = None
+        # Narrowest ranges first keeps the intersections small
+        for positions in sorted((self.range_positions(*condition) for condition in conditions), key=len):
+            matches = positions if matches is None else matches & positions
+            if not matches:
+                return []
+
+        # Order only the k matches, O(k log k), rather than walking the whole index
+        path = METRICS[conditions[0][0]].split('.')
+        ordered = sorted(((self._value(self.tokens[position], path), position) for position in matches),
+                         reverse=True)
+        if limit:
+            ordered = ordered[:limit]
+        return [(value, self.tokens[position]) for value, position in ordered]
+
+
+def metric_names() -> List[str]:
+    return list(METRICS)
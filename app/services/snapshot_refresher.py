@@ -0,0 +1,92 @@
+"""
+Background refresher that keeps a warm scan snapshot in the long-running bot.
+"""
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+import logging
+import statistics
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.services.token_service import TokenService
+import app.config as config
+
+class SnapshotRefresher:
+    JOB_ID = 'warm_snapshot'
+
+    def __init__(self, token_service: TokenService, scheduler: Optional[AsyncIOScheduler] = None):
+        """Initialize with the service to refresh and an optional scheduler to share"""
+        self.token_service = token_service
+        self.scheduler = scheduler or AsyncIOScheduler()
+        self.base_interval = config.WARM_SCAN_INTERVAL
+        self.min_interval = config.WARM_SCAN_MIN_INTERVAL
+        self.max_interval = config.WARM_SCAN_MAX_INTERVAL
+        self.interval = self.base_interval
+        self.last_volatility: Optional[float] = None
+        self._refreshing = False
+        self.logger = logging.getLogger('SnapshotRefresher')
+
+    @property
+    def max_snapshot_age(self) -> float:
+        """Oldest snapshot /scan should serve: one missed refresh is tolerated"""
+        return self.interval * 2
+
+    def start(self):
+        """Schedule the refresh job and start the scheduler (needs the bot's event loop)"""
+        self.scheduler.add_job(
+            self.refresh,
+            'interval',
+            seconds=self.interval,
+            id=self.JOB_ID,
+            max_instances=1,   # never run two refreshes at once
+            coalesce=True,     # missed runs collapse into one
+            next_run_time=datetime.now(self.scheduler.timezone)
+        )
+        if not self.scheduler.running:
+            self.scheduler.start()
+        self.logger.info(f"Warm snapshot refresher started, interval {self.interval:.0f}s")
+
+    def shutdown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+
+    async def refresh(self):
+        """Run a fresh scan and adapt the refresh interval to market volatility"""
+        if self._refreshing:
+            self.logger.info("Refresh already running, skipping")
+            return
+        self._refreshing = True
+        try:
+            categorized_tokens = await self.token_service.scan_tokens(max_age=0)
+            self.last_volatility = self.measure_volatility(categorized_tokens)
+            self._adapt_interval(self.next_interval(self.last_volatility))
+        except Exception as e:
+            self.logger.error(f"Warm snapshot refresh failed: {str(e)}")
+        finally:
+            self._refreshing = False
+
+    def measure_volatility(self, categorized_tokens: Dict[str, List[Dict[str, Any]]]) -> Optional[float]:
+        """Median absolute 1h price change (%) across the scanned tokens"""
+        changes = []
+        for tokens in categorized_tokens.values():
+            for token in tokens:
+                try:
+                    changes.append(abs(float(token.get('priceChange', {}).get('h1', 0))))
+                except (TypeError, ValueError):
+                    continue
+        return statistics.median(changes) if changes else None
+
+    def next_interval(self, volatility: Optional[float]) -> float:
+        """Shorten the interval when the market moves more than the reference volatility"""
+        if not volatility:
+            return self.base_interval
+        interval = self.base_interval * config.WARM_SCAN_VOLATILITY_REFERENCE / volatility
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _adapt_interval(self, interval: float):
+        # Small drifts aren't worth resetting the job timer for
+        if abs(interval - self.interval) < self.interval * 0.1:
+            return
+        volatility = f"{self.last_volatility:.2f}%" if self.last_volatility is not None else "unknown"
+        self.logger.info(f"Volatility {volatility}, refresh interval {self.interval:.0f}s -> {interval:.0f}s")
+        self.interval = interval
+        if self.scheduler.get_job(self.JOB_ID):
+            self.scheduler.reschedule_job(self.JOB_ID, trigger='interval', seconds=interval)
@@ -1,52 +1,231 @@
 """
 Service layer for token operations, handling business logic.
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Callable, Awaitable
 import logging
 import asyncio
+import heapq
 from app.data.fetcher import DexScreenerFetcher
 from app.classifiers.base import TokenClassifier as BaseClassifier
+from app.services.snapshot import ScanSnapshot
 import app.config as config
+from app.services.metrics import metrics
+from app.services.profiling import ScanProfiler
+
+# Category used for classifiers that rank tokens without categorizing them
+UNCATEGORIZED = 'Matches'
+
+ProgressCallback = Callable[[int, int, Dict[str, List[Dict[str, Any]]]], Awaitable[None]]
+
+def classify_tokens(classifier: BaseClassifier, tokens: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Classify tokens; ranking-only classifiers (plain list result) get a single category"""
+    result = classifier.classify(tokens)
+    if isinstance(result, list):
+        return {UNCATEGORIZED: result}
+    return result
+
+def create_token_service(classifier_name: Optional[str] = None) -> 'TokenService':
+    """
+    Service with the configured fetcher and classifier: full-universe if SCAN_UNIVERSE
+    is "full", otherwise the trending list, sharded across processes if SCAN_SHARDS > 1
+    """
+    from app.classifiers import create_classifier
+    from app.data.sources import create_fetcher
+    classifier = create_classifier(classifier_name)
+    if config.SCAN_UNIVERSE == "full":
+        from app.services.universe_scan import UniverseTokenService
+        return UniverseTokenService(create_fetcher(), classifier)
+    if config.SCAN_SHARDS > 1:
+        from app.services.sharded_scan import ShardedTokenService
+        return ShardedTokenService(create_fetcher(), classifier, shards=config.SCAN_SHARDS,
+                                   classifier_name=classifier_name)
+    return TokenService(create_fetcher(), classifier)
 
 class TokenService:
+    # Tokens in a progress update are all in the final result (partial results only grow)
+    partial_results_are_final = True
+
     def __init__(self, fetcher: DexScreenerFetcher, classifier: BaseClassifier):
         """Initialize with dependencies injected"""
         self.fetcher = fetcher
         self.classifier = classifier
         self.logger = logging.getLogger('TokenService')
+        # Recent snapshots by id, so result pages outlive the next (e.g. warm) scan for RESULTS_CACHE_TTL
+        self._recent_snapshots: Dict[str, ScanSnapshot] = {}
+        self.latest_snapshot: Optional[ScanSnapshot] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._progress_listeners: List[ProgressCallback] = []
+        # Partial result built up batch by batch while listeners are attached
+        self._partial: Dict[str, List[Dict[str, Any]]] = {}
+        self._partial_count = 0
+        self.last_profile_report: Optional[str] = None
     
-    async def scan_tokens(self) -> Dict[str, List[Dict[str, Any]]]:
+    async def scan_tokens(self, progress_callback: Optional[ProgressCallback] = None,
+                          max_age: Optional[float] = None,
+                          deadline: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Main business logic for scanning tokens.
         Returns categorized tokens.
+
+        Concurrent callers share a single in-flight scan, and a result younger
+        than max_age seconds (default config.SCAN_RESULT_TTL, 0 forces a fresh
+        scan) is returned without touching the upstream APIs.
+
+        If progress_callback is given it is awaited after every fetched batch
+        with (batches_done, batches_total, categorized_tokens_so_far).
+
+        deadline is a time.monotonic() value: batches that can't finish by then
+        are dropped and whatever arrived is classified. The latest snapshot
+        records how many batches made it. Callers joining a scan already in
+        flight share the deadline of the caller that started it.
         """
+        if max_age is None:
+            max_age = config.SCAN_RESULT_TTL
+        # Partial results are shown once but never reused as a cached answer
+        if max_age > 0 and (snapshot := self.get_snapshot(max_age)) and not snapshot.partial:
+            self.logger.info(f"Serving cached scan from {snapshot.age:.1f}s ago")
+            return snapshot.categorized_tokens
+
+        if progress_callback:
+            self._progress_listeners.append(progress_callback)
+
+        inflight = self._inflight
+        if inflight is None or inflight.done() or inflight.get_loop() is not asyncio.get_running_loop():
+            inflight = self._inflight = asyncio.ensure_future(self._run_scan(deadline))
+        else:
+            self.logger.info("Joining scan already in flight")
+
+        try:
+            # Shield so one caller giving up doesn't cancel the scan for everyone else
+            return await asyncio.shield(inflight)
+        finally:
+            if progress_callback in self._progress_listeners:
+                self._progress_listeners.remove(progress_callback)
+
+    @property
+    def scan_in_progress(self) -> bool:
+        inflight = self._inflight
+        return inflight is not None and not inflight.done()
+
+    async def profile_scan(self, deadline: Optional[float] = None) -> Optional[str]:
+        """
+        Run one fresh pipeline under the profiler (CPU + allocations) and return its report.
+        Refused while a scan is in flight, since joining it would return an unprofiled result;
+        callers of scan_tokens that arrive meanwhile share the profiled run.
+        """
+        if self.scan_in_progress:
+            raise RuntimeError("A scan is already in progress")
+        inflight = self._inflight = asyncio.ensure_future(self._run_scan(deadline, profile=True))
+        await asyncio.shield(inflight)
+        return self.last_profile_report
+
+    async def _run_scan(self, deadline: Optional[float] = None, profile: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Run one pipeline, under the profiler if requested or PROFILE_SCANS is set"""
+        try:
+            if profile or config.PROFILE_SCANS:
+                profiler = ScanProfiler()
+                categorized_tokens, report = await profiler.profile(self._scan_pipeline(deadline))
+                self.last_profile_report = report
+                profiler.write_report(report)
+                return categorized_tokens
+            return await self._scan_pipeline(deadline)
+        finally:
+            if self._inflight is asyncio.current_task():
+                self._inflight = None
+
+    async def _scan_pipeline(self, deadline: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Run one fetch + classify pipeline"""
+        self._partial, self._partial_count = {}, 0
         try:
             # Get tokens from fetcher with config parameters
             self.logger.info("Fetching validated tokens")
             raw_tokens = await self.fetcher.get_validated_tokens(
                 min_liquidity=config.MIN_LIQUIDITY, 
-                min_volume=config.MIN_VOLUME
+                min_volume=config.MIN_VOLUME,
+                on_batch=self._notify_progress,
+                deadline=deadline
             )
+            progress = getattr(self.fetcher, 'last_scan_progress', None)
+            if not isinstance(progress, dict):
+                progress = {}
+            batches_done, batches_total = progress.get('batches_done'), progress.get('batches_total')
+            if batches_total and batches_done < batches_total:
+                self.logger.warning(f"Partial scan: {batches_done} of {batches_total} batches before the deadline")
             
             if not raw_tokens:
                 self.logger.warning("No tokens found")
-                return {}
+                # An empty result is still a result: keep it so readers within the TTL don't re-scan
+                self.latest_snapshot = ScanSnapshot({}, batches_done, batches_total)
+                return self.latest_snapshot.categorized_tokens
             
             # Classify tokens
             self.logger.info(f"Classifying {len(raw_tokens)} tokens")
-            categorized_tokens = self.classifier.classify(raw_tokens)
+            with metrics.span('classify'):
+                categorized_tokens = self._classify(raw_tokens)
             
             # Log results
             total_tokens = sum(len(tokens) for tokens in categorized_tokens.values())
             self.logger.info(f"Found {total_tokens} tokens across {len([c for c, t in categorized_tokens.items() if t])} categories")
             
+            # Keep the result in memory so follow-up reads don't need a re-scan
+            self.latest_snapshot = ScanSnapshot(categorized_tokens, batches_done, batches_total)
+            
             return categorized_tokens
             
         except Exception as e:
             self.logger.error(f"Error during token scan: {str(e)}")
             raise
+
+    def _classify(self, tokens: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        return classify_tokens(self.classifier, tokens)
+
+    async def _notify_progress(self, batches_done: int, batches_total: int, tokens: List[Dict[str, Any]]):
+        """Classify the tokens added since the last call and pass the partial result to every caller waiting on this scan"""
+        if not self._progress_listeners:
+            return
+        # Only new tokens are classified and merged in, keeping each category sorted by score
+        if len(tokens) > self._partial_count:
+            new = self._classify(tokens[self._partial_count:])
+            self._partial_count = len(tokens)
+            for category, ranked in new.items():
+                self._partial[category] = list(heapq.merge(
+                    self._partial.get(category, []), ranked, key=lambda t: t.get('score', 0), reverse=True
+                ))
+        await self._notify_listeners(batches_done, batches_total, dict(self._partial))
+
+    async def _notify_listeners(self, done: int, total: int, partial: Dict[str, List[Dict[str, Any]]]):
+        for listener in list(self._progress_listeners):
+            try:
+                await listener(done, total, partial)
+            except Exception as e:
+                self.logger.warning(f"Progress listener failed: {str(e)}")
     
+    @property
+    def latest_snapshot(self) -> Optional[ScanSnapshot]:
+        return self._latest_snapshot
+
+    @latest_snapshot.setter
+    def latest_snapshot(self, snapshot: Optional[ScanSnapshot]):
+        self._latest_snapshot = snapshot
+        if snapshot is not None:
+            self._recent_snapshots[snapshot.snapshot_id] = snapshot
+        for snapshot_id, recent in list(self._recent_snapshots.items()):
+            if not recent.is_fresh(config.RESULTS_CACHE_TTL):
+                del self._recent_snapshots[snapshot_id]
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> Optional[ScanSnapshot]:
+        """Return the last scan if it is not older than max_age seconds"""
+        snapshot = self.latest_snapshot
+        if snapshot is None or not snapshot.is_fresh(max_age):
+            return None
+        return snapshot
 
+    def get_snapshot_by_id(self, snapshot_id: str, max_age: Optional[float] = None) -> Optional[ScanSnapshot]:
+        """Return a recent scan by its snapshot_id if it is not older than max_age seconds"""
+        snapshot = self._recent_snapshots.get(snapshot_id)
+        if snapshot is None or not snapshot.is_fresh(max_age):
+            return None
+        return snapshot
     
     async def shutdown(self):
         """Clean up resources"""
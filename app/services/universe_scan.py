@@ -0,0 +1,38 @@
+"""
+TokenService variant that screens the full token universe instead of the trending list.
+"""
+from typing import Any, Dict, List, Optional
+import logging
+from app.classifiers.base import TokenClassifier as BaseClassifier
+from app.data.fetcher import DexScreenerFetcher
+from app.data.universe import UniverseScanner
+from app.services.snapshot import ScanSnapshot
+from app.services.token_service import TokenService
+import app.config as config
+
+class UniverseTokenService(TokenService):
+    # Progress shows the top K so far; later pages can evict tokens from it
+    partial_results_are_final = False
+
+    def __init__(self, fetcher: DexScreenerFetcher, classifier: BaseClassifier, top_k: Optional[int] = None):
+        super().__init__(fetcher, classifier)
+        self.scanner = UniverseScanner(fetcher, classifier, top_k)
+        self.logger = logging.getLogger('UniverseTokenService')
+
+    async def _scan_pipeline(self, deadline: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        try:
+            result = await self.scanner.scan(deadline=deadline, on_page=self._notify_listeners)
+        except Exception as e:
+            self.logger.error(f"Error during universe scan: {str(e)}")
+            raise
+
+        categorized_tokens = result['categorized']
+        stats = self.scanner.stats
+        self.logger.info(f"Universe scan: {stats['listed']} listed, {stats['candidates']} candidates, "
+                         f"{stats['validated']} validated, {result['pages_done']}/{result['pages_total']} pages")
+        self.latest_snapshot = ScanSnapshot(categorized_tokens, result['pages_done'], result['pages_total'])
+        return categorized_tokens
+
+    async def shutdown(self):
+        await self.scanner.close()
+        await super().shutdown()
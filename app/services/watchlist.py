@@ -0,0 +1,160 @@
+"""
+Watchlist: frequent polling of specific tokens for the users who follow them.
+
+Every watched address across all chats is tracked once by a tiered refresh
+scheduler and packed into shared DexScreener batches, so the cost scales with
+unique addresses rather than users. Hot tokens are refreshed every poll and
+quiet ones less often. A chat is only messaged when a token crosses a threshold
+relative to the state at its last alert (price move, liquidity drain).
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from datetime import datetime
+import logging
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.data.fetcher import DexScreenerFetcher
+from app.data.refresh_scheduler import TieredRefreshScheduler
+import app.config as config
+
+Notify = Callable[[Any, str], Awaitable[None]]
+
+class WatchlistService:
+    JOB_ID = 'watchlist_poll'
+
+    def __init__(self, fetcher: DexScreenerFetcher, notify: Optional[Notify] = None,
+                 scheduler: Optional[AsyncIOScheduler] = None):
+        """notify(chat_id, text) delivers alerts; the bot wires in its send_message"""
+        self.fetcher = fetcher
+        self.notify = notify
+        self.scheduler = scheduler or AsyncIOScheduler()
+        self.interval = config.WATCH_POLL_INTERVAL
+        self.refresh = TieredRefreshScheduler(fetcher)
+        self.refresh.tier_intervals = {
+            'hot': config.WATCH_POLL_INTERVAL,
+            'warm': config.WATCH_WARM_INTERVAL,
+            'cold': config.WATCH_COLD_INTERVAL
+        }
+        self.logger = logging.getLogger('Watchlist')
+        self._watchers: Dict[str, Set[Any]] = {}       # address (lower) -> chat IDs
+        self._addresses: Dict[str, str] = {}           # address (lower) -> address as given
+        self._baseline: Dict[str, Dict[str, Any]] = {}  # address (lower) -> state at the last alert
+        self._polling = False
+
+    def watch(self, chat_id, address: str) -> bool:
+        """Start watching; False if the chat already watches it or has hit WATCH_MAX_PER_CHAT"""
+        key = address.lower()
+        if chat_id in self._watchers.get(key, ()):
+            return False
+        if len(self.watched_by(chat_id)) >= config.WATCH_MAX_PER_CHAT:
+            return False
+        self._watchers.setdefault(key, set()).add(chat_id)
+        self._addresses.setdefault(key, address)
+        self.refresh.track([self._addresses[key]])
+        return True
+
+    def unwatch(self, chat_id, address: Optional[str] = None) -> int:
+        """Stop watching address (or everything when None); returns how many were removed"""
+        keys = [address.lower()] if address else [k for k, chats in self._watchers.items() if chat_id in chats]
+        removed = 0
+        for key in keys:
+            chats = self._watchers.get(key)
+            if chats and chat_id in chats:
+                chats.discard(chat_id)
+                removed += 1
+                if not chats:
+                    # Nobody left: stop polling it at all
+                    del self._watchers[key]
+                    self.refresh.untrack(self._addresses.pop(key, None))
+                    self._baseline.pop(key, None)
+        return removed
+
+    def watched_by(self, chat_id) -> List[str]:
+        return [self._addresses[key] for key, chats in self._watchers.items() if chat_id in chats]
+
+    @property
+    def unique_addresses(self) -> List[str]:
+        return list(self._addresses.values())
+
+    def start(self):
+        """Schedule polling (needs the bot's event loop)"""
+        self.scheduler.add_job(
+            self.poll, 'interval', seconds=self.interval, id=self.JOB_ID,
+            max_instances=1, coalesce=True, next_run_time=datetime.now(self.scheduler.timezone)
+        )
+        if not self.scheduler.running:
+            self.scheduler.start()
+        self.logger.info(f"Watchlist polling every {self.interval:.0f}s")
+
+    async def shutdown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        await self.fetcher.close()
+
+    async def poll(self, now: Optional[float] = None):
+        """Fetch the watched addresses that are due in shared batches and push threshold crossings"""
+        if self._polling or not self._watchers:
+            return
+        self._polling = True
+        try:
+            # Addresses blocked after they were watched are not fetched (and resume once unblocked)
+            for address in self._addresses.values():
+                if self.fetcher.blocklist.is_blocked(address):
+                    self.refresh.untrack(address)
+                else:
+                    self.refresh.track([address])
+
+            max_batches = max(1, int(self.refresh.budget_batches(self.interval) * config.WATCH_BUDGET_SHARE))
+            pairs: Dict[str, Dict[str, Any]] = {}
+            for pair in await self.refresh.refresh_due(max_batches, now):
+                key = pair.get('baseToken', {}).get('address', '').lower()
+                if key in self._watchers and self._liquidity(pair) >= self._liquidity(pairs.get(key, {})):
+                    pairs[key] = pair
+
+            for key, pair in pairs.items():
+                alert = self.check(key, pair)
+                if alert and self.notify:
+                    for chat_id in list(self._watchers.get(key, ())):
+                        try:
+                            await self.notify(chat_id, alert)
+                        except Exception as e:
+                            self.logger.warning(f"Failed to deliver watch alert to {chat_id}: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Watchlist poll failed: {str(e)}")
+        finally:
+            self._polling = False
+
+    def check(self, key: str, pair: Dict[str, Any]) -> Optional[str]:
+        """Alert text if pair crossed a threshold since the baseline; the first sighting sets the baseline"""
+        state = {'price': self._float(pair.get('priceUsd')), 'liquidity': self._liquidity(pair)}
+        baseline = self._baseline.get(key)
+        if baseline is None:
+            self._baseline[key] = state
+            return None
+
+        reasons = []
+        if baseline['price'] and state['price']:
+            change = (state['price'] - baseline['price']) / baseline['price'] * 100
+            if abs(change) >= config.WATCH_PRICE_CHANGE_PCT:
+                reasons.append(f"price {change:+.1f}% (${baseline['price']:.8g} → ${state['price']:.8g})")
+        if baseline['liquidity']:
+            drop = (baseline['liquidity'] - state['liquidity']) / baseline['liquidity'] * 100
+            if drop >= config.WATCH_LIQUIDITY_DROP_PCT:
+                reasons.append(f"liquidity -{drop:.0f}% (${state['liquidity']:,.0f} left)")
+        if not reasons:
+            return None
+
+        self._baseline[key] = state
+        symbol = pair.get('baseToken', {}).get('symbol', '?')
+        for ch in '_*`[':
+            symbol = symbol.replace(ch, f"\\{ch}")
+        return f"👁 {symbol}: " + ", ".join(reasons) + (f"\n{pair['url']}" if pair.get('url') else "")
+
+    @staticmethod
+    def _float(value) -> float:
+        try:
+            return float(value or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @classmethod
+    def _liquidity(cls, pair: Dict[str, Any]) -> float:
+        return cls._float(pair.get('liquidity', {}).get('usd'))
@@ -1,17 +1,16 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 import json
 import logging
 import traceback
 import base64
-import requests
-import asyncio
-from app.bot.telegram_bot import TokenBot
-from app.data.fetcher import DexScreenerFetcher
-from app.classifiers.enhanced_meme_token_classifier import EnhancedMemeTokenClassifier
-from app.classifiers.simple_rule_classifier import SimpleRuleClassifier
-from app.services.token_service import TokenService
 import app.config as config
 
+# Heavy dependencies (python-telegram-bot, aiohttp, the classifiers) are imported
+# lazily in get_components() so pings and non-scan webhooks never pay for them.
+
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -20,10 +19,24 @@ logger.setLevel(logging.INFO)
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
 
+IMPORT_TIME_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+
+# Built once per container and reused by warm invocations
+_components = None
+_scan_queue = None
+_deduplicator = None
+_telegram_client = None
+_cold_start = True
+
 def lambda_handler(event, context):
     """
     AWS Lambda handler that processes both scheduled CloudWatch events and Telegram webhook events.
     """
+    global _cold_start
+    if _cold_start:
+        _cold_start = False
+        log_startup_metric('import_ms', IMPORT_TIME_MS)
+
     try:
         logger.info(f"Event received: {json.dumps(event)}")  # Log full event to confirm receipt
         
@@ -32,24 +45,12 @@ def lambda_handler(event, context):
             logger.info("Processing GitHub deployment test")
             return {'statusCode': 200, 'body': json.dumps({"message": "Deployment test successful"})}
         
-        # Initialize dependencies - these need to be created for each lambda invocation
-        fetcher = DexScreenerFetcher()
-        
-        # Choose classifier based on config
-        if hasattr(config, 'DEFAULT_CLASSIFIER') and config.DEFAULT_CLASSIFIER.lower() == "simple":
-            classifier = SimpleRuleClassifier()
-        else:
-            classifier = EnhancedMemeTokenClassifier()
-        
-        # Create service with dependencies
-        token_service = TokenService(fetcher, classifier)
-        
-        # Create bot with service
-        bot = TokenBot(
-            token=TELEGRAM_BOT_TOKEN,
-            chat_id=TELEGRAM_CHAT_ID, 
-            token_service=token_service
-        )
+        # Check if this is a deferred scan job from the webhook path
+        if is_scan_job_event(event):
+            job = event.get('job', {})
+            logger.info(f"Processing queued scan job for chat {job.get('chat_id')}")
+            run_scan_job(job, context)
+            return {'statusCode': 200, 'body': json.dumps({"message": "Scan job completed"})}
         
         # Check if this is a scheduled CloudWatch event
         if is_scheduled_event(event):
@@ -59,7 +60,7 @@ def lambda_handler(event, context):
                 return {'statusCode': 500, 'body': json.dumps({"error": "TELEGRAM_CHAT_ID not set"})}
                 
             send_telegram_message(TELEGRAM_CHAT_ID, "🕒 Running scheduled token scan...")
-            run_scan_with_bot(bot, TELEGRAM_CHAT_ID)
+            run_scan_with_bot(get_components()['bot'], TELEGRAM_CHAT_ID, context)
             return {'statusCode': 200, 'body': json.dumps({"message": "Scheduled scan completed"})}
         
         # Otherwise, handle Telegram webhook events
@@ -70,15 +71,49 @@ def lambda_handler(event, context):
             return {'statusCode': 400, 'body': json.dumps({"error": "No body in request"})}
             
         telegram_update = json.loads(body)
+        
+        # Telegram retries slow webhooks; a repeated update_id is acknowledged with no work
+        update_id = telegram_update.get('update_id')
+        if get_deduplicator().is_duplicate_update(update_id):
+            return {'statusCode': 200, 'body': json.dumps({"status": "duplicate"})}
+        
         message = telegram_update.get('message', {})
         chat_id = message.get('chat', {}).get('id')
         text = message.get('text', '')
         
         logger.info(f"Message: '{text}', Chat ID: {chat_id}")  # Log received message
         
+        # Only /scan needs the bot; everything else is acknowledged without building it
         if text and text.startswith('/scan'):
             logger.info("Detected /scan command")
-            run_scan_with_bot(bot, chat_id)
+            if chat_id is None:
+                logger.warning("Ignoring /scan without a chat ID")
+                return {'statusCode': 200, 'body': json.dumps({"status": "ignored"})}
+            
+            if not get_deduplicator().claim_scan(chat_id):
+                return {'statusCode': 200, 'body': json.dumps({"status": "duplicate"})}
+            
+            queued = False
+            try:
+                if config.SCAN_DISPATCH_MODE == 'async':
+                    # Acknowledge right away so Telegram doesn't retry; a worker runs the scan
+                    get_scan_queue().enqueue({
+                        'chat_id': chat_id,
+                        'update_id': update_id,
+                        'enqueued_at': time.time()
+                    })
+                    queued = True
+                    return {'statusCode': 200, 'body': json.dumps({"status": "queued"})}
+                
+                run_scan_with_bot(get_components()['bot'], chat_id, context)
+            except Exception:
+                # The 500 makes Telegram retry; don't drop that retry as a duplicate
+                get_deduplicator().forget_update(update_id)
+                raise
+            finally:
+                # A queued job holds the claim until its worker finishes
+                if not queued:
+                    get_deduplicator().release_scan(chat_id)
         
         return {'statusCode': 200, 'body': json.dumps({"status": "success"})}
     
@@ -86,11 +121,82 @@ def lambda_handler(event, context):
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         return {'statusCode': 500, 'body': json.dumps({"error": str(e)})}
+    
+    finally:
+        flush_telegram_messages()
+        flush_metrics()
+
+def get_components():
+    """Builds the fetcher, classifier, service and bot once per container."""
+    global _components
+    if _components is None:
+        started = time.perf_counter()
+        from app.bot.telegram_bot import TokenBot
+        from app.data.sources import create_fetcher
+        from app.services.token_service import TokenService
+        from app.services.loop_runner import get_loop_runner
+        
+        from app.classifiers import create_classifier
+        
+        # Create service with dependencies; the classifier is chosen by config
+        token_service = TokenService(create_fetcher(), create_classifier())
+        
+        # Create bot with service
+        bot = TokenBot(
+            token=TELEGRAM_BOT_TOKEN,
+            chat_id=TELEGRAM_CHAT_ID, 
+            token_service=token_service,
+            http_client=get_telegram_client()
+        )
+        
+        # The shared loop owns the sessions; close them when the container is recycled
+        runner = get_loop_runner()
+        runner.add_shutdown_callback(token_service.shutdown)
+        runner.add_shutdown_callback(bot.application.bot.shutdown)
+        
+        _components = {'token_service': token_service, 'bot': bot}
+        log_startup_metric('init_ms', (time.perf_counter() - started) * 1000)
+    return _components
+
+def get_scan_queue():
+    """Returns the queue used to defer scans in async dispatch mode."""
+    global _scan_queue
+    if _scan_queue is None:
+        from app.services.scan_queue import create_scan_queue
+        _scan_queue = create_scan_queue()
+    return _scan_queue
+
+def run_scan_job(job, lambda_context=None):
+    """Worker path: runs a scan job that was enqueued by the webhook handler."""
+    enqueued_at = job.get('enqueued_at')
+    if enqueued_at:
+        logger.info(f"Scan job waited {time.time() - enqueued_at:.2f}s in the queue")
+    try:
+        run_scan_with_bot(get_components()['bot'], job['chat_id'], lambda_context)
+    finally:
+        get_deduplicator().release_scan(job['chat_id'])
+
+def get_deduplicator():
+    """Returns the update/scan deduplicator shared by warm invocations."""
+    global _deduplicator
+    if _deduplicator is None:
+        from app.services.dedup import UpdateDeduplicator, create_dedup_store
+        _deduplicator = UpdateDeduplicator(create_dedup_store())
+    return _deduplicator
+
+def log_startup_metric(name, value_ms):
+    """Logs a startup timing as a JSON line so CloudWatch metric filters can track regressions."""
+    logger.info(json.dumps({'startup_metric': name, 'value_ms': round(value_ms, 1)}))
 
 def is_scheduled_event(event):
     """Detects if the incoming event is a scheduled CloudWatch trigger."""
     return 'source' in event and event['source'] == 'aws.events'
 
+def is_scan_job_event(event):
+    """Detects if the incoming event is a queued scan job."""
+    from app.services.scan_queue import SCAN_JOB_SOURCE
+    return event.get('source') == SCAN_JOB_SOURCE
+
 def extract_request_body(event):
     """Extracts and decodes the request body if necessary."""
     body = event.get('body')
@@ -98,7 +204,15 @@ def extract_request_body(event):
         return base64.b64decode(body).decode('utf-8')
     return body
 
-def run_scan_with_bot(bot, chat_id):
+def scan_deadline(lambda_context):
+    """Derives a time.monotonic() scan deadline from the invocation's remaining time."""
+    if lambda_context is None or not hasattr(lambda_context, 'get_remaining_time_in_millis'):
+        return None
+    remaining = lambda_context.get_remaining_time_in_millis() / 1000
+    # Leave room to classify and send whatever arrived before Lambda kills us
+    return time.monotonic() + max(0.0, remaining - config.SCAN_DEADLINE_MARGIN)
+
+def run_scan_with_bot(bot, chat_id, lambda_context=None):
     """Runs the token scan using an already initialized bot instance."""
     try:
         # Create a minimal Update object
@@ -129,25 +243,54 @@ def run_scan_with_bot(bot, chat_id):
         )
         
         # Run the scan_command synchronously
-        bot.scan_command_sync(update, None)
+        bot.scan_command_sync(update, None, deadline=scan_deadline(lambda_context))
         logger.info("Scan completed successfully")
     
     except Exception as e:
         logger.error(f"Error in scan operation: {e}")
         logger.error(traceback.format_exc())
-        send_telegram_message(chat_id, f"❌ Error: {str(e)}")
+        send_telegram_message(chat_id, f"❌ Error: {str(e)}", defer=True)
         
-def send_telegram_message(chat_id, text):
-    """Sends a message via Telegram API."""
-    if not TELEGRAM_BOT_TOKEN:
+def send_telegram_message(chat_id, text, defer=False):
+    """Sends a message via the pooled Telegram client; deferred messages go out merged on flush."""
+    client = get_telegram_client()
+    if client is None:
         logger.error("TELEGRAM_BOT_TOKEN environment variable not set")
         return
     
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {'chat_id': chat_id, 'text': text, 'parse_mode': 'Markdown'}
+    if defer:
+        client.queue_message(chat_id, text)
+        return
     
+    from app.services.loop_runner import get_loop_runner
     try:
-        response = requests.post(url, json=payload)
-        logger.info(f"Message sent, status code: {response.status_code}")
+        get_loop_runner().run(client.send_message(chat_id, text), timeout=config.TELEGRAM_HTTP_TIMEOUT)
     except Exception as e:
-        logger.error(f"Failed to send message: {str(e)}")
\ No newline at end of file
+        logger.error(f"Failed to send message: {str(e)}")
+
+def flush_telegram_messages():
+    """Sends any deferred status and error messages, merged per chat."""
+    client = _telegram_client
+    if client is None or not client.has_pending():
+        return
+    
+    from app.services.loop_runner import get_loop_runner
+    try:
+        get_loop_runner().run(client.flush(), timeout=config.TELEGRAM_HTTP_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Failed to flush messages: {str(e)}")
+
+def flush_metrics():
+    """Writes per-stage latency histograms as CloudWatch EMF log lines."""
+    from app.services.metrics import metrics
+    metrics.flush_emf()
+
+def get_telegram_client():
+    """Returns the keep-alive Telegram client shared with the bot, or None without a token."""
+    global _telegram_client
+    if _telegram_client is None and TELEGRAM_BOT_TOKEN:
+        from app.bot.telegram_client import TelegramHTTPClient
+        from app.services.loop_runner import get_loop_runner
+        _telegram_client = TelegramHTTPClient(TELEGRAM_BOT_TOKEN)
+        get_loop_runner().add_shutdown_callback(_telegram_client.close)
+    return _telegram_client
@@ -4,10 +4,10 @@ Main entry point for the application.
 import asyncio
 import logging
 from app.bot.telegram_bot import TokenBot
-from app.data.fetcher import DexScreenerFetcher
-from app.classifiers.enhanced_meme_token_classifier import EnhancedMemeTokenClassifier
-from app.classifiers.simple_rule_classifier import SimpleRuleClassifier
-from app.services.token_service import TokenService
+from app.services.token_service import create_token_service
+from app.services.snapshot_refresher import SnapshotRefresher
+from app.services.watchlist import WatchlistService
+from app.data.sources import pair_fetcher
 import app.config as config
 
 def main():
@@ -18,26 +18,25 @@ def main():
     try:
         logger.info("Initializing application...")
         
-        # Create dependencies
-        fetcher = DexScreenerFetcher()
+        # Create service with its fetcher and the configured classifier (sharded if SCAN_SHARDS > 1)
+        token_service = create_token_service()
         
-        # Choose classifier based on config
-        if config.DEFAULT_CLASSIFIER.lower() == "simple":
-            classifier = SimpleRuleClassifier()
-        else:
-            classifier = EnhancedMemeTokenClassifier()
+        # Keep a warm snapshot so /scan answers without a cold scan
+        refresher = SnapshotRefresher(token_service) if config.WARM_SCAN_ENABLED else None
         
-        # Create service with dependencies
-        token_service = TokenService(fetcher, classifier)
+        # Watched tokens are polled through the scan's DexScreener fetcher: one session, rate budget and metadata cache
+        watchlist = WatchlistService(pair_fetcher(token_service.fetcher)) if config.WATCHLIST_ENABLED else None
         
         # Create bot with service
         bot = TokenBot(
             token=config.BOT_TOKEN,
             chat_id=config.CHAT_ID,
-            token_service=token_service
+            token_service=token_service,
+            refresher=refresher,
+            watchlist=watchlist
         )
         
-        logger.info(f"Starting bot with classifier: {classifier.__class__.__name__}")
+        logger.info(f"Starting bot with classifier: {token_service.classifier.__class__.__name__}")
         bot.run()
         
     except Exception as e:
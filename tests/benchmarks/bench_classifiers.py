@@ -0,0 +1,103 @@
+"""
+Classifier micro-benchmark on synthetic pairs.
+
+Measures classify() throughput and traced memory per token for each classifier at
+several universe sizes. Input is generated from a fixed seed, so numbers from
+different commits are directly comparable. Not collected by pytest; run it directly:
+
+    python -m tests.benchmarks.bench_classifiers
+    python -m tests.benchmarks.bench_classifiers --sizes 1000 100000 1000000 --json >> bench_classifiers.jsonl
+"""
+from typing import Dict, List
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.benchmarks.synthetic import SyntheticTokenGenerator
+from tests.benchmarks.bench_scan import git_revision
+from app.classifiers.enhanced_meme_token_classifier import EnhancedMemeTokenClassifier
+from app.classifiers.simple_rule_classifier import SimpleRuleClassifier
+
+CLASSIFIERS = {
+    'enhanced': EnhancedMemeTokenClassifier,
+    'simple': SimpleRuleClassifier,
+}
+
+def bench_classifier(name: str, tokens: List[Dict], repeats: int) -> Dict:
+    classifier = CLASSIFIERS[name]()
+
+    # Throughput: best of N with the GC out of the way
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            classifier.classify(tokens)
+            timings.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+
+    # Memory: peak allocation of one extra run, measured separately so tracing doesn't skew timing
+    gc.collect()
+    tracemalloc.start()
+    try:
+        classifier.classify(tokens)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        'classifier': name,
+        'tokens': len(tokens),
+        'best_s': round(best, 4),
+        'tokens_per_s': round(len(tokens) / best) if best else None,
+        'us_per_token': round(best / len(tokens) * 1e6, 3),
+        'peak_bytes_per_token': round(peak / len(tokens), 1),
+    }
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Classifier throughput and memory benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--classifiers', nargs='+', choices=sorted(CLASSIFIERS), default=sorted(CLASSIFIERS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="print one JSON line instead of a table")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    generator = SyntheticTokenGenerator(seed=args.seed)
+    results = []
+    for size in args.sizes:
+        tokens = generator.batch(size)
+        for name in args.classifiers:
+            results.append(bench_classifier(name, tokens, args.repeats))
+        del tokens
+        gc.collect()
+
+    if args.json:
+        print(json.dumps({
+            'revision': git_revision(),
+            'timestamp': int(time.time()),
+            'python': platform.python_version(),
+            'seed': args.seed,
+            'results': results,
+        }))
+        return
+
+    print(f"revision {git_revision()}  python {platform.python_version()}  seed {args.seed}")
+    print(f"{'classifier':<10} {'tokens':>9} {'best s':>9} {'tokens/s':>11} {'us/token':>9} {'B/token':>9}")
+    for r in results:
+        print(f"{r['classifier']:<10} {r['tokens']:>9} {r['best_s']:>9.4f} {r['tokens_per_s']:>11} "
+              f"{r['us_per_token']:>9.2f} {r['peak_bytes_per_token']:>9.1f}")
+
+if __name__ == '__main__':
+    main()
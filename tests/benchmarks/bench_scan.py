@@ -0,0 +1,135 @@
+"""
+End-to-end scan benchmark against the local mock upstream.
+
+Drives TokenService.scan_tokens through the real DexScreenerFetcher and classifier
+and reports wall time, p50/p99 DexScreener batch latency (the HTTP call only,
+not the client throttle), peak RSS and upstream call counts. Not collected by
+pytest; run it directly:
+
+    python -m tests.benchmarks.bench_scan --universe 3000 --latency-ms 80 --error-rate 0.02
+    python -m tests.benchmarks.bench_scan --json >> bench_scan.jsonl
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from tests.benchmarks.mock_upstream import MockUpstream
+from app.data.fetcher import DexScreenerFetcher
+from app.classifiers.enhanced_meme_token_classifier import EnhancedMemeTokenClassifier
+from app.classifiers.simple_rule_classifier import SimpleRuleClassifier
+from app.services.token_service import TokenService
+from app.services.metrics import metrics
+import app.config as config
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; 0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    upstream = MockUpstream(
+        universe_size=args.universe, latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate, rate_limit=args.rate_limit, rate_window=args.rate_window,
+        pairs_per_token=args.pairs_per_token, seed=args.seed
+    )
+    await upstream.start()
+
+    fetcher = DexScreenerFetcher()
+    fetcher.jupiter_base_url = upstream.jupiter_url
+    fetcher.dex_base_url = upstream.dex_url
+    fetcher.BATCH_SIZE = args.batch_size
+    fetcher.RATE_LIMIT_REQUESTS = args.client_rate
+    fetcher.RATE_LIMIT_WINDOW = 60
+
+    # Record the exact duration of every dex_batch span rather than histogram buckets.
+    # The span wraps only the HTTP call, so the client's rate-limit sleep is excluded
+    batch_latencies = []
+    observe = metrics.observe
+
+    def record(stage, value_ms, **dimensions):
+        if stage == 'dex_batch':
+            batch_latencies.append(value_ms)
+        observe(stage, value_ms, **dimensions)
+    metrics.observe = record
+
+    classifier = SimpleRuleClassifier() if args.classifier == 'simple' else EnhancedMemeTokenClassifier()
+    service = TokenService(fetcher, classifier)
+
+    try:
+        started = time.perf_counter()
+        categorized = await service.scan_tokens(max_age=0)
+        wall_time = time.perf_counter() - started
+    finally:
+        del metrics.observe
+        await service.shutdown()
+        await upstream.stop()
+
+    return {
+        'revision': git_revision(),
+        'timestamp': int(time.time()),
+        'params': {k: v for k, v in vars(args).items() if k != 'json'},
+        'wall_time_s': round(wall_time, 3),
+        'batches': len(batch_latencies),
+        'batch_p50_ms': round(percentile(batch_latencies, 0.50), 2),
+        'batch_p99_ms': round(percentile(batch_latencies, 0.99), 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'upstream_calls': {f"{endpoint}:{status}": count for (endpoint, status), count in sorted(upstream.calls.items())},
+        'classified_tokens': sum(len(tokens) for tokens in categorized.values()),
+    }
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end scan benchmark against a local mock upstream")
+    parser.add_argument('--universe', type=int, default=300, help="number of trending tokens served by the mock")
+    parser.add_argument('--pairs-per-token', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=50, help="median upstream latency")
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help="log-normal sigma of the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument('--rate-limit', type=int, default=None, help="server-side requests per window (429 beyond)")
+    parser.add_argument('--rate-window', type=float, default=60)
+    parser.add_argument('--client-rate', type=int, default=config.RATE_LIMIT_REQUESTS,
+                        help="fetcher rate limit in requests per minute")
+    parser.add_argument('--batch-size', type=int, default=config.BATCH_SIZE)
+    parser.add_argument('--classifier', choices=['enhanced', 'simple'], default='enhanced')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="print one JSON line instead of a table")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"revision          {result['revision']}")
+    print(f"wall time         {result['wall_time_s']:.3f}s")
+    print(f"batches           {result['batches']}")
+    print(f"batch p50 / p99   {result['batch_p50_ms']:.1f} / {result['batch_p99_ms']:.1f} ms")
+    print(f"peak RSS          {result['peak_rss_mb']:.1f} MiB")
+    print(f"classified tokens {result['classified_tokens']}")
+    for key, count in result['upstream_calls'].items():
+        print(f"calls {key:<12} {count}")
+
+if __name__ == '__main__':
+    main()
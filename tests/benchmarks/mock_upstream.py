@@ -0,0 +1,106 @@
+"""
+Local aiohttp server emulating the Jupiter and DexScreener endpoints the fetcher uses.
+
+    /jupiter/tokens?tags=birdeye-trending   -> list of Jupiter tokens
+    /dex/tokens/{comma separated addresses} -> {'pairs': [...]}
+
+Universe size, latency (log-normal), error rate and a sliding-window rate limit
+are configurable, and every request is counted per endpoint and status.
+"""
+from collections import Counter, deque
+from typing import Dict, List, Optional
+import asyncio
+import math
+import random
+import time
+from aiohttp import web
+from tests.benchmarks.synthetic import SyntheticTokenGenerator
+
+class MockUpstream:
+    def __init__(self, universe_size: int = 300, latency_ms: float = 50, latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, rate_limit: Optional[int] = None, rate_window: float = 60,
+                 pairs_per_token: int = 1, seed: int = 42):
+        self.universe_size = universe_size
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.pairs_per_token = pairs_per_token
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self._request_times = deque()
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+
+        generator = SyntheticTokenGenerator(seed=seed)
+        self.tokens = [generator.jupiter_token(i) for i in range(universe_size)]
+        self.pairs: Dict[str, List[Dict]] = {
+            token['address']: [generator.pair(i, n) for n in range(pairs_per_token)]
+            for i, token in enumerate(self.tokens)
+        }
+
+    @property
+    def jupiter_url(self) -> str:
+        return f"{self.base_url}/jupiter"
+
+    @property
+    def dex_url(self) -> str:
+        return f"{self.base_url}/dex"
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get('/jupiter/tokens', self._handle_jupiter)
+        app.router.add_get('/dex/tokens/{addresses}', self._handle_dex)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_jupiter(self, request: web.Request) -> web.Response:
+        return await self._respond('jupiter', lambda: self.tokens)
+
+    async def _handle_dex(self, request: web.Request) -> web.Response:
+        addresses = request.match_info['addresses'].split(',')
+        return await self._respond('dex', lambda: {
+            'pairs': [pair for address in addresses for pair in self.pairs.get(address, [])]
+        })
+
+    async def _respond(self, endpoint: str, payload) -> web.Response:
+        if self._rate_limited():
+            self.calls[(endpoint, 429)] += 1
+            return web.json_response({'error': 'rate limited'}, status=429)
+
+        await asyncio.sleep(self._sample_latency())
+
+        if self.random.random() < self.error_rate:
+            self.calls[(endpoint, 500)] += 1
+            return web.json_response({'error': 'internal error'}, status=500)
+
+        self.calls[(endpoint, 200)] += 1
+        return web.json_response(payload())
+
+    def _rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._request_times and now - self._request_times[0] > self.rate_window:
+            self._request_times.popleft()
+        if len(self._request_times) >= self.rate_limit:
+            return True
+        self._request_times.append(now)
+        return False
+
+    def _sample_latency(self) -> float:
+        """Log-normal latency in seconds with median latency_ms"""
+        if self.latency_ms <= 0:
+            return 0
+        return self.random.lognormvariate(math.log(self.latency_ms), self.latency_sigma) / 1000
@@ -0,0 +1,94 @@
+"""
+Seeded generator of DexScreener-shaped pairs for benchmarks.
+
+The same seed always yields the same tokens, so results are comparable across
+commits. Pairs mimic what the live API returns, warts included: some have no
+'info' block, numbers are sometimes strings, socials may carry follower counts
+and some pairs list topHolders and a launchDate.
+"""
+from typing import Dict, Iterator, List
+import math
+import random
+import time
+
+SOCIAL_TYPES = ('twitter', 'telegram', 'discord', 'website')
+
+class SyntheticTokenGenerator:
+    def __init__(self, seed: int = 42, missing_info_rate: float = 0.15, string_number_rate: float = 0.3,
+                 now: float = None):
+        self.seed = seed
+        self.missing_info_rate = missing_info_rate
+        self.string_number_rate = string_number_rate
+        # Ages are drawn relative to now and the classifier grades them against the
+        # wall clock, so the default keeps every age branch reachable; pass a fixed
+        # now only together with a classifier pinned to the same clock
+        self.now = now if now is not None else time.time()
+
+    def jupiter_token(self, i: int) -> Dict:
+        rnd = random.Random(self.seed * 1_000_003 + i)
+        return {
+            'address': self.address(i),
+            'symbol': f"SYN{i}",
+            'name': f"Synthetic Token {i}",
+            'tags': ['birdeye-trending'],
+            'daily_volume': round(rnd.uniform(1e3, 5e6), 2),
+        }
+
+    def pair(self, i: int, n: int = 0) -> Dict:
+        """The n-th pair of token i; deterministic per (seed, i, n)"""
+        rnd = random.Random((self.seed * 1_000_003 + i) * 31 + n)
+        num = lambda value: self._maybe_string(rnd, value)
+        created_at = int((self.now - rnd.uniform(600, 120 * 86400)) * 1000)
+
+        pair = {
+            'chainId': 'solana',
+            'dexId': rnd.choice(('raydium', 'orca', 'meteora')),
+            'pairAddress': f"{self.address(i)}P{n}",
+            'baseToken': {'address': self.address(i), 'symbol': f"SYN{i}", 'name': f"Synthetic Token {i}"},
+            'quoteToken': {'address': 'So11111111111111111111111111111111111111112', 'symbol': 'SOL'},
+            'priceUsd': f"{rnd.lognormvariate(math.log(0.01), 3):.10f}",  # always a string upstream
+            'liquidity': {'usd': num(round(rnd.lognormvariate(math.log(150000), 1.3), 2))},
+            'volume': {'h24': num(round(rnd.lognormvariate(math.log(80000), 1.6), 2)),
+                       'h1': num(round(rnd.lognormvariate(math.log(4000), 1.6), 2))},
+            'priceChange': {'h1': num(round(rnd.gauss(0, 8), 2)), 'h24': num(round(rnd.gauss(10, 60), 2))},
+            'txns': {'h24': {'buys': rnd.randint(0, 5000), 'sells': rnd.randint(0, 5000)}},
+            'pairCreatedAt': created_at,
+        }
+        if rnd.random() < 0.4:
+            pair['volumeChange'] = {'h24': num(round(rnd.gauss(0, 80), 2))}
+        if rnd.random() >= self.missing_info_rate:
+            pair['info'] = self._info(rnd, created_at)
+        return pair
+
+    def pairs(self, count: int, start: int = 0) -> Iterator[Dict]:
+        for i in range(start, start + count):
+            yield self.pair(i)
+
+    def batch(self, count: int, start: int = 0) -> List[Dict]:
+        return list(self.pairs(count, start))
+
+    @staticmethod
+    def address(i: int) -> str:
+        return f"Syn{i:041d}"
+
+    def _info(self, rnd: random.Random, created_at: int) -> Dict:
+        socials = []
+        for social_type in rnd.sample(SOCIAL_TYPES, rnd.randint(0, len(SOCIAL_TYPES))):
+            social = {'type': social_type, 'url': f"https://example.com/{social_type}"}
+            if social_type == 'twitter' and rnd.random() < 0.6:
+                social['followers'] = self._maybe_string(rnd, int(rnd.lognormvariate(math.log(3000), 1.5)))
+            socials.append(social)
+
+        info = {'socials': socials}
+        if rnd.random() < 0.5:
+            info['launchDate'] = created_at
+        if rnd.random() < 0.4:
+            shares = sorted((rnd.uniform(0.5, 60) for _ in range(rnd.randint(1, 10))), reverse=True)
+            info['topHolders'] = [
+                {'address': f"Holder{k:038d}", 'percentage': self._maybe_string(rnd, round(share, 2))}
+                for k, share in enumerate(shares)
+            ]
+        return info
+
+    def _maybe_string(self, rnd: random.Random, value):
+        return str(value) if rnd.random() < self.string_number_rate else value
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock
+import asyncio
+import gzip
+import json
+import sys
+import os
+from aiohttp.test_utils import TestClient, TestServer
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.api.server import ScanAPI
+from app.services.token_service import TokenService
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class TestScanAPI(unittest.TestCase):
+    def setUp(self):
+        self.fetch_count = 0
+        self.tokens = [
+            {'baseToken': {'address': f"Addr{i}", 'symbol': f"T{i}"}, 'description': 'x' * 100}
+            for i in range(20)
+        ]
+
+        async def get_validated_tokens(min_liquidity, min_volume, on_batch=None, deadline=None):
+            self.fetch_count += 1
+            await asyncio.sleep(0.01)
+            return self.tokens
+
+        fetcher = MagicMock()
+        fetcher.get_validated_tokens = get_validated_tokens
+        classifier = MagicMock()
+        classifier.classify = MagicMock(side_effect=lambda tokens: {'Moonshot': tokens[:5], 'Risky': tokens[5:]})
+        self.api = ScanAPI(TokenService(fetcher, classifier), result_ttl=60)
+
+    def _with_client(self, test):
+        async def run():
+            async with TestClient(TestServer(self.api.make_app())) as client:
+                return await test(client)
+        return run_async(run())
+
+    def test_successfully_serve_concurrent_readers_from_one_scan(self):
+        """Test concurrent /scan and /tokens readers share one pipeline run"""
+        async def test(client):
+            responses = await asyncio.gather(
+                client.get('/scan'), client.get('/scan'), client.get('/tokens/addr3')
+            )
+            return [(r.status, await r.json()) for r in responses]
+
+        (status, scan), _, (token_status, token) = self._with_client(test)
+
+        self.assertEqual(self.fetch_count, 1)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(scan['categories']['Moonshot']), 5)
+        self.assertEqual(scan['total_tokens'], 20)
+        self.assertEqual(token_status, 200)
+        self.assertEqual(token['pairs'][0]['category'], 'Moonshot')
+
+    def test_successfully_revalidate_with_etag_and_gzip(self):
+        """Test If-None-Match yields 304 and large bodies are gzipped on request"""
+        async def test(client):
+            first = await client.get('/scan', headers={'Accept-Encoding': 'gzip'}, auto_decompress=False)
+            raw = await first.read()
+            second = await client.get('/scan', headers={'If-None-Match': first.headers['ETag']})
+            return first, raw, second
+
+        first, raw, second = self._with_client(test)
+
+        self.assertEqual(first.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(raw))['total_tokens'], 20)
+        self.assertIn('max-age=', first.headers['Cache-Control'])
+        self.assertEqual(second.status, 304)
+        self.assertEqual(self.fetch_count, 1)
+
+    def test_successfully_cache_empty_scan(self):
+        """Test an empty scan is served from its snapshot with a stable ETag instead of re-scanning"""
+        self.tokens = []
+
+        async def test(client):
+            first = await client.get('/scan')
+            second = await client.get('/scan', headers={'If-None-Match': first.headers['ETag']})
+            return first.status, await first.json(), second.status
+
+        status, scan, revalidated = self._with_client(test)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(scan['total_tokens'], 0)
+        self.assertEqual(revalidated, 304)
+        self.assertEqual(self.fetch_count, 1)
+
+    def test_successfully_follow_refresher_interval(self):
+        """Test the result TTL tracks the refresher's adaptive max_snapshot_age on every request"""
+        refresher = MagicMock(max_snapshot_age=600)
+        api = ScanAPI(self.api.token_service, refresher=refresher)
+        self.assertEqual(api.result_ttl, 600)
+        refresher.max_snapshot_age = 120
+        self.assertEqual(api.result_ttl, 120)
+
+    def test_unsuccessfully_lookup_unknown_token(self):
+        """Test an address missing from the snapshot returns 404"""
+        async def test(client):
+            response = await client.get('/tokens/unknown')
+            return response.status
+
+        self.assertEqual(self._with_client(test), 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
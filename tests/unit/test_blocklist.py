@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.data.blocklist import BloomFilter, Blocklist
+from app.data.fetcher import DexScreenerFetcher
+
+class TestBlocklist(unittest.TestCase):
+    def test_successfully_hold_many_addresses_compactly(self):
+        """Test the Bloom filter has no false negatives and stays near its target error rate"""
+        bloom = BloomFilter(20000, error_rate=0.01)
+        for i in range(20000):
+            bloom.add(f"rug{i}")
+
+        self.assertTrue(all(f"rug{i}" in bloom for i in range(20000)))
+        false_positives = sum(1 for i in range(20000) if f"clean{i}" in bloom)
+        self.assertLess(false_positives / 20000, 0.02)
+        self.assertLess(bloom.nbytes, 25 * 1024)
+
+    def test_successfully_expire_and_override_entries(self):
+        """Test runtime blocks expire and unblock overrides the bulk list"""
+        blocklist = Blocklist(capacity=100, overrides_path='')
+        blocklist.load(['BulkRug\n', '# comment\n'])
+        self.assertTrue(blocklist.is_blocked('bulkrug'))
+
+        blocklist.unblock('BulkRug')
+        self.assertFalse(blocklist.is_blocked('BulkRug'))
+
+        with patch('app.data.blocklist.time', return_value=1000):
+            blocklist.block('TempRug', ttl=60)
+        with patch('app.data.blocklist.time', return_value=1059):
+            self.assertTrue(blocklist.is_blocked('TempRug'))
+        with patch('app.data.blocklist.time', return_value=1061):
+            self.assertFalse(blocklist.is_blocked('TempRug'))
+
+    def test_successfully_skip_blocked_addresses_before_fetch(self):
+        """Test chunk_addresses drops blocklisted tokens and overrides persist"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'overrides.json')
+            blocklist = Blocklist(capacity=100, overrides_path=path)
+            blocklist.block('Addr2')
+
+            fetcher = DexScreenerFetcher()
+            fetcher.BATCH_SIZE = 2
+            fetcher.blocklist = Blocklist(capacity=100, overrides_path=path)
+            batches = fetcher.chunk_addresses([{'address': f"Addr{i}"} for i in range(5)])
+
+        self.assertEqual(batches, [['Addr0', 'Addr1'], ['Addr3', 'Addr4']])
+
+    def test_successfully_replace_overrides_atomically(self):
+        """Test saving replaces the overrides file in one step and leaves no temp files behind"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'overrides.json')
+            blocklist = Blocklist(capacity=100, overrides_path=path)
+            blocklist.block('Addr1')
+            with patch('app.data.blocklist.json.dump', side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    blocklist.block('Addr2')
+
+            self.assertEqual(os.listdir(directory), ['overrides.json'])
+            reloaded = Blocklist(capacity=100, overrides_path=path)
+            self.assertTrue(reloaded.is_blocked('Addr1'))
+            self.assertFalse(reloaded.is_blocked('Addr2'))
+
+    def test_unsuccessfully_load_corrupt_overrides(self):
+        """Test a corrupt overrides file is logged and ignored instead of failing startup"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'overrides.json')
+            with open(path, 'w') as f:
+                f.write('{"blocked": {"addr1": nu')
+
+            with self.assertLogs('Blocklist', level='WARNING'):
+                blocklist = Blocklist(capacity=100, overrides_path=path)
+
+        self.assertFalse(blocklist.is_blocked('Addr1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,9 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from app.services.token_service import TokenService
+from app.services.snapshot import ScanSnapshot
 from app.bot.telegram_bot import TokenBot
+import app.config as config
 
 # Simple function to run a coroutine
 def run_async(coroutine):
@@ -47,7 +49,7 @@ class TestTokenBot(unittest.TestCase):
     def test_successfully_initialize_bot(self):
         """Test that the bot initializes correctly with proper handlers"""
         # Check if handlers were added
-        self.assertEqual(self.mock_app.add_handler.call_count, 3)
+        self.assertEqual(self.mock_app.add_handler.call_count, 12)
         
         # Verify token and chat_id were set
         self.assertEqual(self.bot.token, "test_token")
@@ -67,13 +69,12 @@ class TestTokenBot(unittest.TestCase):
         self.assertIn('allowed_updates', call_args)
         self.assertEqual(call_args['allowed_updates'], Update.ALL_TYPES)
 
-    @patch('asyncio.new_event_loop')
-    @patch('asyncio.set_event_loop')
-    def test_successfully_wrap_async_scan_command(self, mock_set_event_loop, mock_new_event_loop):
-        """Test that scan_command_sync properly wraps the async method"""
+    @patch('app.bot.telegram_bot.get_loop_runner')
+    def test_successfully_wrap_async_scan_command(self, mock_get_loop_runner):
+        """Test that scan_command_sync runs the async method on the shared loop runner"""
         # Setup mocks
-        mock_loop = MagicMock()
-        mock_new_event_loop.return_value = mock_loop
+        mock_runner = MagicMock()
+        mock_get_loop_runner.return_value = mock_runner
         
         # Set up mock update and context
         mock_update = MagicMock(spec=Update)
@@ -82,32 +83,19 @@ class TestTokenBot(unittest.TestCase):
         # Patch the scan_command to be a mock
         self.bot.scan_command = AsyncMock()
         
-        # Call the wrapper
+        # Call the wrapper twice
+        self.bot.scan_command_sync(mock_update, mock_context)
         self.bot.scan_command_sync(mock_update, mock_context)
         
-        # Verify event loop was created and used
-        mock_new_event_loop.assert_called_once()
-        mock_set_event_loop.assert_called_once_with(mock_loop)
-        mock_loop.run_until_complete.assert_called_once()
-        mock_loop.close.assert_called_once()
-        
-        # Get the coroutine function that was passed to run_until_complete
-        coro_func = mock_loop.run_until_complete.call_args[0][0]
-        
-        # Execute the coroutine function directly
-        # This is a workaround since we can't easily run the coroutine in a test
-        mock_loop.run_until_complete.side_effect = lambda coro: coro.send(None)
-        
-        try:
-            # This should trigger the first part of the coroutine execution
-            # which will call scan_command
-            mock_loop.run_until_complete(coro_func)
-        except StopIteration:
-            # Expected when we manually step through the coroutine
-            pass
+        # Verify the runner was used with a timeout instead of a new loop per call
+        self.assertEqual(mock_runner.run.call_count, 2)
+        self.assertEqual(mock_runner.run.call_args[1]['timeout'], config.SCAN_TIMEOUT)
+        mock_runner.close.assert_not_called()
         
-        # Now verify scan_command was called with the right parameters
-        self.bot.scan_command.assert_called_once_with(mock_update, mock_context)
+        # Verify scan_command was called with the right parameters
+        self.bot.scan_command.assert_called_with(mock_update, mock_context, deadline=None)
+        for call in mock_runner.run.call_args_list:
+            call[0][0].close()
 
     def test_successfully_send_categorized_tokens(self):
         """Test the _send_categorized_tokens method formats and sends tokens correctly"""
@@ -194,6 +182,191 @@ class TestTokenBot(unittest.TestCase):
         mock_update.message.reply_text.assert_any_call("🔍 Starting scan...")
         mock_update.message.reply_text.assert_any_call("❌ Error: Test error")
 
+    def test_successfully_edit_status_message_during_progressive_scan(self):
+        """Test scan_command edits the status message as batches finish and then finalizes it"""
+        # Set up mocks
+        mock_update = MagicMock(spec=Update)
+        status_message = MagicMock()
+        status_message.edit_text = AsyncMock()
+        mock_update.message.reply_text = AsyncMock(return_value=status_message)
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+
+        token = {
+            'baseToken': {'symbol': 'MOON', 'name': 'MoonToken'},
+            'priceUsd': '0.1', 'volume': {'h24': '1'}, 'liquidity': {'usd': '1'},
+            'priceChange': {'h24': 1}, 'score': 9.2
+        }
+        categorized_tokens = {'Moonshot': [token], 'Risky': []}
+
+        # Drive the progress callback the way TokenService does
+        async def fake_scan(progress_callback=None, max_age=None, deadline=None):
+            await progress_callback(1, 2, categorized_tokens)
+            await progress_callback(2, 2, categorized_tokens)
+            return categorized_tokens
+        self.mock_token_service.scan_tokens = fake_scan
+        self.bot._send_categorized_tokens = AsyncMock()
+
+        with patch.object(config, 'PROGRESSIVE_SCAN', True), patch.object(config, 'PROGRESS_EDIT_INTERVAL', 0), \
+                patch.object(config, 'PAGINATED_RESULTS', False):
+            run_async(self.bot.scan_command(mock_update, mock_context))
+
+        # Progress edits show counts and top tokens, and the last edit finalizes the status
+        edits = [call[0][0] for call in status_message.edit_text.call_args_list]
+        self.assertEqual(len(edits), 3)
+        self.assertIn('1/2 batches', edits[0])
+        self.assertIn('MOON - 9.2/10 (Moonshot)', edits[0])
+        self.assertIn('2/2 batches', edits[1])
+        self.assertIn('Scan complete', edits[2])
+        self.bot._send_categorized_tokens.assert_called_once_with(mock_update, categorized_tokens)
+
+    def test_successfully_skip_note_for_results_without_snapshot(self):
+        """Test a scan's reply isn't labelled with an older snapshot's age or partial flag"""
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+
+        older = ScanSnapshot({'Moonshot': self._make_tokens('OLD', 1)}, batches_done=1, batches_total=3)
+        self.mock_token_service.get_snapshot = MagicMock(return_value=older)
+        self.mock_token_service.scan_tokens = AsyncMock(return_value={'Moonshot': self._make_tokens('NEW', 1)})
+
+        with patch.object(config, 'PAGINATED_RESULTS', True), patch.object(config, 'PROGRESSIVE_SCAN', False):
+            run_async(self.bot.scan_command(mock_update, mock_context))
+
+        reply, kwargs = mock_update.message.reply_text.call_args
+        self.assertIn('NEW0', reply[0])
+        self.assertNotIn('Partial', reply[0])
+        self.assertNotIn(older.snapshot_id, kwargs['reply_markup'].inline_keyboard[0][0].callback_data)
+
+    def test_successfully_route_replies_through_pooled_client(self):
+        """Test that with an http_client every reply and status edit goes through the pooled session"""
+        http_client = MagicMock()
+        http_client.send_message = AsyncMock(return_value={'ok': True, 'result': {'message_id': 5}})
+        http_client.edit_message_text = AsyncMock(return_value={'ok': True})
+        self.bot.http_client = http_client
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_update.effective_chat.id = 42
+        self.mock_token_service.scan_tokens = AsyncMock(return_value={'Moonshot': self._make_tokens('MOON', 1)})
+
+        with patch.object(config, 'PAGINATED_RESULTS', True), patch.object(config, 'PROGRESSIVE_SCAN', True):
+            run_async(self.bot.scan_command(mock_update, None))
+
+        mock_update.message.reply_text.assert_not_called()
+        http_client.send_message.assert_called_once_with(42, "🔍 Starting scan...", parse_mode=None, reply_markup=None)
+        chat_id, message_id, text = http_client.edit_message_text.call_args[0]
+        self.assertEqual((chat_id, message_id), (42, 5))
+        self.assertIn('MOON0', text)
+
+    def _make_tokens(self, symbol, count):
+        return [
+            {
+                'baseToken': {'symbol': f"{symbol}{i}", 'name': f"{symbol} Token {i}"},
+                'priceUsd': '1', 'volume': {'h24': '1000'}, 'liquidity': {'usd': '1000'},
+                'priceChange': {'h24': 1}, 'score': 9 - i / 10
+            }
+            for i in range(count)
+        ]
+
+    def test_successfully_render_results_page_with_keyboard(self):
+        """Test _render_results_page paginates a category and builds category/navigation buttons"""
+        categorized_tokens = {'Moonshot': self._make_tokens('MOON', 7), 'Risky': self._make_tokens('RISK', 2), 'Potential': []}
+
+        with patch.object(config, 'RESULTS_PAGE_SIZE', 5):
+            text, markup = self.bot._render_results_page(categorized_tokens, 'Moonshot', 1, snapshot_id='abc')
+
+        # Second page holds the remaining two Moonshot tokens
+        self.assertIn('page 2/2', text)
+        self.assertIn('6. MOON5', text)
+        self.assertIn('7. MOON6', text)
+        self.assertNotIn('MOON4', text)
+
+        # Empty categories get no button and the last page only offers "Prev"
+        buttons = [button for row in markup.inline_keyboard for button in row]
+        callbacks = [button.callback_data for button in buttons]
+        self.assertIn('scan:abc:Moonshot:0', callbacks)
+        self.assertIn('scan:abc:Risky:0', callbacks)
+        self.assertNotIn('scan:abc:Potential:0', callbacks)
+        self.assertIn('scan:abc:Moonshot:0', [b.callback_data for b in markup.inline_keyboard[-1]])
+        self.assertEqual(len(markup.inline_keyboard[-1]), 1)
+
+    def test_successfully_render_results_page_without_matches(self):
+        """Test _render_results_page reports no matches when every category is empty"""
+        text, markup = self.bot._render_results_page({'Moonshot': [], 'Risky': []}, 'Moonshot', 0)
+
+        self.assertEqual(text, "No matches found.")
+        self.assertEqual(len(markup.inline_keyboard), 0)
+
+    def test_successfully_serve_page_callback_from_cached_scan(self):
+        """Test results_page_callback edits the message from the cached scan without re-scanning"""
+        snapshot = MagicMock()
+        snapshot.categorized_tokens = {'Moonshot': self._make_tokens('MOON', 3), 'Risky': self._make_tokens('RISK', 1)}
+        snapshot.age = 60
+        snapshot.snapshot_id = 'abc'
+        self.mock_token_service.get_snapshot_by_id = MagicMock(return_value=snapshot)
+        self.mock_token_service.scan_tokens = AsyncMock()
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.callback_query.data = 'scan:abc:Risky:0'
+        mock_update.callback_query.answer = AsyncMock()
+        mock_update.callback_query.edit_message_text = AsyncMock()
+
+        run_async(self.bot.results_page_callback(mock_update, None))
+
+        self.mock_token_service.scan_tokens.assert_not_called()
+        mock_update.callback_query.edit_message_text.assert_called_once()
+        self.assertIn('RISK0', mock_update.callback_query.edit_message_text.call_args[0][0])
+
+    def test_unsuccessfully_serve_page_callback_when_cache_expired(self):
+        """Test results_page_callback tells the user to re-scan once the cached scan has expired"""
+        self.mock_token_service.get_snapshot_by_id = MagicMock(return_value=None)
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.callback_query.data = 'scan:abc:Moonshot:1'
+        mock_update.callback_query.answer = AsyncMock()
+        mock_update.callback_query.edit_message_text = AsyncMock()
+
+        run_async(self.bot.results_page_callback(mock_update, None))
+
+        mock_update.callback_query.edit_message_text.assert_not_called()
+        self.assertIn('expired', mock_update.callback_query.answer.call_args[0][0])
+
+    def test_unsuccessfully_serve_page_callback_from_newer_scan(self):
+        """Test results_page_callback won't page an old message with a newer scan's results"""
+        service = TokenService(MagicMock(), MagicMock())
+        service.latest_snapshot = ScanSnapshot({'Moonshot': self._make_tokens('MOON', 3)})
+        self.bot.token_service = service
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.callback_query.data = 'scan:old:Moonshot:1'
+        mock_update.callback_query.answer = AsyncMock()
+        mock_update.callback_query.edit_message_text = AsyncMock()
+
+        run_async(self.bot.results_page_callback(mock_update, None))
+
+        mock_update.callback_query.edit_message_text.assert_not_called()
+        self.assertIn('expired', mock_update.callback_query.answer.call_args[0][0])
+
+    def test_successfully_turn_page_after_a_newer_scan(self):
+        """Test pages of an earlier scan still turn after a (warm) re-scan replaced the latest snapshot"""
+        service = TokenService(MagicMock(), MagicMock())
+        first = ScanSnapshot({'Moonshot': self._make_tokens('FIRST', 12)})
+        first.snapshot_id = 'first'
+        service.latest_snapshot = first
+        service.latest_snapshot = ScanSnapshot({'Moonshot': self._make_tokens('SECOND', 12)})
+        self.bot.token_service = service
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.callback_query.data = 'scan:first:Moonshot:1'
+        mock_update.callback_query.answer = AsyncMock()
+        mock_update.callback_query.edit_message_text = AsyncMock()
+
+        run_async(self.bot.results_page_callback(mock_update, None))
+
+        page = mock_update.callback_query.edit_message_text.call_args[0][0]
+        self.assertIn('FIRST', page)
+        self.assertNotIn('SECOND', page)
+
     def test_successfully_display_help_command(self):
         """Test help_command response format"""
         # Set up mocks
@@ -211,6 +384,148 @@ class TestTokenBot(unittest.TestCase):
         self.assertIn("/scan", help_message)
         self.assertIn("/help", help_message)
 
+    @patch('app.bot.telegram_bot.get_blocklist')
+    def test_successfully_block_address_as_admin(self, mock_get_blocklist):
+        """Test /block adds an expiring entry for admins"""
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_update.effective_user.id = 7
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = ['RugAddr', '24']
+
+        with patch.object(config, 'ADMIN_USER_IDS', {7}):
+            run_async(self.bot.block_command(mock_update, mock_context))
+
+        mock_get_blocklist.return_value.block.assert_called_once_with('RugAddr', ttl=24 * 3600)
+        self.assertIn("Blocked RugAddr for 24h", mock_update.message.reply_text.call_args[0][0])
+
+    @patch('app.bot.telegram_bot.get_blocklist')
+    def test_unsuccessfully_block_address_for_non_positive_hours(self, mock_get_blocklist):
+        """Test /block rejects zero, negative and non-finite hours instead of blocking forever"""
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_update.effective_user.id = 7
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+
+        with patch.object(config, 'ADMIN_USER_IDS', {7}):
+            for hours in ('0', '-2', 'nan', 'inf'):
+                mock_context.args = ['RugAddr', hours]
+                run_async(self.bot.block_command(mock_update, mock_context))
+
+        mock_get_blocklist.return_value.block.assert_not_called()
+        self.assertIn("positive number", mock_update.message.reply_text.call_args[0][0])
+
+    @patch('app.bot.telegram_bot.get_blocklist')
+    def test_unsuccessfully_block_address_as_non_admin(self, mock_get_blocklist):
+        """Test /block and /unblock are refused for non-admins"""
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_update.effective_user.id = 8
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = ['RugAddr']
+
+        with patch.object(config, 'ADMIN_USER_IDS', {7}):
+            run_async(self.bot.block_command(mock_update, mock_context))
+            run_async(self.bot.unblock_command(mock_update, mock_context))
+
+        mock_get_blocklist.return_value.block.assert_not_called()
+        mock_get_blocklist.return_value.unblock.assert_not_called()
+        mock_update.message.reply_text.assert_any_call("⛔ This command is restricted to bot admins.")
+
+    def test_unsuccessfully_profile_as_non_admin(self):
+        """Test /profile is refused for non-admins and never starts a scan"""
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_update.effective_user.id = 8
+        self.mock_token_service.profile_scan = AsyncMock()
+
+        with patch.object(config, 'ADMIN_USER_IDS', {7}):
+            run_async(self.bot.profile_command(mock_update, None))
+
+        self.mock_token_service.profile_scan.assert_not_called()
+        mock_update.message.reply_text.assert_called_once_with("⛔ This command is restricted to bot admins.")
+
+    def test_unsuccessfully_profile_while_scan_in_flight(self):
+        """Test /profile is rejected while a scan is running rather than reporting that scan"""
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_update.effective_user.id = 7
+        self.mock_token_service.scan_in_progress = True
+        self.mock_token_service.profile_scan = AsyncMock()
+
+        with patch.object(config, 'ADMIN_USER_IDS', {7}):
+            run_async(self.bot.profile_command(mock_update, None))
+
+        self.mock_token_service.profile_scan.assert_not_called()
+        self.assertIn("already running", mock_update.message.reply_text.call_args[0][0])
+
+    def test_successfully_watch_token(self):
+        """Test /watch registers the chat and /watchlist lists it"""
+        watchlist = MagicMock()
+        watchlist.watch = MagicMock(return_value=True)
+        watchlist.watched_by = MagicMock(return_value=['AAA'])
+        self.bot.watchlist = watchlist
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_update.effective_chat.id = 42
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = ['AAA']
+
+        run_async(self.bot.watch_command(mock_update, mock_context))
+        run_async(self.bot.watchlist_command(mock_update, mock_context))
+
+        watchlist.watch.assert_called_once_with(42, 'AAA')
+        mock_update.message.reply_text.assert_any_call("👁 Watching:\nAAA")
+
+    @patch('app.bot.telegram_bot.get_blocklist')
+    def test_unsuccessfully_watch_blocklisted_token(self, mock_get_blocklist):
+        """Test /watch refuses a blocklisted address instead of silently never polling it"""
+        mock_get_blocklist.return_value.is_blocked = MagicMock(return_value=True)
+        watchlist = MagicMock()
+        self.bot.watchlist = watchlist
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = ['RugAddr']
+
+        run_async(self.bot.watch_command(mock_update, mock_context))
+
+        watchlist.watch.assert_not_called()
+        self.assertIn("blocklisted", mock_update.message.reply_text.call_args[0][0])
+
+    def test_successfully_answer_top_from_snapshot(self):
+        """Test /top answers from the latest snapshot without scanning"""
+        tokens = [{'baseToken': {'symbol': f"T{i}"}, 'volume': {'h24': i * 1000}} for i in range(5)]
+        self.mock_token_service.get_snapshot = MagicMock(return_value=ScanSnapshot({'Moonshot': tokens}))
+        self.mock_token_service.scan_tokens = AsyncMock()
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+        mock_context.args = ['volume', '2']
+
+        run_async(self.bot.top_command(mock_update, mock_context))
+
+        reply = mock_update.message.reply_text.call_args[0][0]
+        self.assertIn("Top 2 by volume", reply)
+        self.assertIn("1. T4: 4,000", reply)
+        self.mock_token_service.scan_tokens.assert_not_called()
+
+    def test_unsuccessfully_answer_top_for_non_finite_count(self):
+        """Test /top with an infinite or NaN count reports a query error instead of raising"""
+        self.mock_token_service.get_snapshot = MagicMock(return_value=ScanSnapshot({'Moonshot': []}))
+
+        mock_update = MagicMock(spec=Update)
+        mock_update.message.reply_text = AsyncMock()
+        mock_context = MagicMock(spec=ContextTypes.DEFAULT_TYPE)
+
+        for count in ('inf', 'nan'):
+            mock_context.args = ['volume', count]
+            run_async(self.bot.top_command(mock_update, mock_context))
+            self.assertIn("Not a finite number", mock_update.message.reply_text.call_args[0][0])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
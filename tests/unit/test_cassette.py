@@ -0,0 +1,126 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.data.cassette import Cassette, CassetteSession, CassetteMiss, RECORD, REPLAY
+from app.data.fetcher import DexScreenerFetcher
+import app.config as config
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+        self.requests = []
+        self.responses = {
+            'https://jup/tokens': [{'address': 'A'}, {'address': 'B'}],
+            'https://dex/tokens/A,B': {'pairs': [{'baseToken': {'address': 'A'}}]},
+        }
+
+        requests, responses = self.requests, self.responses
+
+        # Custom async context manager implementation
+        class AsyncContextManagerMock:
+            def __init__(self, method, url, params=None):
+                requests.append((url, params))
+                self.url = url
+
+            async def __aenter__(self):
+                mock_response = MagicMock()
+                mock_response.status = 200
+                mock_response.content_type = 'application/json'
+                async def mock_read():
+                    return json.dumps(responses[self.url]).encode()
+                mock_response.read = mock_read
+                return mock_response
+
+            async def __aexit__(self, exc_type, exc_val, exc_tb):
+                pass
+
+        self.live_session = MagicMock()
+        self.live_session.request = MagicMock(side_effect=AsyncContextManagerMock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _record(self):
+        session = CassetteSession(Cassette(self.directory), RECORD, session=self.live_session)
+
+        async def do_requests():
+            async with session.get('https://jup/tokens', params={'tags': 'birdeye-trending'}) as response:
+                trending = await response.json()
+            async with session.get('https://dex/tokens/A,B') as response:
+                pairs = await response.json()
+            # Identical body again: stored once
+            async with session.get('https://dex/tokens/A,B') as response:
+                await response.json()
+            return trending, pairs
+
+        return run_async(do_requests())
+
+    def test_successfully_record_and_replay_without_network(self):
+        """Test recorded responses replay identically and bodies are content-addressed"""
+        recorded = self._record()
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, 'bodies'))), 2)
+
+        session = CassetteSession(Cassette(self.directory), REPLAY, timing='fast')
+
+        async def replay():
+            async with session.get('https://jup/tokens', params={'tags': 'birdeye-trending'}) as response:
+                trending = await response.json()
+            async with session.get('https://dex/tokens/A,B') as response:
+                pairs = await response.json()
+            return trending, pairs
+
+        with patch('app.data.cassette.asyncio.sleep') as mock_sleep:
+            self.assertEqual(run_async(replay()), recorded)
+            mock_sleep.assert_not_called()
+        self.assertEqual(len(self.requests), 3)
+
+    def test_unsuccessfully_replay_unrecorded_request(self):
+        """Test a request missing from the cassette raises CassetteMiss"""
+        self._record()
+        session = CassetteSession(Cassette(self.directory), REPLAY)
+
+        async def replay():
+            async with session.get('https://dex/tokens/C') as response:
+                return await response.json()
+
+        with self.assertRaises(CassetteMiss):
+            run_async(replay())
+
+    def test_successfully_drive_fetcher_from_cassette(self):
+        """Test the fetcher picks the cassette session from config and skips throttling on fast replay"""
+        self._record()
+        fetcher = DexScreenerFetcher()
+        fetcher.jupiter_base_url = 'https://jup'
+        fetcher.dex_base_url = 'https://dex'
+
+        with patch.object(config, 'CASSETTE_MODE', 'replay'), \
+             patch.object(config, 'CASSETTE_DIR', self.directory), \
+             patch.object(config, 'CASSETTE_TIMING', 'fast'):
+            tokens = run_async(fetcher.get_validated_tokens(min_liquidity=0, min_volume=0))
+
+        self.assertIsInstance(fetcher.session, CassetteSession)
+        self.assertFalse(fetcher.throttle)
+        self.assertEqual([t['baseToken']['address'] for t in tokens], ['A'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import MagicMock
+import asyncio
+import csv
+import io
+import json
+import subprocess
+import sys
+import os
+
+# Add the project root directory to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.cli import TokenStreamWriter, run_scan, get_field
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def make_token(address, symbol, liquidity):
+    return {'pairAddress': f"{address}-pair", 'baseToken': {'address': address, 'symbol': symbol},
+            'liquidity': {'usd': liquidity}, 'score': 7.5}
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.first = make_token('A', 'AAA', 150000)
+        self.second = make_token('B', 'BBB', 250000)
+
+        first, second = self.first, self.second
+        self.written_during_scan = []
+
+        async def scan_tokens(progress_callback=None, max_age=None, deadline=None):
+            await progress_callback(1, 2, {'Moonshot': [first]})
+            self.written_during_scan.append(self.out.getvalue())
+            await progress_callback(2, 2, {'Moonshot': [first], 'Risky': [second]})
+            return {'Moonshot': [first], 'Risky': [second]}
+
+        async def shutdown():
+            pass
+
+        self.service = MagicMock()
+        self.service.scan_tokens = scan_tokens
+        self.service.shutdown = shutdown
+        self.out = io.StringIO()
+
+    def test_successfully_stream_jsonl_while_scanning(self):
+        """Test tokens are written once each, as soon as their batch arrives"""
+        writer = TokenStreamWriter(self.out, 'jsonl', ['category', 'baseToken.symbol', 'liquidity.usd'])
+        written = run_async(run_scan(self.service, writer))
+
+        rows = [json.loads(line) for line in self.out.getvalue().splitlines()]
+        self.assertEqual(written, 2)
+        self.assertEqual(rows, [
+            {'category': 'Moonshot', 'baseToken.symbol': 'AAA', 'liquidity.usd': 150000},
+            {'category': 'Risky', 'baseToken.symbol': 'BBB', 'liquidity.usd': 250000},
+        ])
+        self.assertEqual(self.written_during_scan[0].count('\n'), 1)
+
+    def test_successfully_write_csv_with_selected_fields(self):
+        """Test CSV output has a header and one row per token"""
+        writer = TokenStreamWriter(self.out, 'csv', ['baseToken.symbol', 'score', 'missing.field'])
+        run_async(run_scan(self.service, writer))
+
+        rows = list(csv.DictReader(io.StringIO(self.out.getvalue())))
+        self.assertEqual([row['baseToken.symbol'] for row in rows], ['AAA', 'BBB'])
+        self.assertEqual(rows[0]['missing.field'], '')
+
+    def test_successfully_write_tokens_without_address(self):
+        """Test tokens without a pair or base address are each written once, not dropped"""
+        first, second = {'baseToken': {'symbol': 'X'}}, {'baseToken': {'symbol': 'Y'}}
+        writer = TokenStreamWriter(self.out, 'jsonl', ['baseToken.symbol'])
+        writer.write({'Moonshot': [first]})
+        writer.write({'Moonshot': [first, second]})
+
+        self.assertEqual([json.loads(line) for line in self.out.getvalue().splitlines()],
+                         [{'baseToken.symbol': 'X'}, {'baseToken.symbol': 'Y'}])
+
+    def test_successfully_write_universe_scan_once_at_the_end(self):
+        """Test a service whose partial results can shrink is written only from its final result"""
+        self.service.partial_results_are_final = False
+
+        async def scan_tokens(progress_callback=None, max_age=None, deadline=None):
+            self.assertIsNone(progress_callback)
+            return {'Moonshot': [self.second]}
+        self.service.scan_tokens = scan_tokens
+
+        writer = TokenStreamWriter(self.out, 'jsonl', ['baseToken.symbol'])
+        self.assertEqual(run_async(run_scan(self.service, writer)), 1)
+        self.assertEqual(json.loads(self.out.getvalue()), {'baseToken.symbol': 'BBB'})
+
+    def test_unsuccessfully_use_csv_without_fields(self):
+        """Test whole-token output is refused for CSV"""
+        with self.assertRaises(ValueError):
+            TokenStreamWriter(self.out, 'csv', None)
+        self.assertIsNone(get_field({'a': 1}, 'a.b'))
+
+    def test_successfully_import_without_telegram(self):
+        """Test the CLI and the service it builds never import python-telegram-bot"""
+        code = (
+            "import sys, app.cli; app.cli.create_service('enhanced'); "
+            "print('telegram' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
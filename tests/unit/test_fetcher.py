@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock, AsyncMock
 import asyncio
 import aiohttp
-from time import time
+from time import time, monotonic
 import sys
 import os
 
@@ -350,5 +350,29 @@ class TestDexScreenerFetcher(unittest.TestCase):
         result = run_async(self.fetcher.get_validated_tokens())
         self.assertEqual(result, [])
 
+    @patch.object(DexScreenerFetcher, 'get_jupiter_trending')
+    @patch.object(DexScreenerFetcher, 'init_session')
+    def test_successfully_return_partial_results_at_deadline(self, mock_init, mock_jupiter):
+        """Test get_validated_tokens cancels batches that run past the deadline and keeps what arrived"""
+        mock_jupiter.return_value = [{'address': f'addr{i}'} for i in range(3)]
+        self.fetcher.BATCH_SIZE = 1
+        pair = {'baseToken': {'address': 'addr0'}, 'liquidity': {'usd': 20000}, 'volume': {'h24': 5000}}
+
+        # The first batch is fast, the second hangs past the deadline
+        async def mock_dex_batch(batch):
+            if batch == ['addr0']:
+                return [pair]
+            await asyncio.sleep(10)
+            return []
+        self.fetcher.get_dex_data_batch = mock_dex_batch
+
+        result = run_async(self.fetcher.get_validated_tokens(
+            min_liquidity=10000, min_volume=1000, deadline=monotonic() + 0.05
+        ))
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(self.fetcher.last_scan_progress, {'batches_done': 1, 'batches_total': 3})
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import subprocess
+import sys
+import os
+
+# Add the project root directory to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import lambda_handler
+import app.config as config
+from app.services.scan_queue import InProcessScanQueue, SCAN_JOB_SOURCE
+from app.services.dedup import InMemoryDedupStore
+
+def webhook_event(text, update_id=1, chat_id=42):
+    update = {'update_id': update_id, 'message': {'chat': {'id': chat_id}, 'text': text}}
+    return {'body': json.dumps(update)}
+
+class TestLambdaHandler(unittest.TestCase):
+    def setUp(self):
+        lambda_handler._components = None
+        lambda_handler._deduplicator = None
+
+    def tearDown(self):
+        lambda_handler._components = None
+        lambda_handler._deduplicator = None
+
+    def test_successfully_import_without_heavy_dependencies(self):
+        """Test importing the handler doesn't load python-telegram-bot or aiohttp"""
+        code = (
+            "import sys, lambda_handler; "
+            "print(sorted(m for m in ('telegram', 'aiohttp', 'requests') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    @patch.object(lambda_handler, 'get_components')
+    def test_successfully_answer_non_scan_events_without_components(self, mock_get_components):
+        """Test the deployment ping and non-scan webhooks never build the bot"""
+        response = lambda_handler.lambda_handler({'source': 'github-action-test'}, None)
+        self.assertEqual(response['statusCode'], 200)
+
+        response = lambda_handler.lambda_handler(webhook_event('/help'), None)
+        self.assertEqual(response['statusCode'], 200)
+
+        mock_get_components.assert_not_called()
+
+    @patch('app.services.loop_runner.get_loop_runner')
+    @patch.object(lambda_handler, 'run_scan_with_bot')
+    @patch('telegram.ext.Application.builder')
+    def test_successfully_reuse_components_across_invocations(self, mock_builder, mock_run_scan, mock_get_loop_runner):
+        """Test the bot and service are built once and reused by warm invocations"""
+        lambda_handler.lambda_handler(webhook_event('/scan', update_id=1), None)
+        lambda_handler.lambda_handler(webhook_event('/scan', update_id=2), None)
+
+        mock_builder.assert_called_once()
+        self.assertEqual(mock_get_loop_runner.return_value.add_shutdown_callback.call_count, 2)
+        self.assertEqual(mock_run_scan.call_count, 2)
+        first_bot = mock_run_scan.call_args_list[0][0][0]
+        second_bot = mock_run_scan.call_args_list[1][0][0]
+        self.assertIs(first_bot, second_bot)
+
+    @patch.object(lambda_handler, 'run_scan_with_bot')
+    @patch.object(lambda_handler, 'get_components')
+    def test_successfully_defer_scan_in_async_dispatch_mode(self, mock_get_components, mock_run_scan):
+        """Test async mode acknowledges /scan immediately and a worker invocation runs the job"""
+        queue = InProcessScanQueue()
+
+        with patch.object(config, 'SCAN_DISPATCH_MODE', 'async'), \
+                patch.object(lambda_handler, 'get_scan_queue', return_value=queue):
+            response = lambda_handler.lambda_handler(webhook_event('/scan', update_id=7, chat_id=99), None)
+
+        # Nothing ran on the webhook path
+        self.assertEqual(json.loads(response['body'])['status'], 'queued')
+        mock_get_components.assert_not_called()
+        mock_run_scan.assert_not_called()
+        self.assertEqual(len(queue.jobs), 1)
+        self.assertEqual(queue.jobs[0]['chat_id'], 99)
+        self.assertEqual(queue.jobs[0]['update_id'], 7)
+
+        # The worker path picks the job up
+        ran = queue.drain(lambda job: lambda_handler.lambda_handler({'source': SCAN_JOB_SOURCE, 'job': job}, None))
+        self.assertEqual(ran, 1)
+        mock_run_scan.assert_called_once_with(mock_get_components.return_value['bot'], 99, None)
+
+    @patch.object(lambda_handler, 'run_scan_with_bot')
+    @patch.object(lambda_handler, 'get_components')
+    def test_successfully_drop_duplicate_webhook_retries(self, mock_get_components, mock_run_scan):
+        """Test a retried update_id and a second /scan while one is in flight do no work"""
+        first = lambda_handler.lambda_handler(webhook_event('/scan', update_id=5, chat_id=1), None)
+        retry = lambda_handler.lambda_handler(webhook_event('/scan', update_id=5, chat_id=1), None)
+        self.assertEqual(json.loads(first['body'])['status'], 'success')
+        self.assertEqual(json.loads(retry['body'])['status'], 'duplicate')
+        self.assertEqual(mock_run_scan.call_count, 1)
+
+        # A new update for a chat whose scan is still claimed is dropped too
+        lambda_handler.get_deduplicator().claim_scan(2)
+        response = lambda_handler.lambda_handler(webhook_event('/scan', update_id=6, chat_id=2), None)
+        self.assertEqual(json.loads(response['body'])['status'], 'duplicate')
+        self.assertEqual(mock_run_scan.call_count, 1)
+
+    @patch.object(lambda_handler, 'get_components')
+    def test_unsuccessfully_enqueue_releases_claims_for_retry(self, mock_get_components):
+        """Test a failed enqueue returns 500 and Telegram's retry of the same update is processed"""
+        queue = InProcessScanQueue()
+        queue.enqueue = MagicMock(side_effect=[RuntimeError("queue down"), None])
+
+        with patch.object(config, 'SCAN_DISPATCH_MODE', 'async'), \
+                patch.object(lambda_handler, 'get_scan_queue', return_value=queue):
+            failed = lambda_handler.lambda_handler(webhook_event('/scan', update_id=8, chat_id=3), None)
+            retry = lambda_handler.lambda_handler(webhook_event('/scan', update_id=8, chat_id=3), None)
+
+        self.assertEqual(failed['statusCode'], 500)
+        self.assertEqual(json.loads(retry['body'])['status'], 'queued')
+        self.assertEqual(queue.enqueue.call_count, 2)
+
+
+class TestInMemoryDedupStore(unittest.TestCase):
+    def test_successfully_expire_and_bound_keys(self):
+        """Test keys expire after their TTL and the store never exceeds its bound"""
+        store = InMemoryDedupStore(max_entries=2)
+
+        with patch('app.services.dedup.time', return_value=100):
+            self.assertTrue(store.add_if_absent('a', ttl=10))
+            self.assertFalse(store.add_if_absent('a', ttl=10))
+            self.assertTrue(store.add_if_absent('b', ttl=10))
+            self.assertTrue(store.add_if_absent('c', ttl=10))
+            self.assertEqual(len(store), 2)
+            # 'a' was evicted as the oldest key
+            self.assertTrue(store.add_if_absent('a', ttl=10))
+
+        with patch('app.services.dedup.time', return_value=111):
+            self.assertTrue(store.add_if_absent('c', ttl=10))
+            self.assertEqual(len(store), 1)
+
+    def test_successfully_expire_keys_by_their_own_ttl(self):
+        """Test a short-lived key behind a long-lived one still expires on time"""
+        store = InMemoryDedupStore()
+
+        with patch('app.services.dedup.time', return_value=100):
+            store.add_if_absent('update:1', ttl=3600)
+            store.add_if_absent('scan:1', ttl=300)
+
+        with patch('app.services.dedup.time', return_value=401):
+            self.assertTrue(store.add_if_absent('update:2', ttl=3600))
+            self.assertEqual(len(store), 2)
+            self.assertFalse(store.add_if_absent('update:1', ttl=3600))
+
+
+if __name__ == '__main__':
+    unittest.main()
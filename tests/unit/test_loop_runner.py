@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import app.services.loop_runner as loop_runner
+from app.services.loop_runner import LoopRunner
+
+class TestLoopRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = LoopRunner()
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_successfully_reuse_loop_across_runs(self):
+        """Test consecutive runs share one loop and background tasks survive between them"""
+        state = {'ticks': 0}
+
+        async def ticker():
+            while True:
+                state['ticks'] += 1
+                await asyncio.sleep(0)
+
+        async def start_background():
+            asyncio.ensure_future(ticker())
+            return asyncio.get_running_loop()
+
+        async def current_loop():
+            await asyncio.sleep(0.01)
+            return asyncio.get_running_loop()
+
+        first_loop = self.runner.run(start_background())
+        ticks_after_first = state['ticks']
+        second_loop = self.runner.run(current_loop())
+
+        self.assertIs(first_loop, second_loop)
+        self.assertGreater(state['ticks'], ticks_after_first)
+
+    def test_unsuccessfully_run_past_timeout(self):
+        """Test run cancels a coroutine that exceeds its timeout and the loop stays usable"""
+        with self.assertRaises(asyncio.TimeoutError):
+            self.runner.run(asyncio.sleep(1), timeout=0.01)
+
+        self.assertEqual(self.runner.run(asyncio.sleep(0, result='ok')), 'ok')
+
+    def test_successfully_close_with_shutdown_callbacks(self):
+        """Test close awaits shutdown callbacks, cancels pending tasks and closes the loop"""
+        session_close = AsyncMock()
+        self.runner.add_shutdown_callback(session_close)
+
+        async def start_forever_task():
+            return asyncio.ensure_future(asyncio.sleep(3600))
+
+        task = self.runner.run(start_forever_task())
+        self.runner.close()
+
+        session_close.assert_awaited_once()
+        self.assertTrue(task.cancelled())
+        self.assertTrue(self.runner.closed)
+        coroutine = asyncio.sleep(0)
+        with self.assertRaises(RuntimeError):
+            self.runner.run(coroutine)
+        coroutine.close()
+
+    def test_successfully_close_when_requested_during_run(self):
+        """Test a close requested from inside a running loop (SIGTERM mid-scan) happens once run unwinds"""
+        session_close = AsyncMock()
+        self.runner.add_shutdown_callback(session_close)
+
+        async def interrupted_scan():
+            self.runner.request_close()
+            await asyncio.sleep(3600)
+
+        with self.assertRaises(RuntimeError):
+            self.runner.run(interrupted_scan())
+
+        session_close.assert_awaited_once()
+        self.assertTrue(self.runner.closed)
+
+    def test_successfully_install_exit_hooks_once(self):
+        """Test replacing a closed runner doesn't register another atexit hook or SIGTERM handler"""
+        with patch.object(loop_runner, '_runner', None), patch.object(loop_runner, '_hooks_installed', False), \
+                patch.object(loop_runner.atexit, 'register') as register, \
+                patch.object(loop_runner, '_install_sigterm_handler') as install:
+            first = loop_runner.get_loop_runner()
+            first.close()
+            second = loop_runner.get_loop_runner()
+            second.close()
+
+        self.assertIsNot(first, second)
+        register.assert_called_once_with(loop_runner._close_runner)
+        install.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import patch
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.data.metadata_cache import MetadataCache
+from app.data.fetcher import DexScreenerFetcher
+import app.config as config
+
+def make_pair(address, price, info=None):
+    pair = {'baseToken': {'address': address}, 'priceUsd': price, 'liquidity': {'usd': 1}}
+    if info is not None:
+        pair['info'] = info
+    return pair
+
+class TestMetadataCache(unittest.TestCase):
+    def test_successfully_share_metadata_across_scans(self):
+        """Test unchanged info blocks are shared and pairs without info fall back to the cache"""
+        fetcher = DexScreenerFetcher()
+        socials = {'socials': [{'type': 'twitter', 'followers': 12000}]}
+
+        first = fetcher.process_dex_pair(make_pair('AAA', '1.0', dict(socials)))
+        second = fetcher.process_dex_pair(make_pair('aaa', '1.5', dict(socials)))
+        without_info = fetcher.process_dex_pair(make_pair('AAA', '1.7'))
+
+        self.assertIs(first['info'], second['info'])
+        self.assertIs(without_info['info'], first['info'])
+        self.assertEqual(without_info['priceUsd'], '1.7')
+        self.assertEqual(fetcher.process_dex_pair(make_pair('BBB', '2'))['info'], {'socials': []})
+
+    def test_unsuccessfully_use_expired_metadata(self):
+        """Test entries older than the TTL are not served"""
+        cache = MetadataCache(path='', ttl=60)
+        with patch('app.data.metadata_cache.time', return_value=1000):
+            cache.put('AAA', {'socials': []})
+        with patch('app.data.metadata_cache.time', return_value=1059):
+            self.assertEqual(cache.get('aaa'), {'socials': []})
+        with patch('app.data.metadata_cache.time', return_value=1061):
+            self.assertIsNone(cache.get('AAA'))
+
+    def test_successfully_persist_metadata(self):
+        """Test flushed entries survive a restart when a SQLite path is set"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metadata.db')
+            cache = MetadataCache(path=path, ttl=3600)
+            cache.put('AAA', {'socials': [{'type': 'telegram'}]})
+            cache.close()
+
+            reopened = MetadataCache(path=path, ttl=3600)
+            self.assertEqual(reopened.get('AAA'), {'socials': [{'type': 'telegram'}]})
+            reopened.close()
+
+    def test_unsuccessfully_flush_to_locked_database(self):
+        """Test a flush to a database another worker holds locked is logged and retried, not raised"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metadata.db')
+            with patch.object(config, 'METADATA_CACHE_DB_TIMEOUT', 0.01):
+                cache = MetadataCache(path=path, ttl=3600)
+            other = sqlite3.connect(path)
+            other.execute("BEGIN EXCLUSIVE")
+
+            cache.put('AAA', {'socials': []})
+            with self.assertLogs('MetadataCache', level='WARNING'):
+                cache.flush()
+            self.assertEqual(len(cache._pending), 1)
+
+            other.rollback()
+            other.close()
+            cache.close()
+            reopened = MetadataCache(path=path, ttl=3600)
+            self.assertEqual(reopened.get('AAA'), {'socials': []})
+            reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.metrics import MetricsRegistry, Histogram
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry(namespace="TokenScanner")
+        self.registry.enabled = True
+
+    def test_successfully_record_histogram_quantiles(self):
+        """Test observations land in buckets and quantiles use bucket upper bounds"""
+        histogram = Histogram(buckets=(10, 100, 1000))
+        for value in [1, 2, 3, 50, 5000]:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [3, 1, 0, 1])
+        self.assertEqual(histogram.quantile(0.5), 10)
+        self.assertEqual(histogram.quantile(0.99), 5000)
+        self.assertEqual((histogram.min, histogram.max, histogram.count), (1, 5000, 5))
+
+    def test_successfully_time_spans_with_dimensions(self):
+        """Test span records durations per stage and dimension set"""
+        with patch('app.services.metrics.time.perf_counter', side_effect=[1.0, 1.25, 2.0, 2.5]):
+            with self.registry.span('telegram_send', method='reply'):
+                pass
+            with self.registry.span('telegram_send', method='edit'):
+                pass
+
+        self.assertEqual(len(self.registry.histograms), 2)
+        reply = self.registry.histograms[('telegram_send', (('method', 'reply'),))]
+        self.assertAlmostEqual(reply.sum, 250)
+
+    def test_successfully_export_emf_and_prometheus(self):
+        """Test EMF lines and Prometheus text expose the recorded stages"""
+        self.registry.observe('dex_batch', 120)
+        self.registry.observe('dex_batch', 80)
+        self.registry.observe('classify', 3, classifier='enhanced')
+
+        emf = [json.loads(line) for line in self.registry.to_emf()]
+        batch_record = next(record for record in emf if 'dex_batch_ms' in record)
+        self.assertEqual(batch_record['dex_batch_ms'], {'Min': 80, 'Max': 120, 'Sum': 200, 'Count': 2})
+        self.assertEqual(batch_record['_aws']['CloudWatchMetrics'][0]['Namespace'], "TokenScanner")
+        classify_record = next(record for record in emf if 'classify_ms' in record)
+        self.assertEqual(classify_record['classifier'], 'enhanced')
+        self.assertEqual(classify_record['_aws']['CloudWatchMetrics'][0]['Dimensions'], [['classifier']])
+
+        text = self.registry.to_prometheus()
+        self.assertIn('tokenscanner_dex_batch_ms_bucket{le="100"} 1', text)
+        self.assertIn('tokenscanner_dex_batch_ms_bucket{le="+Inf"} 2', text)
+        self.assertIn('tokenscanner_dex_batch_ms_count 2', text)
+        self.assertIn('tokenscanner_classify_ms_count{classifier="enhanced"} 1', text)
+
+    def test_unsuccessfully_record_when_disabled(self):
+        """Test a disabled registry records nothing"""
+        self.registry.enabled = False
+        with self.registry.span('classify'):
+            pass
+        self.assertEqual(self.registry.histograms, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.data.refresh_scheduler import TieredRefreshScheduler
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def make_pair(address, volume, h1_change=0):
+    return {'baseToken': {'address': address}, 'volume': {'h24': volume}, 'priceChange': {'h1': h1_change}}
+
+class TestTieredRefreshScheduler(unittest.TestCase):
+    def setUp(self):
+        self.mock_fetcher = MagicMock()
+        self.mock_fetcher.BATCH_SIZE = 2
+        self.mock_fetcher.RATE_LIMIT_REQUESTS = 300
+        self.mock_fetcher.RATE_LIMIT_WINDOW = 60
+        self.scheduler = TieredRefreshScheduler(self.mock_fetcher)
+        self.scheduler.tier_intervals = {'hot': 60, 'warm': 300, 'cold': 900}
+
+    def test_successfully_assign_tiers_from_observed_pairs(self):
+        """Test volume, volatility and score each promote a token into the hot tier"""
+        self.scheduler.track(['hot_vol', 'hot_move', 'hot_score', 'warm', 'cold'])
+        self.scheduler.observe([
+            make_pair('hot_vol', 1000000),
+            make_pair('hot_move', 1000, h1_change=-25),
+            dict(make_pair('hot_score', 1000), score=8.5),
+            make_pair('warm', 100000),
+            make_pair('cold', 1000),
+            make_pair('cold', 60000),   # a second, bigger pair for the same token wins
+        ], now=1000)
+
+        tiers = {address: entry['tier'] for address, entry in self.scheduler.entries.items()}
+        self.assertEqual(tiers, {
+            'hot_vol': 'hot', 'hot_move': 'hot', 'hot_score': 'hot', 'warm': 'warm', 'cold': 'warm'
+        })
+
+    def test_successfully_pack_batches_with_most_overdue_addresses(self):
+        """Test unseen addresses go first, then addresses ranked by how overdue they are"""
+        self.scheduler.track(['hot', 'warm', 'cold', 'new'])
+        self.scheduler.observe([
+            make_pair('hot', 1000000), make_pair('warm', 100000), make_pair('cold', 1000)
+        ], now=1000)
+        self.scheduler.entries['cold']['tier'] = 'cold'
+
+        # 240s later: hot is 4 intervals overdue, warm and cold are not yet due
+        batches = self.scheduler.next_batches(max_batches=5, now=1240)
+        self.assertEqual(batches, [['new', 'hot']])
+
+        # The budget caps how many addresses go out
+        self.scheduler.entries['warm']['last_refreshed'] = 0.5
+        self.assertEqual(self.scheduler.next_batches(max_batches=1, now=1240), [['new', 'warm']])
+        self.assertEqual(self.scheduler.budget_batches(period=10), 50)
+
+    def test_successfully_refresh_due_addresses(self):
+        """Test refresh_due fetches due batches and marks addresses refreshed even without pairs"""
+        self.scheduler.track(['a', 'b', 'c'])
+        self.mock_fetcher.init_session = AsyncMock()
+        self.mock_fetcher.get_dex_data_batch = AsyncMock(side_effect=[[make_pair('a', 1000000)], []])
+        self.mock_fetcher.process_dex_pair = MagicMock(side_effect=lambda pair: pair)
+
+        refreshed = run_async(self.scheduler.refresh_due(max_batches=2, now=500))
+
+        self.assertEqual(len(refreshed), 1)
+        self.assertEqual(self.mock_fetcher.get_dex_data_batch.call_count, 2)
+        self.assertEqual(self.scheduler.entries['a']['tier'], 'hot')
+        self.assertTrue(all(entry['last_refreshed'] == 500 for entry in self.scheduler.entries.values()))
+        self.assertEqual(self.scheduler.next_batches(max_batches=2, now=510), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
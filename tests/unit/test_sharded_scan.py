@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.data.blocklist import Blocklist
+from app.services.sharded_scan import HashRing, ShardExecutor, ShardedTokenService, run_shard
+import app.config as config
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class InlineExecutor(ShardExecutor):
+    """Answers shard jobs in-process, scoring each token by its index"""
+
+    def __init__(self, fail_shard=None):
+        self.jobs = []
+        self.fail_shard = fail_shard
+
+    async def run(self, job):
+        self.jobs.append(job)
+        if job['shard'] == self.fail_shard:
+            raise RuntimeError("worker died")
+        tokens = [{'address': t['address'], 'score': t['index']} for t in job['tokens']]
+        return {'shard': job['shard'], 'categorized': {'Moonshot': tokens},
+                'batches_done': 1, 'batches_total': 1}
+
+class TestShardedScan(unittest.TestCase):
+    def setUp(self):
+        self.universe = [{'address': f"Addr{i}", 'index': i} for i in range(200)]
+
+        async def get_universe():
+            return self.universe
+
+        self.fetcher = MagicMock()
+        self.fetcher.get_universe = get_universe
+        self.fetcher._before_deadline = lambda coro, deadline: coro
+        self.fetcher.BATCH_SIZE = 30
+
+    def test_successfully_partition_with_consistent_hashing(self):
+        """Test every address lands on one shard and growing the ring moves only a minority"""
+        ring = HashRing(4)
+        shards = ring.partition(self.universe)
+        self.assertEqual(sum(len(s) for s in shards), 200)
+        self.assertTrue(all(shards))
+
+        grown = HashRing(5)
+        moved = sum(1 for t in self.universe if ring.shard_for(t['address']) != grown.shard_for(t['address']))
+        self.assertLess(moved, 200 * 0.4)
+
+    def test_successfully_merge_shard_results(self):
+        """Test the coordinator merges categories from every shard in score order"""
+        executor = InlineExecutor()
+        service = ShardedTokenService(self.fetcher, MagicMock(), shards=4, executor=executor)
+        progress = []
+
+        async def listener(done, total, partial):
+            progress.append((done, total))
+
+        with patch.object(config, 'DATA_SOURCES', 'jupiter,dexscreener'), \
+                patch.object(config, 'SOURCE_PRECEDENCE', '{"info": ["dexscreener"]}'):
+            result = run_async(service.scan_tokens(progress_callback=listener, max_age=0))
+
+        scores = [t['score'] for t in result['Moonshot']]
+        self.assertEqual(scores, sorted(range(200), reverse=True))
+        self.assertEqual(len(executor.jobs), 4)
+        self.assertEqual(progress[-1], (4, 4))
+        self.assertFalse(service.latest_snapshot.partial)
+        self.assertEqual({(job['data_sources'], job['source_precedence']) for job in executor.jobs},
+                         {('jupiter,dexscreener', '{"info": ["dexscreener"]}')})
+
+    def test_unsuccessfully_run_failing_shard(self):
+        """Test a failed shard is dropped and the snapshot is marked partial"""
+        service = ShardedTokenService(self.fetcher, MagicMock(), shards=4, executor=InlineExecutor(fail_shard=2))
+        result = run_async(service.scan_tokens(max_age=0))
+
+        self.assertLess(len(result['Moonshot']), 200)
+        self.assertEqual(service.latest_snapshot.batches_done, 3)
+        self.assertTrue(service.latest_snapshot.partial)
+
+    @patch('app.services.sharded_scan.get_blocklist')
+    def test_successfully_skip_blocked_addresses_before_partitioning(self, mock_get_blocklist):
+        """Test runtime blocks are applied by the coordinator, since workers never see them"""
+        blocked = Blocklist(capacity=100, overrides_path='')
+        blocked.block('Addr7')
+        mock_get_blocklist.return_value = blocked
+        executor = InlineExecutor()
+        service = ShardedTokenService(self.fetcher, MagicMock(), shards=4, executor=executor)
+
+        result = run_async(service.scan_tokens(max_age=0))
+
+        dispatched = [t['address'] for job in executor.jobs for t in job['tokens']]
+        self.assertEqual(len(dispatched), 199)
+        self.assertNotIn('Addr7', dispatched)
+        self.assertNotIn('Addr7', [t['address'] for t in result['Moonshot']])
+
+    @patch('app.data.sources.create_fetcher')
+    def test_successfully_run_shard_worker(self, mock_create_fetcher):
+        """Test the worker validates only its shard's tokens with the job's sources and rate budget"""
+        fetcher = mock_create_fetcher.return_value
+        async def validate_tokens(tokens, min_liquidity, min_volume, deadline=None):
+            return [{'baseToken': {'address': t['address']}, 'liquidity': {'usd': 1}} for t in tokens]
+        async def close():
+            pass
+        fetcher.validate_tokens = validate_tokens
+        fetcher.close = close
+        fetcher.last_scan_progress = {'batches_done': 1, 'batches_total': 1}
+
+        result = run_shard({'shard': 1, 'tokens': self.universe[:3], 'min_liquidity': 0, 'min_volume': 0,
+                            'classifier': 'simple', 'rate_limit': 75, 'time_budget': None,
+                            'data_sources': 'static', 'source_precedence': '{}'})
+
+        mock_create_fetcher.assert_called_once_with('static', '{}', rate_limit=75)
+        self.assertEqual(result['shard'], 1)
+        self.assertIn('Matches', result['categorized'])
+        self.assertEqual(result['batches_done'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.snapshot import ScanSnapshot
+from app.services.snapshot_index import QueryError, parse_filter, parse_number
+
+def make_token(i, volume, liquidity, change):
+    return {'pairAddress': f"pair{i}", 'baseToken': {'symbol': f"T{i}"},
+            'volume': {'h24': volume}, 'liquidity': {'usd': str(liquidity)}, 'priceChange': {'h24': change}}
+
+class TestSnapshotIndex(unittest.TestCase):
+    def setUp(self):
+        self.tokens = [make_token(i, volume=i * 1000, liquidity=i * 100000, change=i * 10 - 50) for i in range(10)]
+        # The same pair listed in two categories is indexed once
+        self.snapshot = ScanSnapshot({'Moonshot': self.tokens[:6], 'Risky': self.tokens[4:]})
+
+    def test_successfully_answer_top_n(self):
+        """Test top-N reads highest and lowest values from the sorted index"""
+        index = self.snapshot.index
+        self.assertEqual(len(index), 10)
+        self.assertEqual([t['baseToken']['symbol'] for _, t in index.top('volume', 3)], ['T9', 'T8', 'T7'])
+        self.assertEqual([v for v, _ in index.top('change', 2, ascending=True)], [-50, -40])
+        self.assertIs(self.snapshot.index, index)
+
+    def test_successfully_filter_ranges(self):
+        """Test conditions are intersected and ordered by the first metric"""
+        results = self.snapshot.index.filter("liquidity >= 500k and change < 30")
+        self.assertEqual([t['baseToken']['symbol'] for _, t in results], ['T7', 'T6', 'T5'])
+        self.assertEqual(self.snapshot.index.filter("volume > 1m"), [])
+        self.assertEqual(len(self.snapshot.index.filter("change = 0")), 1)
+        limited = self.snapshot.index.filter("change < 30, liquidity >= 500k", limit=2)
+        self.assertEqual([v for v, _ in limited], [20.0, 10.0])
+
+    def test_unsuccessfully_parse_bad_queries(self):
+        """Test unknown metrics and malformed conditions raise QueryError"""
+        self.assertEqual(parse_number('$1.5M'), 1.5e6)
+        self.assertEqual(parse_filter('change>=-10%, volume<2k'), [('change', '>=', -10.0), ('volume', '<', 2000.0)])
+        with self.assertRaises(QueryError):
+            parse_filter('holders > 10')
+        with self.assertRaises(QueryError):
+            parse_filter('liquidity is big')
+        with self.assertRaises(QueryError):
+            self.snapshot.index.top('holders', 5)
+        for text in ('inf', 'nan', '1e400'):
+            with self.assertRaises(QueryError):
+                parse_number(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.snapshot_refresher import SnapshotRefresher
+import app.config as config
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def tokens_with_h1_change(*changes):
+    return {'Moonshot': [{'priceChange': {'h1': change}} for change in changes]}
+
+class TestSnapshotRefresher(unittest.TestCase):
+    def setUp(self):
+        self.mock_token_service = MagicMock()
+        self.mock_scheduler = MagicMock()
+        with patch.object(config, 'WARM_SCAN_INTERVAL', 120), \
+                patch.object(config, 'WARM_SCAN_MIN_INTERVAL', 30), \
+                patch.object(config, 'WARM_SCAN_MAX_INTERVAL', 600):
+            self.refresher = SnapshotRefresher(self.mock_token_service, scheduler=self.mock_scheduler)
+
+    def test_successfully_adapt_interval_to_volatility(self):
+        """Test the interval shrinks in volatile markets and stays within its bounds"""
+        with patch.object(config, 'WARM_SCAN_VOLATILITY_REFERENCE', 5):
+            self.assertEqual(self.refresher.next_interval(5), 120)
+            self.assertEqual(self.refresher.next_interval(10), 60)
+            self.assertEqual(self.refresher.next_interval(100), 30)
+            self.assertEqual(self.refresher.next_interval(0.1), 600)
+            self.assertEqual(self.refresher.next_interval(None), 120)
+
+    def test_successfully_refresh_and_reschedule(self):
+        """Test refresh forces a fresh scan and reschedules the job when volatility changes"""
+        self.mock_token_service.scan_tokens = AsyncMock(return_value=tokens_with_h1_change(-20, 20, 10))
+
+        with patch.object(config, 'WARM_SCAN_VOLATILITY_REFERENCE', 5):
+            run_async(self.refresher.refresh())
+
+        self.mock_token_service.scan_tokens.assert_called_once_with(max_age=0)
+        self.assertEqual(self.refresher.last_volatility, 20)
+        self.assertEqual(self.refresher.interval, 30)
+        self.assertEqual(self.refresher.max_snapshot_age, 60)
+        self.mock_scheduler.reschedule_job.assert_called_once_with(
+            SnapshotRefresher.JOB_ID, trigger='interval', seconds=30
+        )
+
+    def test_unsuccessfully_refresh_while_previous_refresh_running(self):
+        """Test overlapping refreshes are skipped"""
+        self.mock_token_service.scan_tokens = AsyncMock(return_value={})
+        self.refresher._refreshing = True
+
+        run_async(self.refresher.refresh())
+
+        self.mock_token_service.scan_tokens.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
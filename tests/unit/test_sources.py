@@ -0,0 +1,112 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.data.sources import DataSource, StaticSource, MultiSourceFetcher, create_fetcher, merge_records, pair_fetcher, parse_precedence
+from app.data.fetcher import DexScreenerFetcher
+import app.config as config
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def market(address, liquidity, volume):
+    return {'baseToken': {'address': address}, 'liquidity': {'usd': liquidity}, 'volume': {'h24': volume},
+            'info': {'socials': []}}
+
+class SlowSource(DataSource):
+    name = 'slow'
+
+    async def get_records(self, addresses):
+        await asyncio.sleep(1)
+        return {a.lower(): {'info': {'socials': [{'type': 'slow'}]}} for a in addresses}
+
+class BrokenSource(DataSource):
+    name = 'broken'
+
+    async def list_tokens(self):
+        raise RuntimeError("feed down")
+
+class TestMultiSourceFetcher(unittest.TestCase):
+    def setUp(self):
+        self.trending = StaticSource(tokens=[{'address': 'AAA', 'tags': ['trending']},
+                                             {'address': 'BBB', 'tags': ['trending']}], name='trending')
+        self.listed = StaticSource(tokens=[{'address': 'aaa', 'tags': ['verified']},
+                                           {'address': 'CCC', 'tags': ['verified']}], name='listed')
+        self.pairs = StaticSource(records={
+            'AAA': market('AAA', 200000, 50000),
+            'BBB': market('BBB', 500, 50000),       # below min liquidity
+            'CCC': market('CCC', 300000, 90000),
+        }, name='pairs')
+        self.metadata = StaticSource(records={
+            'AAA': {'info': {'socials': [{'type': 'twitter'}]}, 'liquidity': {'usd': 1}},
+        }, name='metadata')
+
+    def test_successfully_merge_sources_with_field_precedence(self):
+        """Test universes are unioned and metadata wins only the fields it is preferred for"""
+        fetcher = MultiSourceFetcher([self.trending, self.listed], [self.pairs, self.metadata],
+                                     precedence={'info': ['metadata']})
+        tokens = run_async(fetcher.get_validated_tokens(min_liquidity=100000, min_volume=1000))
+
+        by_address = {t['baseToken']['address']: t for t in tokens}
+        self.assertEqual(sorted(by_address), ['AAA', 'CCC'])
+        self.assertEqual(by_address['AAA']['info']['socials'], [{'type': 'twitter'}])
+        self.assertEqual(by_address['AAA']['liquidity']['usd'], 200000)
+        self.assertEqual(by_address['AAA']['jupiter_data']['tags'], ['trending', 'verified'])
+        self.assertEqual(fetcher.last_scan_progress, {'batches_done': 1, 'batches_total': 1})
+
+    def test_unsuccessfully_query_slow_and_broken_sources(self):
+        """Test a timed-out or failing source is skipped without failing the scan"""
+        slow = SlowSource(timeout=0.05)
+        fetcher = MultiSourceFetcher([self.trending, BrokenSource()], [self.pairs, slow],
+                                     precedence={'info': ['slow']})
+        tokens = run_async(fetcher.get_validated_tokens(min_liquidity=100000, min_volume=1000))
+
+        self.assertEqual([t['baseToken']['address'] for t in tokens], ['AAA'])
+        self.assertEqual(tokens[0]['info'], {'socials': []})
+        self.assertEqual(fetcher.source_failures, {'broken': 1, 'slow': 1})
+
+    def test_successfully_validate_given_tokens(self):
+        """Test validate_tokens enriches a supplied universe, as a shard worker does"""
+        fetcher = MultiSourceFetcher([], [self.pairs, self.metadata])
+        tokens = run_async(fetcher.validate_tokens([{'address': 'CCC', 'tags': ['shard']}],
+                                                   min_liquidity=100000, min_volume=1000))
+
+        self.assertEqual([t['baseToken']['address'] for t in tokens], ['CCC'])
+        self.assertEqual(tokens[0]['jupiter_data']['tags'], ['shard'])
+
+    def test_successfully_select_fetcher_from_config(self):
+        """Test the classic fetcher is the default and DATA_SOURCES builds a multi-source one"""
+        self.assertIs(type(create_fetcher()), DexScreenerFetcher)
+        with patch.object(config, 'DATA_SOURCES', 'jupiter,dexscreener'):
+            fetcher = create_fetcher()
+        self.assertIsInstance(fetcher, MultiSourceFetcher)
+        self.assertEqual([s.name for s in fetcher.enrichment_sources], ['dexscreener'])
+        fetcher = create_fetcher('jupiter,dexscreener', '{"info": ["dexscreener"]}', rate_limit=75)
+        self.assertEqual(fetcher.precedence, {'info': ['dexscreener']})
+        self.assertEqual(fetcher.enrichment_sources[0].fetcher.RATE_LIMIT_REQUESTS, 75)
+        self.assertIs(pair_fetcher(fetcher), fetcher.enrichment_sources[0].fetcher)
+        self.assertEqual(merge_records({'a': {'x': None}, 'b': {'x': 2}}, ['a', 'b']), {'x': 2})
+
+    def test_unsuccessfully_parse_malformed_precedence(self):
+        """Test a malformed SOURCE_PRECEDENCE falls back to no precedence instead of failing"""
+        with patch.object(config, 'DATA_SOURCES', 'jupiter,dexscreener'), \
+                patch.object(config, 'SOURCE_PRECEDENCE', '{"info": ["static"'):
+            fetcher = create_fetcher()
+        self.assertEqual(fetcher.precedence, {})
+        self.assertEqual(parse_precedence('{"info": ["static", "dexscreener"]}'), {'info': ['static', 'dexscreener']})
+        self.assertEqual(parse_precedence('["static"]'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import MagicMock
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.bot.telegram_client import TelegramHTTPClient, SentMessage, MAX_MESSAGE_LENGTH
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class TestTelegramHTTPClient(unittest.TestCase):
+    def setUp(self):
+        self.client = TelegramHTTPClient("test_token")
+        self.posted = []
+
+        posted = self.posted
+
+        # Custom async context manager implementation
+        class AsyncContextManagerMock:
+            def __init__(self, url, json):
+                posted.append((url, json))
+
+            async def __aenter__(self):
+                mock_response = MagicMock()
+                mock_response.status = 200
+                async def mock_json():
+                    return {'ok': True}
+                mock_response.json = mock_json
+                return mock_response
+
+            async def __aexit__(self, exc_type, exc_val, exc_tb):
+                pass
+
+        self.client.session = MagicMock()
+        self.client.session.post = MagicMock(side_effect=lambda url, json: AsyncContextManagerMock(url, json))
+
+    def test_successfully_send_message_through_shared_session(self):
+        """Test send_message posts to the Bot API through the pooled session"""
+        result = run_async(self.client.send_message(42, "hello"))
+
+        self.assertEqual(result, {'ok': True})
+        url, payload = self.posted[0]
+        self.assertEqual(url, "https://api.telegram.org/bottest_token/sendMessage")
+        self.assertEqual(payload, {'chat_id': 42, 'text': "hello", 'parse_mode': 'Markdown'})
+
+    def test_successfully_flush_merged_messages_per_chat(self):
+        """Test queued messages are merged per chat and split at Telegram's length limit"""
+        self.client.queue_message(1, "🕒 status")
+        self.client.queue_message(2, "❌ other chat")
+        self.client.queue_message(1, "❌ error")
+        self.client.queue_message(1, "x" * (MAX_MESSAGE_LENGTH - 10))
+
+        sent = run_async(self.client.flush())
+
+        self.assertEqual(sent, 3)
+        texts = [(payload['chat_id'], payload['text']) for _, payload in self.posted]
+        self.assertEqual(texts[0], ('1', "🕒 status\n\n❌ error"))
+        self.assertEqual(texts[1][0], '1')
+        self.assertEqual(texts[2], ('2', "❌ other chat"))
+        self.assertEqual(run_async(self.client.flush()), 0)
+
+    def test_successfully_edit_sent_message(self):
+        """Test a queued message is reported as pending and edits post editMessageText with the markup"""
+        self.client.queue_message(1, "🕒 status")
+        self.assertTrue(self.client.has_pending())
+        run_async(self.client.flush())
+        self.assertFalse(self.client.has_pending())
+
+        markup = MagicMock()
+        markup.to_dict = MagicMock(return_value={'inline_keyboard': []})
+        sent = SentMessage(self.client, 42, {'ok': True, 'result': {'message_id': 5}})
+        run_async(sent.edit_text("done", reply_markup=markup))
+
+        url, payload = self.posted[-1]
+        self.assertEqual(url, "https://api.telegram.org/bottest_token/editMessageText")
+        self.assertEqual(payload, {'chat_id': 42, 'message_id': 5, 'text': "done", 'reply_markup': {'inline_keyboard': []}})
+
+    def test_unsuccessfully_send_message_when_request_fails(self):
+        """Test a network failure is logged and doesn't raise"""
+        self.client.session.post = MagicMock(side_effect=Exception("connection reset"))
+
+        self.assertIsNone(run_async(self.client.send_message(42, "hello")))
+        with self.assertRaises(RuntimeError):
+            run_async(SentMessage(self.client, 42, None).edit_text("done"))
+
+
+if __name__ == '__main__':
+    unittest.main()
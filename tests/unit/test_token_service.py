@@ -0,0 +1,159 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.snapshot import ScanSnapshot
+from app.services.token_service import TokenService
+import app.config as config
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class TestTokenService(unittest.TestCase):
+    def setUp(self):
+        self.fetch_count = 0
+        self.tokens = [{'baseToken': {'symbol': 'MOON'}, 'score': 9}]
+
+        # Fetcher that takes a moment so concurrent callers overlap
+        async def get_validated_tokens(min_liquidity, min_volume, on_batch=None, deadline=None):
+            self.fetch_count += 1
+            await asyncio.sleep(0.01)
+            if on_batch:
+                await on_batch(1, 1, self.tokens)
+            return self.tokens
+
+        self.mock_fetcher = MagicMock()
+        self.mock_fetcher.get_validated_tokens = get_validated_tokens
+        self.mock_classifier = MagicMock()
+        self.mock_classifier.classify = MagicMock(side_effect=lambda tokens: {'Moonshot': list(tokens)})
+
+        self.service = TokenService(self.mock_fetcher, self.mock_classifier)
+
+    def test_successfully_coalesce_concurrent_scans(self):
+        """Test concurrent scan_tokens calls share one fetch and every caller gets progress"""
+        progress_calls = []
+
+        async def listener(done, total, partial):
+            progress_calls.append((done, total))
+
+        async def scan_concurrently():
+            return await asyncio.gather(
+                self.service.scan_tokens(progress_callback=listener, max_age=0),
+                self.service.scan_tokens(progress_callback=listener, max_age=0),
+                self.service.scan_tokens(max_age=0)
+            )
+
+        results = run_async(scan_concurrently())
+
+        self.assertEqual(self.fetch_count, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(progress_calls, [(1, 1), (1, 1)])
+        self.assertIsNone(self.service._inflight)
+
+    def test_successfully_classify_only_new_tokens_for_progress(self):
+        """Test each progress update classifies only the batch's new tokens and merges them by score"""
+        low, high = {'baseToken': {'symbol': 'LOW'}, 'score': 2}, {'baseToken': {'symbol': 'HIGH'}, 'score': 8}
+
+        async def get_validated_tokens(min_liquidity, min_volume, on_batch=None, deadline=None):
+            await on_batch(1, 2, [low])
+            await on_batch(2, 2, [low, high])
+            return [low, high]
+        self.mock_fetcher.get_validated_tokens = get_validated_tokens
+
+        partials = []
+
+        async def listener(done, total, partial):
+            partials.append(partial)
+
+        run_async(self.service.scan_tokens(progress_callback=listener, max_age=0))
+
+        progress_inputs = [call.args[0] for call in self.mock_classifier.classify.call_args_list[:2]]
+        self.assertEqual(progress_inputs, [[low], [high]])
+        self.assertEqual(partials[-1], {'Moonshot': [high, low]})
+
+    def test_successfully_keep_recent_snapshots_by_id(self):
+        """Test earlier scans stay reachable by id until RESULTS_CACHE_TTL and are pruned after"""
+        first = ScanSnapshot({'Moonshot': self.tokens})
+        first.snapshot_id = 'first'
+        self.service.latest_snapshot = first
+        run_async(self.service.scan_tokens(max_age=0))
+
+        self.assertIs(self.service.get_snapshot_by_id('first'), first)
+        self.assertIsNone(self.service.get_snapshot_by_id('first', max_age=-1))
+        with patch.object(config, 'RESULTS_CACHE_TTL', -1):
+            run_async(self.service.scan_tokens(max_age=0))
+        self.assertIsNone(self.service.get_snapshot_by_id('first'))
+        self.assertEqual(len(self.service._recent_snapshots), 0)
+
+    def test_successfully_serve_repeat_scan_from_result_ttl(self):
+        """Test a repeat scan within the TTL is served from memory and max_age=0 forces a fresh scan"""
+        with patch.object(config, 'SCAN_RESULT_TTL', 60):
+            first = run_async(self.service.scan_tokens())
+            second = run_async(self.service.scan_tokens())
+            self.assertEqual(self.fetch_count, 1)
+            self.assertIs(first, second)
+
+            run_async(self.service.scan_tokens(max_age=0))
+            self.assertEqual(self.fetch_count, 2)
+
+    def test_unsuccessfully_scan_shares_error_with_all_callers(self):
+        """Test an upstream failure is raised to every coalesced caller and nothing is cached"""
+        async def failing_fetch(min_liquidity, min_volume, on_batch=None, deadline=None):
+            self.fetch_count += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+        self.mock_fetcher.get_validated_tokens = failing_fetch
+
+        async def scan_concurrently():
+            return await asyncio.gather(
+                self.service.scan_tokens(max_age=0),
+                self.service.scan_tokens(max_age=0),
+                return_exceptions=True
+            )
+
+        results = run_async(scan_concurrently())
+
+        self.assertEqual(self.fetch_count, 1)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertIsNone(self.service.get_snapshot())
+
+    def test_successfully_profile_one_scan(self):
+        """Test profile_scan profiles exactly one scan and reports hot functions"""
+        with patch.object(config, 'PROFILE_OUTPUT_DIR', ''):
+            report = run_async(self.service.profile_scan())
+
+            self.assertEqual(self.service.latest_snapshot.categorized_tokens, {'Moonshot': self.tokens})
+            self.assertIn("functions by cumulative time", report)
+            self.assertIn("allocation sites", report)
+
+            run_async(self.service.scan_tokens(max_age=0))
+            self.assertIs(self.service.last_profile_report, report)
+
+    def test_unsuccessfully_profile_while_scan_in_flight(self):
+        """Test profile_scan refuses to join a running scan instead of returning its unprofiled result"""
+        async def profile_during_scan():
+            scan = asyncio.ensure_future(self.service.scan_tokens(max_age=0))
+            await asyncio.sleep(0)
+            with self.assertRaises(RuntimeError):
+                await self.service.profile_scan()
+            await scan
+
+        run_async(profile_during_scan())
+
+        self.assertEqual(self.fetch_count, 1)
+        self.assertIsNone(self.service.last_profile_report)
+
+
+if __name__ == '__main__':
+    unittest.main()
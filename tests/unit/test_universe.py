@@ -0,0 +1,166 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import json
+import sys
+import os
+import tempfile
+from time import monotonic
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.data.cassette import Cassette
+from app.data.universe import JSONArrayStream, UniverseScanner
+from app.services.universe_scan import UniverseTokenService
+import app.config as config
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class TestJSONArrayStream(unittest.TestCase):
+    def test_successfully_parse_array_split_at_every_byte(self):
+        """Test elements come out whole whatever the chunk boundaries, including inside UTF-8 characters"""
+        elements = [{'address': 'A', 'name': 'Ünïcödé 🚀'}, {'address': 'B', 'tags': ['x', 'y']}, {'n': [1, {'m': 2}]}]
+        payload = json.dumps(elements, ensure_ascii=False).encode('utf-8')
+        parser = JSONArrayStream()
+
+        parsed = []
+        for i in range(len(payload)):
+            parsed.extend(parser.feed(payload[i:i + 1]))
+
+        self.assertEqual(parsed, elements)
+        self.assertTrue(parser.finished)
+        parser.close()
+
+    def test_unsuccessfully_parse_non_array(self):
+        """Test a top-level object is rejected"""
+        with self.assertRaises(ValueError):
+            list(JSONArrayStream().feed(b'{"a": 1}'))
+
+    def test_unsuccessfully_parse_malformed_or_truncated_array(self):
+        """Test bad JSON is capped instead of buffered until EOF, and a cut-off array fails at close"""
+        parser = JSONArrayStream(max_buffer=64)
+        self.assertEqual(list(parser.feed(b'[{"a": 1}, {"b": nope}')), [{'a': 1}])
+        with self.assertRaises(ValueError):
+            for _ in range(10):
+                list(parser.feed(b', {"c": 2}' * 2))
+
+        truncated = JSONArrayStream()
+        self.assertEqual(list(truncated.feed(b'[{"a": 1}, {"b": ')), [{'a': 1}])
+        with self.assertRaises(ValueError):
+            truncated.close()
+
+
+class TestUniverseScan(unittest.TestCase):
+    def setUp(self):
+        self.universe = [
+            {'address': f"Addr{i}", 'daily_volume': 50000 if i % 2 else 10, 'tags': ['verified'],
+             'freeze_authority': 'Auth' if i % 10 == 1 else None}
+            for i in range(100)
+        ]
+        self.enriched_batches = []
+
+        async def validate_tokens(tokens, min_liquidity, min_volume, on_batch=None, deadline=None):
+            self.enriched_batches.append(len(tokens))
+            return [{'baseToken': {'address': t['address']}, 'index': int(t['address'][4:])} for t in tokens]
+
+        self.fetcher = MagicMock()
+        self.fetcher.BATCH_SIZE = 8
+        self.fetcher.validate_tokens = validate_tokens
+
+        classifier = MagicMock()
+        def classify(tokens):
+            for token in tokens:
+                token['score'] = token['index']
+            return {'Moonshot': [t for t in tokens if t['index'] % 3 == 0],
+                    'Risky': [t for t in tokens if t['index'] % 3 != 0]}
+        classifier.classify = MagicMock(side_effect=classify)
+        self.classifier = classifier
+
+    def _stream(self, scanner):
+        payload = json.dumps(self.universe).encode('utf-8')
+
+        async def chunks():
+            for i in range(0, len(payload), 97):
+                yield payload[i:i + 97]
+        scanner.iter_universe_chunks = chunks
+
+    def test_successfully_scan_universe_keeping_top_k(self):
+        """Test pre-filtered candidates are paged through enrichment and only the top K survive"""
+        service = UniverseTokenService(self.fetcher, self.classifier, top_k=3)
+        self._stream(service.scanner)
+        progress = []
+
+        async def listener(done, total, partial):
+            progress.append((done, total))
+
+        with patch.object(config, 'UNIVERSE_MIN_DAILY_VOLUME', 1000):
+            result = run_async(service.scan_tokens(progress_callback=listener, max_age=0))
+
+        # 50 odd addresses pass the volume screen, 10 of them are freezable
+        self.assertEqual(service.scanner.stats['listed'], 100)
+        self.assertEqual(service.scanner.stats['candidates'], 40)
+        self.assertEqual(self.enriched_batches, [8, 8, 8, 8, 8])
+        self.assertEqual([t['index'] for t in result['Moonshot']], [99, 93, 87])
+        self.assertEqual([t['index'] for t in result['Risky']], [97, 95, 89])
+        self.assertEqual(progress[-1], (5, 5))
+        self.assertFalse(service.latest_snapshot.partial)
+
+    def test_successfully_download_universe_on_own_session(self):
+        """Test the token list streams through the scanner's own (cassette) session, not the fetcher's"""
+        self.fetcher.session = None
+        with tempfile.TemporaryDirectory() as directory:
+            Cassette(directory).record(f"GET {config.UNIVERSE_URL}", 200, json.dumps(self.universe).encode('utf-8'), 0)
+            scanner = UniverseScanner(self.fetcher, self.classifier, top_k=3)
+
+            async def scan():
+                try:
+                    return await scanner.scan()
+                finally:
+                    await scanner.close()
+
+            with patch.object(config, 'CASSETTE_MODE', 'replay'), \
+                 patch.object(config, 'CASSETTE_DIR', directory), \
+                 patch.object(config, 'CASSETTE_TIMING', 'fast'), \
+                 patch.object(config, 'UNIVERSE_MIN_DAILY_VOLUME', 1000):
+                result = run_async(scan())
+
+        self.assertEqual(scanner.stats['listed'], 100)
+        self.assertEqual(result['pages_total'], 5)
+        self.assertIsNone(scanner.session)
+
+    def test_unsuccessfully_download_stalled_universe(self):
+        """Test a stalled download stops at the deadline and what arrived is still returned"""
+        scanner = UniverseScanner(self.fetcher, self.classifier)
+        payload = json.dumps(self.universe).encode('utf-8')
+
+        async def chunks():
+            yield payload[:len(payload) // 2]
+            await asyncio.sleep(10)
+            yield payload[len(payload) // 2:]
+        scanner.iter_universe_chunks = chunks
+
+        started = monotonic()
+        result = run_async(scanner.scan(deadline=monotonic() + 0.1))
+
+        self.assertLess(monotonic() - started, 5)
+        self.assertTrue(0 < scanner.stats['listed'] < 100)
+        self.assertEqual(result['pages_done'], 0)
+
+    def test_unsuccessfully_prefilter_bad_metadata(self):
+        """Test tokens without an address or with unparseable volume are screened out"""
+        scanner = UniverseScanner(self.fetcher, self.classifier)
+        self.assertFalse(scanner.prefilter({'daily_volume': 1e9}))
+        self.assertFalse(scanner.prefilter({'address': 'A', 'daily_volume': 'n/a'}))
+        self.assertTrue(scanner.prefilter({'address': 'A', 'daily_volume': 1e9}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import MagicMock
+import asyncio
+import sys
+import os
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.watchlist import WatchlistService
+from app.data.fetcher import DexScreenerFetcher
+
+# Simple function to run a coroutine
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class TestWatchlistService(unittest.TestCase):
+    def setUp(self):
+        self.prices = {'AAA': 1.0, 'BBB': 2.0}
+        self.liquidity = {'AAA': 100000, 'BBB': 100000}
+        self.requested_batches = []
+        self.sent = []
+
+        async def get_dex_data_batch(addresses):
+            self.requested_batches.append(list(addresses))
+            return [{'baseToken': {'address': a, 'symbol': a}, 'priceUsd': str(self.prices[a]),
+                     'liquidity': {'usd': self.liquidity[a]}} for a in addresses]
+
+        async def init_session():
+            pass
+
+        self.fetcher = DexScreenerFetcher()
+        self.fetcher.blocklist = MagicMock(is_blocked=MagicMock(return_value=False))
+        self.fetcher.get_dex_data_batch = get_dex_data_batch
+        self.fetcher.init_session = init_session
+
+        async def notify(chat_id, text):
+            self.sent.append((chat_id, text))
+
+        self.watchlist = WatchlistService(self.fetcher, notify=notify)
+
+    def test_successfully_share_batches_across_users(self):
+        """Test overlapping watches from several chats are fetched once per unique address"""
+        self.watchlist.watch(1, 'AAA')
+        self.watchlist.watch(2, 'aaa')
+        self.watchlist.watch(2, 'BBB')
+        self.watchlist.watch(3, 'BBB')
+
+        run_async(self.watchlist.poll())
+
+        self.assertEqual(self.requested_batches, [['AAA', 'BBB']])
+        self.assertEqual(self.watchlist.watched_by(2), ['AAA', 'BBB'])
+
+    def test_successfully_alert_only_on_threshold_crossing(self):
+        """Test small moves are silent and a big move alerts every watcher once"""
+        self.watchlist.watch(1, 'AAA')
+        self.watchlist.watch(2, 'AAA')
+        run_async(self.watchlist.poll(now=1000))   # baseline
+
+        self.prices['AAA'] = 1.05
+        run_async(self.watchlist.poll(now=2000))
+        self.assertEqual(self.sent, [])
+
+        self.prices['AAA'] = 1.2
+        run_async(self.watchlist.poll(now=3000))
+        self.assertEqual(sorted(chat for chat, _ in self.sent), [1, 2])
+        self.assertIn("price +20.0%", self.sent[0][1])
+
+        # The alert resets the baseline, so the same level doesn't alert again
+        run_async(self.watchlist.poll(now=4000))
+        self.assertEqual(len(self.sent), 2)
+
+        self.liquidity['AAA'] = 20000
+        run_async(self.watchlist.poll(now=5000))
+        self.assertIn("liquidity -80%", self.sent[-1][1])
+
+    def test_successfully_refresh_hot_tokens_more_often(self):
+        """Test a volatile watched token is polled every cycle while a quiet one waits for its tier"""
+        self.watchlist.refresh.tier_intervals = {'hot': 20, 'warm': 60, 'cold': 180}
+        fetch = self.fetcher.get_dex_data_batch
+
+        async def get_dex_data_batch(addresses):
+            pairs = await fetch(addresses)
+            for pair in pairs:
+                pair['priceChange'] = {'h1': 25 if pair['baseToken']['address'] == 'AAA' else 0}
+            return pairs
+        self.fetcher.get_dex_data_batch = get_dex_data_batch
+
+        self.watchlist.watch(1, 'AAA')
+        self.watchlist.watch(1, 'BBB')
+        for now in (1000, 1020, 1040, 1180):
+            run_async(self.watchlist.poll(now=now))
+
+        self.assertEqual(self.requested_batches, [['AAA', 'BBB'], ['AAA'], ['AAA'], ['AAA', 'BBB']])
+
+    def test_unsuccessfully_poll_after_everyone_unwatched(self):
+        """Test addresses nobody watches any more are not fetched"""
+        self.watchlist.watch(1, 'AAA')
+        self.assertFalse(self.watchlist.watch(1, 'AAA'))
+        self.assertEqual(self.watchlist.unwatch(1), 1)
+
+        run_async(self.watchlist.poll())
+
+        self.assertEqual(self.requested_batches, [])
+        self.assertEqual(self.watchlist.unique_addresses, [])
+
+    def test_unsuccessfully_poll_blocked_token(self):
+        """Test an address blocked after it was watched is skipped until it is unblocked"""
+        blocked = {'BBB'}
+        self.fetcher.blocklist = MagicMock(is_blocked=MagicMock(side_effect=lambda address: address in blocked))
+        self.watchlist.watch(1, 'AAA')
+        self.watchlist.watch(1, 'BBB')
+
+        run_async(self.watchlist.poll(now=1000))
+        blocked.clear()
+        run_async(self.watchlist.poll(now=1001))
+
+        self.assertEqual(self.requested_batches, [['AAA'], ['BBB']])
+
+    def test_successfully_close_fetcher_on_shutdown(self):
+        """Test shutdown closes the fetcher's session along with the scheduler"""
+        closed = []
+
+        async def close():
+            closed.append(True)
+        self.fetcher.close = close
+
+        run_async(self.watchlist.shutdown())
+
+        self.assertEqual(closed, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()